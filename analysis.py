@@ -0,0 +1,835 @@
+"""
+Arayüzden bağımsız analiz çekirdeği.
+
+Bu modül Streamlit, folium veya plotly içe aktarmaz; toplu işlerde ve
+komut satırı araçlarında doğrudan kullanılabilir.
+"""
+import json
+import logging
+import os
+import random
+import ssl
+import zlib
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from geocode import NOT_FOUND, reverse_geocode, reverse_geocode_batch
+from heatmap import CITY_COORDS, grid_inputs
+from cannibalization import cannibalization
+from catchment import city_catchment
+from energy import TARIFF_BANDS, capacity_kw, daily_shape, energy_model
+from enrichment import Source, run_sources
+from http_cache import DEFAULT_TTL, cached_fetch
+from montecarlo import default_distributions, simulate_projection
+from points import point_keys
+from queueing import STATION_PROFILES, queue_metrics, queue_metrics_batch, station_demand
+from regions import has_boundaries, lookup_demographics, lookup_region
+from stations import count_stations_within, nearest_station_distance
+from traffic_store import has_traffic_store, load_traffic_store, peak_label
+from ulasav_sync import has_local_store, load_records, store_version
+from utils import calculate_location_scores
+
+logger = logging.getLogger(__name__)
+
+def nearest_city(lat, lon):
+    """CITY_COORDS içindeki en yakın şehri döndürür"""
+    return min(CITY_COORDS.items(), key=lambda x: ((lat - x[1][0])**2 + (lon - x[1][1])**2)**0.5)[0]
+
+def nearest_cities(lats, lons):
+    """nearest_city'nin dizi sürümü; her nokta için en yakın şehrin adını döndürür"""
+    names = np.array(list(CITY_COORDS), dtype=object)
+    centers = np.array(list(CITY_COORDS.values()))
+    dist = (lats[:, None] - centers[:, 0])**2 + (lons[:, None] - centers[:, 1])**2
+    return names[np.argmin(dist, axis=1)]
+
+def _location_seed(lat, lon):
+    """Aynı lokasyonun her çalıştırmada aynı senaryoları üretmesi için tohum"""
+    return zlib.crc32(f"{lat:.5f},{lon:.5f}".encode())
+
+def get_address_from_coords(lat, lon):
+    """Koordinatlardan adres bilgisini alır (SQLite önbelleği üzerinden)"""
+    try:
+        return reverse_geocode(lat, lon)
+    except:
+        return NOT_FOUND
+
+@lru_cache(maxsize=1)
+def load_local_ev_data(version):
+    """Senkronize edilmiş yerel depodaki ulaşım verilerini API yanıtı biçiminde döndürür"""
+    records = load_records().drop(columns=['_hash', '_synced_at', 'sync_date'], errors='ignore')
+    return {
+        'result': {
+            'records': records.to_dict('records'),
+            'total': len(records)
+        }
+    }
+
+def fetch_ev_data():
+    """Ulaşım verilerini yerel depodan, yoksa API'den çeker (disk önbelleği üzerinden)"""
+    # ulasav_sync ile senkronize edilmiş yerel depo varsa API'ye gitme
+    if has_local_store():
+        return load_local_ev_data(store_version())
+    
+    try:
+        # SSL sertifika doğrulamasını devre dışı bırak (sadece test için)
+        context = ssl._create_unverified_context()
+        
+        url = 'https://ulasav.csb.gov.tr/api/3/action/datastore_search?resource_id=6ebdc521-c96c-4ebf-8695-88f3af494d86'
+        
+        # Önbellekten al; süresi dolmuşsa arka planda yenilenir
+        data = cached_fetch(
+            url,
+            ttl=float(os.getenv('EV_DATA_CACHE_TTL', DEFAULT_TTL)),
+            context=context
+        )
+        return json.loads(data)
+    except Exception as e:
+        logger.warning("Veri çekilirken hata oluştu: %s", e)
+        return None
+
+# Sayım verisinden EV trafiği tahmin edilirken kullanılan EV oranı
+EV_TRAFFIC_SHARE = 0.03
+
+def observed_traffic(lats, lons):
+    """
+    Noktalara en yakın sayım kesiminin önceden hesaplanmış özetlerini döndürür.
+
+    Returns:
+        Optional[Tuple[np.ndarray, pd.DataFrame]]: Kesim satırları (-1: yakında
+        kesim yok) ve özet tablosu; trafik deposu yoksa None
+    """
+    if not has_traffic_store():
+        return None
+    store = load_traffic_store()
+    rows = store.nearest(lats, lons)
+    return rows, store.summary(rows)
+
+def _traffic_from_summary(store, row, summary):
+    """Sayım kesimi özetini analyze_traffic sonucu biçimine çevirir"""
+    daily_traffic = int(round(summary['daily_traffic']))
+    return {
+        'daily_traffic': daily_traffic,
+        'peak_hours': {
+            'morning': peak_label(summary['morning_peak']),
+            'evening': peak_label(summary['evening_peak'])
+        },
+        'weekend_density': int(round(summary['weekend_density'])),
+        'ev_traffic': int(round(daily_traffic * EV_TRAFFIC_SHARE)),
+        'traffic_growth': round(float(np.nan_to_num(summary['traffic_growth'])), 1),
+        'hourly_profile': np.round(store.hourly_profile(row)).tolist()
+    }
+
+def analyze_traffic(lat, lon, ev_data=None):
+    """
+    Seçilen konuma göre trafik analizi yapar. Yakında sayım kesimi varsa
+    trafik deposunun özetleri, yoksa ulaşım verisi (ev_data verilmezse
+    çekilir) kullanılır.
+    """
+    observed = observed_traffic(lat, lon)
+    if observed is not None and observed[0][0] >= 0:
+        return _traffic_from_summary(load_traffic_store(), observed[0][0], observed[1].iloc[0])
+    return _reported_traffic(lat, lon, ev_data)
+
+# Ulaşım verisinde bulunmayan trafik göstergeleri için simülasyon aralıkları (iki uç dahil)
+SIMULATED_TRAFFIC_RANGES = {
+    'daily_traffic': (8000, 15000),
+    'weekend_density': (50, 80),
+    'ev_traffic': (100, 500),
+    'traffic_growth': (5, 15)
+}
+
+def _point_uniforms(lats, lons, n_fields):
+    """
+    Her nokta için nokta anahtarından türetilen (n, n_fields) boyutunda [0, 1)
+    değerleri üretir (splitmix64). Aynı nokta her çalıştırmada aynı değerleri
+    alır; tüm noktalar tek vektörel adımda hesaplanır.
+    """
+    keys = point_keys(lats, lons).astype(np.uint64)[:, None]
+    z = keys + (np.arange(1, n_fields + 1, dtype=np.uint64) * np.uint64(0x9E3779B97F4A7C15))
+    with np.errstate(over='ignore'):
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    z = z ^ (z >> np.uint64(31))
+    return (z >> np.uint64(11)).astype(np.float64) / 2.0**53
+
+def reported_traffic_for_points(lats, lons, ev_data=None):
+    """
+    Sayım kesimi olmayan lokasyonlar için ulaşım verisinden trafik. Veride
+    bulunmayan göstergeler noktadan tohumlanan simülasyonla doldurulur.
+
+    Returns:
+        pd.DataFrame: analyze_traffic sonucu sütunları; nokta başına bir satır
+    """
+    lats = np.atleast_1d(np.asarray(lats, dtype=np.float64))
+    lons = np.atleast_1d(np.asarray(lons, dtype=np.float64))
+    try:
+        # API'den verileri çek
+        data = fetch_ev_data() if ev_data is None else ev_data
+        reported = data['result'] if data and 'result' in data else {}
+    except:
+        reported = {}
+    
+    # API verisi alınamazsa simüle edilmiş veri kullan
+    draws = _point_uniforms(lats, lons, len(SIMULATED_TRAFFIC_RANGES))
+    traffic = pd.DataFrame({
+        name: np.full(len(lats), reported[name]) if name in reported
+        else low + np.floor(draws[:, i] * (high - low + 1)).astype(np.int64)
+        for i, (name, (low, high)) in enumerate(SIMULATED_TRAFFIC_RANGES.items())
+    })
+    traffic.insert(1, 'peak_hours', [{'morning': '08:00-10:00', 'evening': '17:00-19:00'} for _ in range(len(lats))])
+    
+    # Saatlik sayım yoksa günlük trafik, trafik grafiğindeki günlük eğriye göre saatlere dağıtılır
+    shape = daily_shape(np.arange(24))
+    profiles = np.round(traffic['daily_traffic'].to_numpy(dtype=np.float64)[:, None] * shape / shape.sum())
+    traffic['hourly_profile'] = profiles.tolist()
+    return traffic
+
+def _reported_traffic(lat, lon, ev_data=None):
+    """reported_traffic_for_points'in tek lokasyonluk sürümü"""
+    row = reported_traffic_for_points([lat], [lon], ev_data).iloc[0].to_dict()
+    return {key: value.item() if isinstance(value, np.generic) else value for key, value in row.items()}
+
+def traffic_for_points(lats, lons, ev_data=None):
+    """analyze_traffic'in toplu sürümü; sayım kesimleri tek sorguda bulunur"""
+    reported = reported_traffic_for_points(lats, lons, ev_data)
+    observed = observed_traffic(lats, lons)
+    if observed is None:
+        return reported
+    
+    rows, summary = observed
+    store = load_traffic_store()
+    records = reported.to_dict('records')
+    for i, row in enumerate(rows):
+        if row >= 0:
+            records[i] = _traffic_from_summary(store, row, summary.iloc[i])
+    return pd.DataFrame(records)
+
+# Beş büyük şehir için yaklaşık demografik değerler
+CITY_DEMOGRAPHICS = {
+    "İstanbul": {
+        "population": 15800000,
+        "density": 2900,
+        "urban_population": 15200000,
+        "rural_population": 600000,
+        "population_growth": 2.5,
+        "ev_ownership": 8,
+        "business_density": 450
+    },
+    "Ankara": {
+        "population": 5700000,
+        "density": 2100,
+        "urban_population": 5300000,
+        "rural_population": 400000,
+        "population_growth": 1.8,
+        "ev_ownership": 6,
+        "business_density": 350
+    },
+    "İzmir": {
+        "population": 4400000,
+        "density": 1800,
+        "urban_population": 4000000,
+        "rural_population": 400000,
+        "population_growth": 1.5,
+        "ev_ownership": 5,
+        "business_density": 300
+    },
+    "Bursa": {
+        "population": 3100000,
+        "density": 1500,
+        "urban_population": 2800000,
+        "rural_population": 300000,
+        "population_growth": 1.7,
+        "ev_ownership": 4,
+        "business_density": 250
+    },
+    "Antalya": {
+        "population": 2500000,
+        "density": 1200,
+        "urban_population": 2200000,
+        "rural_population": 300000,
+        "population_growth": 2.2,
+        "ev_ownership": 3,
+        "business_density": 200
+    }
+}
+
+# Nüfus tablosunda bulunmayan göstergeler için ülke geneli varsayılanlar
+DEFAULT_EV_OWNERSHIP = 2
+DEFAULT_BUSINESS_DENSITY = 100
+
+def _int_or_zero(value):
+    """Nüfus tablosundaki boş (NaN) hücreleri 0 sayarak tam sayıya çevirir"""
+    return int(value) if pd.notna(value) else 0
+
+def demographics_from_region(region):
+    """İl/ilçe sorgusu sonucunu analyze_demographics çıktı biçimine çevirir"""
+    city_name = region.get('Il') if pd.notna(region.get('Il')) else region['province']
+    known = CITY_DEMOGRAPHICS.get(city_name, {})
+    growth = region.get('Nufus_Artis_Hizi')
+    
+    return {
+        'city_name': city_name,
+        'district': region.get('district'),
+        'population': _int_or_zero(region['Toplam_Nufus']),
+        'density': _int_or_zero(region['Nufus_Yogunlugu']),
+        'urban_population': _int_or_zero(region['Sehir_Nufus']),
+        'rural_population': _int_or_zero(region['Kirsal_Nufus']),
+        'population_growth': round(float(growth), 1) if pd.notna(growth) else 0.0,
+        'ev_ownership': known.get('ev_ownership', DEFAULT_EV_OWNERSHIP),
+        'business_density': known.get('business_density', DEFAULT_BUSINESS_DENSITY)
+    }
+
+def catchment_raster(city):
+    """Şehrin çekim alanı rasterı (şehir başına bir kez hesaplanır; şehir bilinmiyorsa None)"""
+    known = CITY_DEMOGRAPHICS.get(city)
+    if known is None or city not in CITY_COORDS:
+        return None
+    return city_catchment(city, known['population'], known['ev_ownership'])
+
+def catchment_for_points(lats, lons):
+    """
+    Noktaların en yakın şehrin rasterından çekim alanı değerlerini döndürür.
+
+    Returns:
+        pd.DataFrame: 'catchment_population', 'catchment_ev_owners' ve
+        'ev_ownership' (%) sütunları; raster dışındaki noktalar NaN
+    """
+    lats = np.asarray(lats, dtype=np.float64)
+    lons = np.asarray(lons, dtype=np.float64)
+    result = pd.DataFrame(np.nan, index=range(len(lats)), columns=['catchment_population', 'catchment_ev_owners', 'ev_ownership'])
+    cities = nearest_cities(lats, lons)
+    for city in np.unique(cities):
+        raster = catchment_raster(city)
+        if raster is not None:
+            mask = cities == city
+            result.loc[mask] = raster.lookup_many(lats[mask], lons[mask]).to_numpy()
+    return result
+
+def _with_catchment(demo, catchment):
+    """Şehir geneli EV sahipliğini lokasyonun çekim alanındaki oranla değiştirir"""
+    if catchment is None or pd.isna(catchment['ev_ownership']):
+        return demo
+    return {
+        **demo,
+        'ev_ownership': round(float(catchment['ev_ownership']), 1),
+        'catchment_population': int(catchment['catchment_population']),
+        'catchment_ev_owners': int(catchment['catchment_ev_owners'])
+    }
+
+def analyze_demographics(lat, lon):
+    """Seçilen konuma göre demografik analiz yapar"""
+    raster = catchment_raster(nearest_city(lat, lon))
+    catchment = raster.lookup(lat, lon) if raster is not None else None
+    
+    # İl/ilçe sınırları varsa nokta-poligon sorgusu ile gerçek nüfus verisini kullan
+    if has_boundaries():
+        region = lookup_region(lat, lon)
+        if region['province'] is not None and pd.notna(region.get('Toplam_Nufus')):
+            return _with_catchment(demographics_from_region(region), catchment)
+    
+    return _with_catchment(_approximate_demographics(lat, lon), catchment)
+
+def _approximate_demographics(lat, lon):
+    """
+    Sınır verisi yokken en yakın büyük şehrin değerlerini küçük sapmalarla
+    döndürür. Sapmalar lokasyondan tohumlandığı için aynı nokta her
+    çalıştırmada aynı değerleri (ve aynı projeksiyon bantlarını) alır.
+    """
+    rng = random.Random(_location_seed(lat, lon))
+    
+    # En yakın şehri bul
+    closest_city = nearest_city(lat, lon)
+    
+    # Seçilen şehir için veriyi al
+    data = CITY_DEMOGRAPHICS.get(closest_city, {
+        "population": rng.randint(1000000, 2000000),
+        "density": rng.randint(500, 1000),
+        "urban_population": rng.randint(800000, 1500000),
+        "rural_population": rng.randint(100000, 300000),
+        "population_growth": round(rng.uniform(1.0, 2.0), 1),
+        "ev_ownership": rng.randint(2, 5),
+        "business_density": rng.randint(100, 200)
+    })
+    
+    # Küçük rastgsal değişiklikler ekle
+    data = {k: v * (1 + rng.uniform(-0.05, 0.05)) if isinstance(v, (int, float)) else v 
+            for k, v in data.items()}
+    
+    return {
+        'city_name': closest_city,
+        'population': int(data['population']),
+        'density': int(data['density']),
+        'urban_population': int(data['urban_population']),
+        'rural_population': int(data['rural_population']),
+        'population_growth': round(data['population_growth'], 1),
+        'ev_ownership': round(data['ev_ownership'], 1),
+        'business_density': int(data['business_density'])
+    }
+
+def demographics_for_points(lats, lons):
+    """analyze_demographics'in toplu sürümü; sınır sorgusu tüm noktalar için tek seferde yapılır"""
+    results = [None] * len(lats)
+    if has_boundaries():
+        for i, region in enumerate(lookup_demographics(lats, lons).to_dict('records')):
+            if region['province'] is not None and pd.notna(region.get('Toplam_Nufus')):
+                results[i] = demographics_from_region(region)
+    catchment = catchment_for_points(lats, lons).to_dict('records')
+    return [
+        _with_catchment(result if result is not None else _approximate_demographics(lat, lon), local)
+        for result, lat, lon, local in zip(results, lats, lons, catchment)
+    ]
+
+# Varsayılan istasyon tipi ve trafik verisi olmadığında kullanılan günlük EV trafiği
+DEFAULT_STATION_TYPE = "DC Hızlı Şarj"
+DEFAULT_EV_TRAFFIC = 300
+
+def estimate_market_share(lat, lon):
+    """Lokasyonun tahmini pazar payı (%10-40); aynı lokasyon için her çalıştırmada aynıdır"""
+    return int(np.random.default_rng(_location_seed(lat, lon)).integers(10, 41))
+
+def analyze_competition(lat, lon, station_type=DEFAULT_STATION_TYPE, ev_traffic=None, retention=1.0):
+    """
+    Seçilen konuma göre rekabet analizi yapar. Doluluk ve bekleme süreleri,
+    istasyon tipine ve erişilebilir rakip havuzuna göre kuyruk modelinden gelir.
+    retention, ağdaki diğer lokasyonlara kaptırılmayan talep oranıdır; oturumlar
+    kuyruk modelinden önce bu oranla düşürülür (pazar payı değişmez).
+    """
+    nearby_stations = int(count_stations_within(lat, lon, radius_km=5.0))
+    daily_sessions = float(station_demand(
+        DEFAULT_EV_TRAFFIC if ev_traffic is None else ev_traffic,
+        nearby_stations,
+        STATION_PROFILES[station_type]['chargers']
+    )) * retention
+    queue = queue_metrics(daily_sessions, station_type, seed=_location_seed(lat, lon))
+    
+    return {
+        'nearby_stations': nearby_stations,
+        'nearest_distance': round(float(nearest_station_distance(lat, lon)), 1),
+        'occupancy_rate': round(queue['occupancy'] * 100, 1),
+        'avg_waiting_time': round(queue['avg_wait'], 1),
+        'p95_waiting_time': round(queue['p95_wait'], 1),
+        'turned_away_rate': round(queue['turned_away'] * 100, 1),
+        'daily_sessions': round(daily_sessions, 1),
+        'hourly_occupancy': queue['hourly_occupancy'],
+        'queue_method': queue['method'],
+        'market_share': estimate_market_share(lat, lon)
+    }
+
+def station_context(lats, lons):
+    """Noktaların rakip istasyon sayısını ve en yakın rakip mesafesini tek BallTree çağrısıyla bulur"""
+    return pd.DataFrame({
+        'nearby_stations': count_stations_within(lats, lons, radius_km=5.0).astype(int),
+        'nearest_distance': np.round(nearest_station_distance(lats, lons), 1)
+    })
+
+def competition_for_points(lats, lons, station_type=DEFAULT_STATION_TYPE, ev_traffic=None, context=None, workers=1, retention=1.0):
+    """analyze_competition'ın toplu sürümü; kuyruk metrikleri geçerli olduğunda analitik, değilse simülasyonla hesaplanır"""
+    if context is None:
+        context = station_context(lats, lons)
+    if ev_traffic is None:
+        ev_traffic = np.full(len(lats), DEFAULT_EV_TRAFFIC)
+    
+    daily_sessions = station_demand(
+        ev_traffic, context['nearby_stations'].to_numpy(), STATION_PROFILES[station_type]['chargers']
+    ) * retention
+    seeds = [_location_seed(lat, lon) for lat, lon in zip(lats, lons)]
+    queue = queue_metrics_batch(daily_sessions, station_type, seeds=seeds, workers=workers)
+    
+    return context.assign(
+        occupancy_rate=np.round(queue['occupancy'].to_numpy() * 100, 1),
+        avg_waiting_time=np.round(queue['avg_wait'].to_numpy(), 1),
+        p95_waiting_time=np.round(queue['p95_wait'].to_numpy(), 1),
+        turned_away_rate=np.round(queue['turned_away'].to_numpy() * 100, 1),
+        daily_sessions=np.round(daily_sessions, 1),
+        queue_method=queue['method'].to_numpy(),
+        market_share=np.array([estimate_market_share(lat, lon) for lat, lon in zip(lats, lons)], dtype=np.int64)
+    )
+
+# Şehir bazlı büyüme faktörleri
+CITY_GROWTH_FACTORS = {
+    "İstanbul": 1.4,
+    "Ankara": 1.3,
+    "İzmir": 1.25,
+    "Bursa": 1.2,
+    "Antalya": 1.15
+}
+DEFAULT_GROWTH_FACTOR = 1.1
+
+# Monte Carlo projeksiyonunda kullanılacak senaryo sayısı
+MC_SCENARIOS = 200000
+
+def projection_arrays(growth_factor, ev_ownership, market_share, investment_budget):
+    """
+    Finansal projeksiyonu lokasyon dizileri üzerinde hesaplar.
+
+    Args:
+        growth_factor: Yıllık gelir büyüme çarpanları
+        ev_ownership: EV sahiplik oranları (%)
+        market_share: Tahmini pazar payları (%)
+        investment_budget: Lokasyon başına yatırım bütçesi (TL)
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: (lokasyon x 3) gelirler ve
+        maliyetler (tam sayı TL) ile lokasyon başına ROI (%)
+    """
+    growth_factor = np.asarray(growth_factor, dtype=np.float64)
+    
+    # EV sahiplik oranına göre potansiyel müşteri faktörü
+    ev_factor = np.asarray(ev_ownership, dtype=np.float64) / 5  # normalize
+    
+    # Rekabet durumuna göre pazar payı faktörü
+    market_share = np.asarray(market_share, dtype=np.float64) / 100
+    
+    # Baz gelir ve maliyet hesaplamaları (yatırım bütçesine göre normalize)
+    base_revenue = investment_budget * 0.4  # İlk yıl için beklenen gelir
+    base_cost = investment_budget * 0.2     # İlk yıl için beklenen maliyet
+    
+    # 3 yıllık projeksiyon; gelir her yıl büyüme çarpanıyla artar
+    first_year = base_revenue * (1 + ev_factor) * market_share
+    revenues = np.stack([first_year, first_year * growth_factor, first_year * growth_factor * growth_factor], axis=-1)
+    revenues = np.trunc(revenues).astype(np.int64)
+    
+    # %10 ve %20 maliyet artışı
+    costs = np.trunc(base_cost * np.array([1.0, 1.1, 1.2])).astype(np.int64)
+    costs = np.broadcast_to(costs, revenues.shape)
+    
+    # ROI hesaplama
+    total_cost = costs.sum(axis=-1) + investment_budget
+    roi = (revenues.sum(axis=-1) - total_cost) / total_cost * 100
+    return revenues, costs, roi
+
+def calculate_financial_projection(city_name, ev_ownership, competition_data, investment_budget):
+    """Finansal projeksiyon hesaplar"""
+    revenues, costs, roi = projection_arrays(
+        CITY_GROWTH_FACTORS.get(city_name, DEFAULT_GROWTH_FACTOR),
+        ev_ownership,
+        competition_data['market_share'],
+        investment_budget
+    )
+    return {
+        'revenues': revenues.tolist(),
+        'costs': costs.tolist(),
+        'roi': round(float(roi), 1)
+    }
+
+def served_sessions(competition_data):
+    """Beklemeden vazgeçenler düşüldükten sonra karşılanan günlük oturum sayısı"""
+    return competition_data['daily_sessions'] * (1 - competition_data['turned_away_rate'] / 100)
+
+def calculate_energy_costs(city_name, competition_data, station_type=DEFAULT_STATION_TYPE):
+    """
+    Lokasyonun 3 yıllık enerji maliyetini, en yüksek çekilen gücü ve şebeke
+    kapasitesi nedeniyle karşılanamayan oturumları hesaplar.
+
+    Returns:
+        Dict: Yıllara göre 'energy_cost', 'demand_charge', 'energy_kwh',
+        'peak_kw', 'curtailed_sessions' listeleri; ilk yıl için tarife
+        dilimi başına 'band_kwh' ve aylık 'monthly_peak_kw'; 'capacity_kw'
+    """
+    energy = energy_model(
+        served_sessions(competition_data),
+        station_type,
+        years=3,
+        growth_factor=CITY_GROWTH_FACTORS.get(city_name, DEFAULT_GROWTH_FACTOR)
+    )
+    return {
+        'energy_cost': np.trunc(energy['energy_cost'][0]).astype(np.int64).tolist(),
+        'demand_charge': np.trunc(energy['demand_charge'][0]).astype(np.int64).tolist(),
+        'energy_kwh': np.round(energy['energy_kwh'][0]).astype(np.int64).tolist(),
+        'peak_kw': np.round(energy['peak_kw'][0], 1).tolist(),
+        'curtailed_sessions': np.round(energy['curtailed_sessions'][0]).astype(np.int64).tolist(),
+        'band_kwh': dict(zip(TARIFF_BANDS, np.round(energy['band_kwh'][0, 0]).astype(np.int64).tolist())),
+        'monthly_peak_kw': np.round(energy['monthly_peak_kw'][0, 0], 1).tolist(),
+        'capacity_kw': capacity_kw(station_type)
+    }
+
+def calculate_projection_bands(lat, lon, city_name, ev_ownership, competition_data, investment_budget):
+    """Monte Carlo ile nakit akışı belirsizlik bantlarını hesaplar"""
+    distributions = default_distributions(
+        competition_data['market_share'],
+        ev_ownership,
+        CITY_GROWTH_FACTORS.get(city_name, DEFAULT_GROWTH_FACTOR)
+    )
+    # Aynı lokasyon her yeniden çalıştırmada aynı senaryoları üretsin
+    return simulate_projection(investment_budget, distributions, n_scenarios=MC_SCENARIOS, years=3, seed=_location_seed(lat, lon))
+
+def _apply_observed_density(inputs, lats, lons):
+    """Sayım kesimi olan noktalarda modellenen trafik yoğunluğunu ölçülen yoğunlukla değiştirir"""
+    observed = observed_traffic(lats, lons)
+    if observed is not None:
+        density = observed[1]['density'].to_numpy()
+        inputs['traffic_density'] = np.where(np.isnan(density), inputs['traffic_density'], density)
+
+def _catchment_ev_share(city, lats, lons):
+    """Izgara girdileri için çekim alanı EV sahiplik oranı (0-1; raster yoksa None)"""
+    raster = catchment_raster(city)
+    if raster is None:
+        return None
+    share = raster.lookup_many(lats, lons)['ev_ownership'].to_numpy() / 100
+    return None if np.isnan(share).all() else share
+
+def score_location(lat, lon, competition_data=None):
+    """Lokasyon puanını (0-100) en yakın şehrin ızgara girdileriyle hesaplar"""
+    city = nearest_city(lat, lon)
+    inputs = grid_inputs(city, np.array([lat]), np.array([lon]), ev_ownership=_catchment_ev_share(city, np.array([lat]), np.array([lon])))
+    _apply_observed_density(inputs, np.array([lat]), np.array([lon]))
+    if competition_data is not None:
+        inputs['competitor_distance'] = np.array([competition_data['nearest_distance']])
+    return round(float(calculate_location_scores(**inputs)[0]), 1)
+
+# Zenginleştirme kaynağı başına zaman aşımı (saniye); None sınırsız
+SOURCE_TIMEOUTS = {
+    'address': 12.0,
+    'demographics': 5.0,
+    'traffic': 15.0,
+    'competition': 30.0,
+    'stations': 30.0,
+    'ev_data': 20.0,
+    'addresses': None
+}
+
+def location_sources(station_type=None, geocode=True, ev_data=None):
+    """
+    Tek lokasyonun zenginleştirme kaynakları. Adres, demografi ve trafik
+    birbirinden bağımsız çalışır; rekabet, EV trafiğine bağlı olduğu için
+    trafikten sonra başlar. Adres, demografi ve trafik hata verirse veya
+    zamanında yanıt vermezse ağ kullanmayan yaklaşık değerlere düşülür.
+
+    Args:
+        station_type: Rekabet analizi için istasyon tipi (None ise rekabet hesaplanmaz)
+        geocode: Adresi de çöz
+        ev_data: Önceden çekilmiş ulaşım verisi (None ise gerektiğinde çekilir)
+
+    Returns:
+        List[Source]: run_sources'a verilecek kaynaklar
+    """
+    sources = [
+        Source('demographics', analyze_demographics, ['lat', 'lon'], SOURCE_TIMEOUTS['demographics'],
+               fallback=_approximate_demographics),
+        Source('traffic', lambda lat, lon: analyze_traffic(lat, lon, ev_data), ['lat', 'lon'], SOURCE_TIMEOUTS['traffic'],
+               fallback=lambda lat, lon: _reported_traffic(lat, lon, {}))
+    ]
+    if geocode:
+        sources.append(Source('address', get_address_from_coords, ['lat', 'lon'], SOURCE_TIMEOUTS['address'],
+                              fallback=lambda lat, lon: NOT_FOUND))
+    if station_type is not None:
+        sources.append(Source(
+            'competition',
+            lambda lat, lon, traffic: analyze_competition(lat, lon, station_type, traffic['ev_traffic']),
+            ['lat', 'lon', 'traffic'],
+            SOURCE_TIMEOUTS['competition']
+        ))
+    return sources
+
+def enrich_location(lat, lon, station_type=None, geocode=True, ev_data=None):
+    """
+    Lokasyonun adres, demografi, trafik (ve istenirse rekabet) verilerini eşzamanlı toplar.
+
+    Returns:
+        Dict[str, Dict]: 'results' (kaynak adı -> sonuç), 'errors' (yedeğe
+        düşen kaynaklar) ve 'elapsed' (kaynak başına saniye)
+    """
+    enriched = run_sources(location_sources(station_type, geocode, ev_data), [{'lat': lat, 'lon': lon}])[0]
+    for name, error in enriched['errors'].items():
+        logger.warning("%s kaynağı kullanılamadı, yaklaşık değer kullanılıyor: %s", name, error)
+    return enriched
+
+def analyze_location(lat, lon, investment_budget, geocode=False, ev_data=None, station_type=DEFAULT_STATION_TYPE):
+    """Tek bir lokasyon için demografi, rekabet, trafik, puan ve finansal projeksiyonu hesaplar"""
+    enriched = enrich_location(lat, lon, station_type, geocode, ev_data)['results']
+    demo_data = enriched['demographics']
+    traffic_data = enriched['traffic']
+    comp_data = enriched['competition']
+    projection = calculate_financial_projection(
+        demo_data['city_name'],
+        demo_data['ev_ownership'],
+        comp_data,
+        investment_budget
+    )
+    energy = calculate_energy_costs(demo_data['city_name'], comp_data, station_type)
+    
+    result = {
+        'lat': lat,
+        'lon': lon,
+        'city_name': demo_data['city_name'],
+        'population': demo_data['population'],
+        'ev_ownership': demo_data['ev_ownership'],
+        'catchment_population': demo_data.get('catchment_population'),
+        'nearby_stations': comp_data['nearby_stations'],
+        'nearest_distance': comp_data['nearest_distance'],
+        'market_share': comp_data['market_share'],
+        'occupancy_rate': comp_data['occupancy_rate'],
+        'p95_waiting_time': comp_data['p95_waiting_time'],
+        'turned_away_rate': comp_data['turned_away_rate'],
+        'daily_traffic': traffic_data['daily_traffic'],
+        'ev_traffic': traffic_data['ev_traffic'],
+        'energy_cost_y1': energy['energy_cost'][0],
+        'peak_kw': energy['peak_kw'][0],
+        'curtailed_sessions': energy['curtailed_sessions'][0],
+        'score': score_location(lat, lon, comp_data),
+        'roi': projection['roi']
+    }
+    for year, (revenue, cost) in enumerate(zip(projection['revenues'], projection['costs']), start=1):
+        result[f'revenue_y{year}'] = revenue
+        result[f'cost_y{year}'] = cost
+    if geocode:
+        result['address'] = enriched['address']
+    return result
+
+def score_points(lats, lons, nearest_distance):
+    """score_location'ın toplu sürümü; noktalar en yakın şehre göre gruplanıp tek seferde puanlanır"""
+    cities = nearest_cities(lats, lons)
+    scores = np.empty(len(lats), dtype=np.float64)
+    for city in np.unique(cities):
+        mask = cities == city
+        inputs = grid_inputs(city, lats[mask], lons[mask], ev_ownership=_catchment_ev_share(city, lats[mask], lons[mask]))
+        _apply_observed_density(inputs, lats[mask], lons[mask])
+        inputs['competitor_distance'] = nearest_distance[mask]
+        scores[mask] = calculate_location_scores(**inputs)
+    return np.round(scores, 1)
+
+def portfolio_sources(geocode=False, ev_data=None):
+    """
+    analyze_portfolio'nun toplu kaynakları ('lats' ve 'lons' dizileri üzerinden).
+    Rakip istasyonlar zorunludur; demografi yaklaşık değerlere, ulaşım verisi
+    simülasyona, adresler NOT_FOUND'a düşebilir. Adres çözümü hız sınırına
+    uyduğundan varsayılan olarak zaman aşımsızdır; çözülen adresler önbelleğe
+    yazıldığı için kesilse bile sonraki çalıştırmalarda kullanılır.
+    """
+    sources = [
+        Source('demographics', demographics_for_points, ['lats', 'lons'], SOURCE_TIMEOUTS['demographics'],
+               fallback=lambda lats, lons: [_approximate_demographics(lat, lon) for lat, lon in zip(lats, lons)]),
+        Source('stations', station_context, ['lats', 'lons'], SOURCE_TIMEOUTS['stations'])
+    ]
+    if ev_data is None:
+        sources.append(Source('ev_data', fetch_ev_data, [], SOURCE_TIMEOUTS['ev_data'], fallback=lambda: {}))
+    if geocode:
+        sources.append(Source(
+            'addresses', lambda lats, lons: reverse_geocode_batch(list(zip(lats, lons))), ['lats', 'lons'],
+            SOURCE_TIMEOUTS['addresses'], fallback=lambda lats, lons: [NOT_FOUND] * len(lats)
+        ))
+    return sources
+
+def analyze_portfolio(lats, lons, investment_budget, geocode=False, ev_data=None, station_type=DEFAULT_STATION_TYPE, workers=1,
+                      cannibalize=True):
+    """
+    Birden çok lokasyonu tek seferde analiz eder.
+
+    Demografi, rakip istasyonlar, adresler ve (verilmemişse) ulaşım verisi
+    zaman aşımlı kaynaklar olarak eşzamanlı hazırlanır; puan ve finansal
+    projeksiyon tüm lokasyonlar için vektörel hesaplanır.
+
+    Args:
+        lats: Enlem dizisi
+        lons: Boylam dizisi
+        investment_budget: Lokasyon başına yatırım bütçesi (TL)
+        geocode: Adresleri de çöz
+        ev_data: Önceden çekilmiş ulaşım verisi (None ise çekilir)
+        station_type: Kuyruk modelinde kullanılacak istasyon tipi
+        workers: Kuyruk simülasyonu için işçi süreç sayısı (1 ise süreç havuzu kullanılmaz)
+        cannibalize: Lokasyonları tek bir ağ sayıp pazar paylarını birbirleriyle
+            örtüşmelerine göre düşür (False ise her lokasyon bağımsız analiz edilir)
+
+    Returns:
+        pd.DataFrame: Lokasyon başına bir satır; analyze_location ile aynı sütunlar
+    """
+    lats = np.asarray(lats, dtype=np.float64)
+    lons = np.asarray(lons, dtype=np.float64)
+    if len(lats) == 0:
+        return pd.DataFrame()
+    
+    enriched = run_sources(portfolio_sources(geocode, ev_data), [{'lats': lats, 'lons': lons}])[0]
+    for name, error in enriched['errors'].items():
+        logger.warning("%s kaynağı kullanılamadı, yaklaşık değer kullanılıyor: %s", name, error)
+    demographics = pd.DataFrame(enriched['results']['demographics'])
+    context = enriched['results']['stations']
+    if ev_data is None:
+        ev_data = enriched['results']['ev_data'] or {}
+    
+    traffic = traffic_for_points(lats, lons, ev_data)
+    # Ağın diğer lokasyonlarının çekim alanından aldığı pay; oturumlar kuyruk ve
+    # enerji modellerinden, pazar payı projeksiyondan önce düşülür
+    if cannibalize:
+        overlap = cannibalization(lats, lons)
+    else:
+        overlap = pd.DataFrame({'own_overlap': 0.0, 'retention': 1.0}, index=np.arange(len(lats)))
+    competition = competition_for_points(
+        lats, lons, station_type, traffic['ev_traffic'].to_numpy(), context=context, workers=workers,
+        retention=overlap['retention'].to_numpy()
+    )
+    if cannibalize:
+        market_share = np.round(competition['market_share'] * overlap['retention'], 1)
+    else:
+        market_share = competition['market_share']
+    
+    growth = demographics['city_name'].map(CITY_GROWTH_FACTORS).fillna(DEFAULT_GROWTH_FACTOR)
+    energy = energy_model(served_sessions(competition).to_numpy(), station_type, years=1, growth_factor=growth.to_numpy())
+    revenues, costs, roi = projection_arrays(
+        growth,
+        demographics['ev_ownership'],
+        market_share,
+        investment_budget
+    )
+    
+    result = pd.DataFrame({
+        'lat': lats,
+        'lon': lons,
+        'city_name': demographics['city_name'],
+        'population': demographics['population'],
+        'ev_ownership': demographics['ev_ownership'],
+        # Raster dışındaki (veya rastersız şehirlerdeki) noktalar NaN; sütun her zaman ondalıklıdır
+        'catchment_population': (
+            demographics['catchment_population'].astype(np.float64) if 'catchment_population' in demographics else np.nan
+        ),
+        'nearby_stations': competition['nearby_stations'],
+        'nearest_distance': competition['nearest_distance'],
+        'market_share': market_share,
+        'own_overlap': np.round(overlap['own_overlap'], 2),
+        'retention': np.round(overlap['retention'], 3),
+        'occupancy_rate': competition['occupancy_rate'],
+        'p95_waiting_time': competition['p95_waiting_time'],
+        'turned_away_rate': competition['turned_away_rate'],
+        'daily_traffic': traffic['daily_traffic'],
+        'ev_traffic': traffic['ev_traffic'],
+        'energy_cost_y1': np.trunc(energy['energy_cost'][:, 0]).astype(np.int64),
+        'peak_kw': np.round(energy['peak_kw'][:, 0], 1),
+        'curtailed_sessions': np.round(energy['curtailed_sessions'][:, 0]).astype(np.int64),
+        'score': score_points(lats, lons, competition['nearest_distance'].to_numpy()),
+        'roi': np.round(roi, 1)
+    })
+    for year in range(revenues.shape[1]):
+        result[f'revenue_y{year + 1}'] = revenues[:, year]
+        result[f'cost_y{year + 1}'] = costs[:, year]
+    if geocode:
+        result['address'] = enriched['results']['addresses']
+    return result
+
+def portfolio_summary(table, investment_budget):
+    """
+    analyze_portfolio sonucundan portföy geneli finansal özet üretir.
+
+    Args:
+        table: analyze_portfolio sonucu
+        investment_budget: Lokasyon başına yatırım bütçesi (TL)
+
+    Returns:
+        dict: Toplam yatırım, yıllık toplam gelir/maliyet, kümülatif nakit
+        akışı ve portföy ROI'si
+    """
+    revenue_cols = sorted(c for c in table.columns if c.startswith('revenue_y'))
+    cost_cols = sorted(c for c in table.columns if c.startswith('cost_y'))
+    revenues = table[revenue_cols].sum().to_numpy(dtype=np.float64)
+    costs = table[cost_cols].sum().to_numpy(dtype=np.float64)
+    total_investment = investment_budget * len(table)
+    total_cost = costs.sum() + total_investment
+    
+    return {
+        'n_sites': len(table),
+        'total_investment': total_investment,
+        'revenues': revenues.tolist(),
+        'costs': costs.tolist(),
+        'cash_flow': (np.cumsum(revenues - costs) - total_investment).tolist(),
+        'roi': round(float((revenues.sum() - total_cost) / total_cost * 100), 1) if total_cost else 0.0
+    }
@@ -1,21 +1,32 @@
 import streamlit as st
-import pandas as pd
-import folium
-from streamlit_folium import folium_static, st_folium
-from folium import plugins
-import plotly.express as px
-import plotly.graph_objects as go
-import numpy as np
-from datetime import datetime
-import requests
-from dotenv import load_dotenv
-import os
-from geopy.geocoders import Nominatim
-from folium.plugins import Draw, MousePosition
-import json
-import random
-import urllib.request
-import ssl
+
+from startup import lazy_module
+
+# Ağır görselleştirme bağımlılıkları ilk kullanımda yüklenir
+go = lazy_module('plotly.graph_objects')
+streamlit_folium = lazy_module('streamlit_folium')
+map_layers = lazy_module('map_layers')
+
+from analysis import (
+    analyze_competition,
+    analyze_portfolio,
+    calculate_energy_costs,
+    calculate_financial_projection,
+    calculate_projection_bands,
+    enrich_location,
+    portfolio_summary
+)
+from geocode import NOT_FOUND, reverse_geocode_batch
+from heatmap import CITY_COORDS, compute_city_grid, heatmap_points, top_cells
+from ingest import load_population_csv, load_province_population
+from optimizer import MAX_EXACT_CANDIDATES, optimize_sites
+from pipeline import Pipeline
+from shared_cache import get_shared_cache
+from cannibalization import SiteNetwork
+from points import PointStore, point_keys, read_point_file
+from queueing import sweep
+from regions import has_boundaries, missing_boundaries
+from stations import load_station_coords, nearest_station_distance
 
 # Sayfa yapılandırması
 st.set_page_config(
@@ -122,261 +133,30 @@ def create_metric_card(title: str, value: str, delta: str = None):
         </div>
     """, unsafe_allow_html=True)
 
-def get_address_from_coords(lat, lon):
-    """Koordinatlardan adres bilgisini alır"""
-    try:
-        geolocator = Nominatim(user_agent="ev_charger_app")
-        location = geolocator.reverse((lat, lon), language="tr")
-        return location.address
-    except:
-        return "Adres bulunamadı"
-
-def create_map(center_lat, center_lon, selected_points=None):
-    """Etkileşimli harita oluşturur"""
-    m = folium.Map(location=[center_lat, center_lon], zoom_start=12)
-    
-    # Fare pozisyonu gösterici ekle
-    MousePosition().add_to(m)
-    
-    # Haritaya çizim kontrolü ekle
-    draw_control = Draw(
-        draw_options={
-            'polyline': False,
-            'rectangle': False,
-            'polygon': False,
-            'circle': False,
-            'marker': True,
-            'circlemarker': False,
-        },
-        edit_options={'edit': False}
-    )
-    draw_control.add_to(m)
-
-    # Tıklama olayını yakalayan JavaScript kodu
-    m.add_child(folium.Element("""
-        <script>
-        document.addEventListener('DOMContentLoaded', function() {
-            setTimeout(function() {
-                var map = document.querySelector('#map');
-                map.addEventListener('click', function(e) {
-                    var lat = e.latlng.lat;
-                    var lng = e.latlng.lng;
-                    new L.Marker([lat, lng]).addTo(map);
-                    window.parent.postMessage({
-                        'type': 'map_click',
-                        'lat': lat,
-                        'lng': lng
-                    }, '*');
-                });
-            }, 1000);
-        });
-        </script>
-    """))
-    
-    # Mevcut seçili noktaları ekle
-    if selected_points:
-        for point in selected_points:
-            folium.Marker(
-                location=[point['lat'], point['lon']],
-                popup=point['address'],
-                icon=folium.Icon(color='red', icon='info-sign')
-            ).add_to(m)
-    
-    return m
-
-def fetch_ev_data():
-    """Ulaşım verilerini API'den çeker"""
-    try:
-        # SSL sertifika doğrulamasını devre dışı bırak (sadece test için)
-        context = ssl._create_unverified_context()
-        
-        url = 'https://ulasav.csb.gov.tr/api/3/action/datastore_search?resource_id=6ebdc521-c96c-4ebf-8695-88f3af494d86'
-        
-        # API isteği
-        request = urllib.request.Request(url)
-        
-        # API yanıtını al
-        with urllib.request.urlopen(request, context=context) as response:
-            data = response.read()
-            return json.loads(data)
-    except Exception as e:
-        st.error(f"Veri çekilirken hata oluştu: {str(e)}")
-        return None
-
-def analyze_traffic(lat, lon):
-    """Seçilen konuma göre trafik analizi yapar"""
-    try:
-        # API'den verileri çek
-        data = fetch_ev_data()
-        if data and 'result' in data:
-            # Gerçek veriler varsa kullan
-            return {
-                'daily_traffic': data['result'].get('daily_traffic', random.randint(8000, 15000)),
-                'peak_hours': {
-                    'morning': '08:00-10:00',
-                    'evening': '17:00-19:00'
-                },
-                'weekend_density': data['result'].get('weekend_density', random.randint(50, 80)),
-                'ev_traffic': data['result'].get('ev_traffic', random.randint(100, 500)),
-                'traffic_growth': data['result'].get('traffic_growth', random.randint(5, 15))
-            }
-    except:
-        pass
-    
-    # API verisi alınamazsa simüle edilmiş veri döndür
-    return {
-        'daily_traffic': random.randint(8000, 15000),
-        'peak_hours': {
-            'morning': '08:00-10:00',
-            'evening': '17:00-19:00'
-        },
-        'weekend_density': random.randint(50, 80),
-        'ev_traffic': random.randint(100, 500),
-        'traffic_growth': random.randint(5, 15)
-    }
-
-# Excel dosyasını oku
-@st.cache_data
+# Nüfus verisini Feather önbelleğinden oku (kaynak dosya hash'i değişince yeniden üretilir)
+@st.cache_resource
 def load_population_data():
+    """
+    Nüfus verisini yükler. veriler/yenianaliz.csv varsa onu, yoksa
+    analiz.xlsx / analiz2.xls il tablolarını döndürür. Dönen DataFrame
+    oturumlar arasında paylaşılır; değiştirilmemelidir.
+    """
     try:
-        # CSV dosyasını oku ve sütun isimlerini düzelt
-        df = pd.read_csv('veriler/yenianaliz.csv', encoding='utf-8')
-        
-        # Sütun isimlerini temizle ve düzelt
-        df.columns = df.columns.str.strip()
-        
-        # Tarih sütununu string olarak tut
-        if 'İl ve cinsiyete göre il/ilçe merkezi, belde/köy nüfusu ve nüfus yoğunluğu, 2007-2024' in df.columns:
-            df['Yil'] = df['İl ve cinsiyete göre il/ilçe merkezi, belde/köy nüfusu ve nüfus yoğunluğu, 2007-2024'].astype(str)
-            df = df.drop('İl ve cinsiyete göre il/ilçe merkezi, belde/köy nüfusu ve nüfus yoğunluğu, 2007-2024', axis=1)
-        
-        # Sayısal sütunları düzelt
-        numeric_columns = ['Toplam_Nufus', 'Nufus_Yogunlugu', 'Sehir_Nufus', 'Kirsal_Nufus', 
-                         'Nufus_Artis_Hizi', 'EV_Sahiplik_Orani', 'Isyeri_Yogunlugu']
-        
-        for col in numeric_columns:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col].astype(str).str.replace(',', '').str.replace('.', ''), errors='coerce')
-        
-        st.write("Veri seti sütunları:", df.columns.tolist())  # Debug için sütun isimlerini göster
+        df = load_population_csv()
+        if df is None:
+            df = load_province_population()
         return df
     except Exception as e:
         st.error(f"Veri dosyası okunurken hata oluştu: {str(e)}")
-        st.write("Hata detayı:", e)  # Debug için hata detayını göster
         return None
 
-def analyze_demographics(lat, lon):
-    """Seçilen konuma göre demografik analiz yapar"""
-    # Şehir koordinatları ve isimleri
-    cities = {
-        "İstanbul": {"lat": 41.0082, "lon": 28.9784},
-        "Ankara": {"lat": 39.9334, "lon": 32.8597},
-        "İzmir": {"lat": 38.4237, "lon": 27.1428},
-        "Bursa": {"lat": 40.1885, "lon": 29.0610},
-        "Antalya": {"lat": 36.8969, "lon": 30.7133}
-    }
-    
-    # En yakın şehri bul
-    closest_city = min(cities.items(), key=lambda x: ((lat - x[1]["lat"])**2 + (lon - x[1]["lon"])**2)**0.5)[0]
-    
-    # Şehirlere göre yaklaşık değerler
-    city_data = {
-        "İstanbul": {
-            "population": 15800000,
-            "density": 2900,
-            "urban_population": 15200000,
-            "rural_population": 600000,
-            "population_growth": 2.5,
-            "ev_ownership": 8,
-            "business_density": 450
-        },
-        "Ankara": {
-            "population": 5700000,
-            "density": 2100,
-            "urban_population": 5300000,
-            "rural_population": 400000,
-            "population_growth": 1.8,
-            "ev_ownership": 6,
-            "business_density": 350
-        },
-        "İzmir": {
-            "population": 4400000,
-            "density": 1800,
-            "urban_population": 4000000,
-            "rural_population": 400000,
-            "population_growth": 1.5,
-            "ev_ownership": 5,
-            "business_density": 300
-        },
-        "Bursa": {
-            "population": 3100000,
-            "density": 1500,
-            "urban_population": 2800000,
-            "rural_population": 300000,
-            "population_growth": 1.7,
-            "ev_ownership": 4,
-            "business_density": 250
-        },
-        "Antalya": {
-            "population": 2500000,
-            "density": 1200,
-            "urban_population": 2200000,
-            "rural_population": 300000,
-            "population_growth": 2.2,
-            "ev_ownership": 3,
-            "business_density": 200
-        }
-    }
-    
-    # Seçilen şehir için veriyi al
-    data = city_data.get(closest_city, {
-        "population": random.randint(1000000, 2000000),
-        "density": random.randint(500, 1000),
-        "urban_population": random.randint(800000, 1500000),
-        "rural_population": random.randint(100000, 300000),
-        "population_growth": round(random.uniform(1.0, 2.0), 1),
-        "ev_ownership": random.randint(2, 5),
-        "business_density": random.randint(100, 200)
-    })
-    
-    # Küçük rastgsal değişiklikler ekle
-    data = {k: v * (1 + random.uniform(-0.05, 0.05)) if isinstance(v, (int, float)) else v 
-            for k, v in data.items()}
-    
-    return {
-        'city_name': closest_city,
-        'population': int(data['population']),
-        'density': int(data['density']),
-        'urban_population': int(data['urban_population']),
-        'rural_population': int(data['rural_population']),
-        'population_growth': round(data['population_growth'], 1),
-        'ev_ownership': round(data['ev_ownership'], 1),
-        'business_density': int(data['business_density'])
-    }
-
-def analyze_competition(lat, lon):
-    """Seçilen konuma göre rekabet analizi yapar"""
-    return {
-        'nearby_stations': random.randint(1, 5),
-        'nearest_distance': round(random.uniform(0.5, 5.0), 1),
-        'occupancy_rate': random.randint(60, 90),
-        'avg_waiting_time': random.randint(5, 20),
-        'market_share': random.randint(10, 40)
-    }
-
 def create_traffic_chart(traffic_data):
     """Trafik yoğunluğu grafiği oluşturur"""
-    hours = list(range(24))
-    # Saatlik trafik simülasyonu
-    traffic = [
-        max(0, 100 + 50 * np.sin((h - 8) * np.pi / 12) + random.randint(-20, 20))
-        for h in hours
-    ]
-    
+    # Saatlik profil trafik deposunun önceden hesaplanmış özetlerinden gelir
     fig = go.Figure()
     fig.add_trace(go.Scatter(
-        x=hours,
-        y=traffic,
+        x=list(range(24)),
+        y=traffic_data['hourly_profile'],
         fill='tozeroy',
         line=dict(color='#2E86C1'),
         name='Trafik Yoğunluğu'
@@ -391,59 +171,360 @@ def create_traffic_chart(traffic_data):
     )
     return fig
 
-def calculate_financial_projection(city_name, ev_ownership, competition_data, investment_budget):
-    """Finansal projeksiyon hesaplar"""
-    # Şehir bazlı büyüme faktörleri
-    city_growth_factors = {
-        "İstanbul": 1.4,
-        "Ankara": 1.3,
-        "İzmir": 1.25,
-        "Bursa": 1.2,
-        "Antalya": 1.15
-    }
+# Kenar çubuğunda bir sayfada listelenecek lokasyon sayısı
+POINTS_PER_PAGE = 10
+
+# Optimum lokasyon adaylarının üretildiği ızgara çözünürlüğü (m);
+# daha sık ızgara kapsama matrisini gereksiz yere büyütür
+OPTIMIZER_RESOLUTION_M = 500
+
+def create_fan_chart(bands):
+    """Kümülatif nakit akışı için P10/P50/P90 yelpaze grafiği oluşturur"""
+    labels = [f'{y}. Yıl' for y in bands['years']]
     
-    growth_factor = city_growth_factors.get(city_name, 1.1)
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=labels,
+        y=bands['p90'],
+        line=dict(width=0),
+        showlegend=False,
+        hoverinfo='skip'
+    ))
+    fig.add_trace(go.Scatter(
+        x=labels,
+        y=bands['p10'],
+        fill='tonexty',
+        fillcolor='rgba(46, 134, 193, 0.25)',
+        line=dict(width=0),
+        name='P10-P90 Aralığı'
+    ))
+    fig.add_trace(go.Scatter(
+        x=labels,
+        y=bands['p50'],
+        line=dict(color='#2E86C1', width=3),
+        name='Medyan (P50)'
+    ))
+    fig.add_hline(y=0, line_dash='dash', line_color='#E74C3C')
+    fig.update_layout(
+        title='Kümülatif Nakit Akışı Belirsizlik Bandı',
+        yaxis_title='TL',
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        margin=dict(l=20, r=20, t=40, b=20),
+        height=300
+    )
+    return fig
+
+def create_projection_chart(projection, city_name):
+    """3 yıllık gelir ve maliyet çubuk grafiği oluşturur"""
+    fig = go.Figure()
     
-    # EV sahiplik oranına göre potansiyel müşteri faktörü
-    ev_factor = ev_ownership / 5  # normalize
+    # Gelir çubuğu
+    fig.add_trace(go.Bar(
+        name='Tahmini Gelir',
+        x=['1. Yıl', '2. Yıl', '3. Yıl'],
+        y=projection['revenues'],
+        marker_color='#2E86C1',
+        text=[f'{x:,.0f} ₺' for x in projection['revenues']],
+        textposition='auto'
+    ))
+    
+    # Maliyet çubuğu
+    fig.add_trace(go.Bar(
+        name='İşletme Maliyeti',
+        x=['1. Yıl', '2. Yıl', '3. Yıl'],
+        y=projection['costs'],
+        marker_color='#E74C3C',
+        text=[f'{x:,.0f} ₺' for x in projection['costs']],
+        textposition='auto'
+    ))
     
-    # Rekabet durumuna göre pazar payı faktörü
-    market_share = competition_data['market_share'] / 100
+    # Grafik düzeni
+    fig.update_layout(
+        barmode='group',
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        margin=dict(l=20, r=20, t=40, b=20),
+        height=300,
+        yaxis_title='TL',
+        title=f"{city_name} İli 3 Yıllık Finansal Projeksiyon"
+    )
+    return fig
+
+def create_population_chart(demo_data):
+    """Şehir-kırsal nüfus dağılımı grafiği oluşturur"""
+    fig = go.Figure(data=[
+        go.Bar(
+            x=['Şehir Merkezi', 'Kırsal Kesim'],
+            y=[demo_data['urban_population'], demo_data['rural_population']],
+            marker_color=['#2E86C1', '#28B463']
+        )
+    ])
+    fig.update_layout(
+        title='Şehir-Kırsal Nüfus Dağılımı',
+        height=400,
+        yaxis_title='Nüfus',
+        showlegend=False
+    )
+    return fig
+
+def create_occupancy_gauge(comp_data):
+    """Doluluk oranı göstergesi oluşturur"""
+    fig = go.Figure(go.Indicator(
+        mode = "gauge+number",
+        value = comp_data['occupancy_rate'],
+        title = {'text': "Doluluk Oranı"},
+        gauge = {
+            'axis': {'range': [None, 100]},
+            'bar': {'color': "#2E86C1"},
+            'steps': [
+                {'range': [0, 50], 'color': "lightgray"},
+                {'range': [50, 75], 'color': "gray"},
+                {'range': [75, 100], 'color': "darkgray"}
+            ]
+        }
+    ))
+    fig.update_layout(height=300)
+    return fig
+
+# Kuyruk duyarlılık analizinde denenen soket sayıları
+QUEUE_SWEEP_CHARGERS = range(1, 9)
+
+def create_queue_chart(table):
+    """Soket sayısına göre doluluk ve P95 bekleme süresi grafiğini oluşturur"""
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=table['chargers'],
+        y=table['occupancy'] * 100,
+        name='Doluluk (%)',
+        marker_color='#2E86C1'
+    ))
+    fig.add_trace(go.Scatter(
+        x=table['chargers'],
+        y=table['p95_wait'],
+        name='P95 Bekleme (dk)',
+        yaxis='y2',
+        line=dict(color='#E74C3C', width=3)
+    ))
+    fig.update_layout(
+        title='Soket Sayısına Göre Kuyruk Performansı',
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        margin=dict(l=20, r=20, t=40, b=20),
+        height=300,
+        xaxis_title='Soket Sayısı',
+        yaxis=dict(title='%', range=[0, 100]),
+        yaxis2=dict(title='dakika', overlaying='y', side='right')
+    )
+    return fig
+
+def create_energy_chart(energy):
+    """İlk yıl aylık en yüksek çekilen güç ve şebeke bağlantı gücü grafiğini oluşturur"""
+    months = ['Oca', 'Şub', 'Mar', 'Nis', 'May', 'Haz', 'Tem', 'Ağu', 'Eyl', 'Eki', 'Kas', 'Ara']
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=months,
+        y=energy['monthly_peak_kw'],
+        name='Aylık Zirve Güç',
+        marker_color='#2E86C1'
+    ))
+    fig.add_hline(
+        y=energy['capacity_kw'],
+        line_dash='dash',
+        line_color='#E74C3C',
+        annotation_text='Bağlantı Gücü'
+    )
+    fig.update_layout(
+        title='Aylık En Yüksek Çekilen Güç',
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        margin=dict(l=20, r=20, t=40, b=20),
+        height=300,
+        yaxis_title='kW',
+        showlegend=False
+    )
+    return fig
+
+def create_portfolio_chart(summary):
+    """Portföyün yıllık net nakit akışı ve kümülatif nakit akışı grafiğini oluşturur"""
+    labels = [f'{y}. Yıl' for y in range(1, len(summary['revenues']) + 1)]
+    net = [r - c for r, c in zip(summary['revenues'], summary['costs'])]
     
-    # Baz gelir ve maliyet hesaplamaları (yatırım bütçesine göre normalize)
-    base_revenue = investment_budget * 0.4  # İlk yıl için beklenen gelir
-    base_cost = investment_budget * 0.2     # İlk yıl için beklenen maliyet
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=labels,
+        y=net,
+        name='Yıllık Net Nakit Akışı',
+        marker_color='#2E86C1'
+    ))
+    fig.add_trace(go.Scatter(
+        x=labels,
+        y=summary['cash_flow'],
+        name='Kümülatif Nakit Akışı',
+        line=dict(color='#E74C3C', width=3)
+    ))
+    fig.add_hline(y=0, line_dash='dash', line_color='gray')
+    fig.update_layout(
+        title=f"{summary['n_sites']} Lokasyonluk Portföy Nakit Akışı",
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        margin=dict(l=20, r=20, t=40, b=20),
+        height=300,
+        yaxis_title='TL'
+    )
+    return fig
+
+def is_degraded(enriched):
+    """Zenginleştirmede yedeğe düşen kaynak veya çözülemeyen adres var mı"""
+    return bool(enriched['errors']) or enriched['results'].get('address') == NOT_FOUND
+
+def build_pipeline():
+    """
+    Arayüzün hesaplama grafiğini kurar. Her aşama yalnızca bildirdiği
+    girdiler (konum, bütçe, istasyon tipi, şehir) değiştiğinde yeniden
+    hesaplanır; örneğin bütçe değişikliği konuma bağlı analizleri tekrarlamaz.
+    Yerel önbellekte bulunmayan sonuçlar tüm oturumların paylaştığı süreç
+    genelindeki önbellekten alınır.
+    """
+    graph = Pipeline(shared=get_shared_cache())
+    
+    # Konuma bağlı analizler: adres, demografi ve trafik kaynakları eşzamanlı ve zaman aşımlı toplanır.
+    # Yedeğe düşen kaynak varsa sonuç (ve ondan türetilenler) kısa süre sonra yeniden denenir
+    graph.add_stage('enrichment', enrich_location, ['lat', 'lon'], transient=is_degraded)
+    # Çözülemeyen adres depoya yedek metin olarak değil boş olarak yazılır
+    graph.add_stage(
+        'address',
+        lambda enriched: '' if 'address' in enriched['errors'] or enriched['results']['address'] == NOT_FOUND
+        else enriched['results']['address'],
+        ['enrichment']
+    )
+    graph.add_stage('demographics', lambda enriched: enriched['results']['demographics'], ['enrichment'])
+    graph.add_stage('traffic', lambda enriched: enriched['results']['traffic'], ['enrichment'])
+    # Doluluk ve bekleme süreleri istasyon tipine, EV trafiğine ve ağ içi örtüşmeden kalan
+    # talebe (retention) bağlı kuyruk modelinden gelir; enerji modeli de bu oturumları kullanır.
+    # Sunucu içinden süreç havuzu açılmaz, simülasyonlar oturumun iş parçacığında çalışır
+    graph.add_stage(
+        'competition',
+        lambda lat, lon, station_type, traffic, retention: analyze_competition(
+            lat, lon, station_type, traffic['ev_traffic'], retention
+        ),
+        ['lat', 'lon', 'station_type', 'traffic', 'retention']
+    )
+    graph.add_stage(
+        'queue_sweep',
+        lambda comp, station_type: sweep([
+            {'daily_sessions': comp['daily_sessions'], 'station_type': station_type, 'chargers': chargers}
+            for chargers in QUEUE_SWEEP_CHARGERS
+        ], workers=1),
+        ['competition', 'station_type']
+    )
     
-    # 3 yıllık projeksiyon
-    revenues = [
-        int(base_revenue * (1 + ev_factor) * market_share),
-        int(base_revenue * (1 + ev_factor) * market_share * growth_factor),
-        int(base_revenue * (1 + ev_factor) * market_share * growth_factor * growth_factor)
-    ]
+    # Ağdaki diğer seçili lokasyonların örtüşmesiyle düşürülmüş pazar payı
+    graph.add_stage(
+        'network_share',
+        lambda comp, retention: {**comp, 'market_share': round(comp['market_share'] * retention, 1)},
+        ['competition', 'retention']
+    )
     
-    costs = [
-        int(base_cost),
-        int(base_cost * 1.1),  # %10 maliyet artışı
-        int(base_cost * 1.2)   # %20 maliyet artışı
-    ]
+    # Bütçeye bağlı finansal projeksiyon
+    graph.add_stage(
+        'projection',
+        lambda demo, comp, budget: calculate_financial_projection(demo['city_name'], demo['ev_ownership'], comp, budget),
+        ['demographics', 'network_share', 'budget']
+    )
+    graph.add_stage(
+        'bands',
+        lambda lat, lon, demo, comp, budget: calculate_projection_bands(
+            lat, lon, demo['city_name'], demo['ev_ownership'], comp, budget
+        ),
+        ['lat', 'lon', 'demographics', 'network_share', 'budget']
+    )
     
-    # ROI hesaplama
-    total_revenue = sum(revenues)
-    total_cost = sum(costs) + investment_budget
-    roi = ((total_revenue - total_cost) / total_cost) * 100
+    graph.add_stage(
+        'energy',
+        lambda demo, comp, station_type: calculate_energy_costs(demo['city_name'], comp, station_type),
+        ['demographics', 'competition', 'station_type']
+    )
     
-    return {
-        'revenues': revenues,
-        'costs': costs,
-        'roi': round(roi, 1)
-    }
+    # Tüm seçili lokasyonlar için toplu portföy analizi
+    graph.add_stage(
+        'portfolio',
+        lambda points, budget, station_type: analyze_portfolio(
+            points.lats, points.lons, budget, station_type=station_type, workers=1
+        ).assign(address=points.addresses),
+        ['points', 'budget', 'station_type']
+    )
+    graph.add_stage('portfolio_summary', portfolio_summary, ['portfolio', 'budget'])
+    graph.add_stage('portfolio_chart', create_portfolio_chart, ['portfolio_summary'])
+    
+    # Grafikler
+    graph.add_stage(
+        'projection_chart',
+        lambda projection, demo: create_projection_chart(projection, demo['city_name']),
+        ['projection', 'demographics']
+    )
+    graph.add_stage('fan_chart', create_fan_chart, ['bands'])
+    graph.add_stage('traffic_chart', create_traffic_chart, ['traffic'])
+    graph.add_stage('population_chart', create_population_chart, ['demographics'])
+    graph.add_stage('occupancy_gauge', create_occupancy_gauge, ['competition'])
+    graph.add_stage('queue_chart', create_queue_chart, ['queue_sweep'])
+    graph.add_stage('energy_chart', create_energy_chart, ['energy'])
+    
+    # Harita ve şehir geneli hesaplamalar
+    graph.add_stage(
+        'heat_data',
+        lambda city, resolution: None if resolution is None else heatmap_points(
+            compute_city_grid(city, resolution, competitor_distance_fn=nearest_station_distance)
+        ),
+        ['city', 'heatmap_resolution']
+    )
+    # Taban harita şablonu yalnızca şehir değişince, katman verisi yalnızca içeriği değişince hazırlanır
+    # Harita nesnesi değiştirilebilir olduğundan oturumlar arasında paylaşılmaz
+    graph.add_stage('base_map', lambda city: map_layers.create_base_map(city), ['city'], shared=False)
+    graph.add_stage(
+        'layer_data',
+        lambda points, heat_data, show_stations: map_layers.layer_data(
+            points,
+            heat_data,
+            load_station_coords() if show_stations else None
+        ),
+        ['points', 'heat_data', 'show_stations'],
+        size=lambda data: map_layers.layer_data_nbytes(data)
+    )
+    graph.add_stage(
+        'optimized_sites',
+        lambda city, budget, station_type, radius_km, n_candidates, exact: optimize_sites(
+            top_cells(
+                compute_city_grid(city, OPTIMIZER_RESOLUTION_M, competitor_distance_fn=nearest_station_distance),
+                min(n_candidates, MAX_EXACT_CANDIDATES) if exact else n_candidates
+            ),
+            budget,
+            station_type,
+            radius_km=radius_km,
+            exact=exact
+        ),
+        ['city', 'budget', 'station_type', 'coverage_radius', 'n_candidates', 'exact']
+    )
+    return graph
 
 def main():
     st.title("🔌 Elektrikli Araç Şarj İstasyonu Yatırım Analizi")
+    if not has_boundaries():
+        st.warning(
+            "İl/ilçe sınır dosyaları bulunamadı (" + ", ".join(missing_boundaries()) + "). "
+            "Demografik veriler en yakın büyük şehirden tahmin ediliyor; kurulum için README'ye bakın."
+        )
     
-    # Session state için seçili noktaları başlat
+    # Session state için seçili noktaları ve hesaplama grafiğini başlat
     if 'selected_points' not in st.session_state:
-        st.session_state.selected_points = []
+        st.session_state.selected_points = PointStore()
+    selected_points = st.session_state.selected_points
+    if 'pipeline' not in st.session_state:
+        st.session_state.pipeline = build_pipeline()
+    graph = st.session_state.pipeline
+    if 'network' not in st.session_state:
+        st.session_state.network = SiteNetwork()
+    network = st.session_state.network
     
     # Sidebar
     with st.sidebar:
@@ -452,19 +533,10 @@ def main():
         
         selected_city = st.selectbox(
             "Şehir Seçin",
-            ["İstanbul", "Ankara", "İzmir", "Bursa", "Antalya"],
+            list(CITY_COORDS),
             help="Analiz yapmak istediğiniz şehri seçin"
         )
         
-        # Şehir koordinatları
-        city_coords = {
-            "İstanbul": [41.0082, 28.9784],
-            "Ankara": [39.9334, 32.8597],
-            "İzmir": [38.4237, 27.1428],
-            "Bursa": [40.1885, 29.0610],
-            "Antalya": [36.8969, 30.7133]
-        }
-        
         investment_budget = st.number_input(
             "Yatırım Bütçesi (TL)",
             min_value=100000,
@@ -480,20 +552,62 @@ def main():
             help="Kurulacak şarj istasyonu tipini seçin"
         )
         
+        show_heatmap = st.checkbox(
+            "Uygunluk Isı Haritası",
+            value=False,
+            help="Şehir genelinde lokasyon puanlarını ısı haritası olarak gösterir"
+        )
+        
+        heatmap_resolution = st.select_slider(
+            "Isı Haritası Çözünürlüğü (m)",
+            options=[50, 100, 250, 500],
+            value=100,
+            disabled=not show_heatmap
+        )
+        
+        show_stations = st.checkbox(
+            "Mevcut İstasyonlar",
+            value=False,
+            help="Rakip şarj istasyonlarını kümelenmiş olarak gösterir"
+        )
+        
         st.markdown("---")
         st.markdown("### 💡 Seçilen Lokasyonlar")
         
-        # Seçili lokasyonları listele
-        if st.session_state.selected_points:
-            for i, point in enumerate(st.session_state.selected_points):
+        # CSV/GeoJSON dosyasından toplu aday lokasyon yükleme
+        uploaded = st.file_uploader(
+            "Lokasyon Dosyası Yükle",
+            type=['csv', 'geojson', 'json'],
+            help="'lat'/'lon' sütunlu CSV veya Point nesneleri içeren GeoJSON"
+        )
+        if uploaded is not None and st.session_state.get('imported_file') != uploaded.file_id:
+            try:
+                imported = read_point_file(uploaded.getvalue(), uploaded.name)
+                added = selected_points.add_many(imported['lat'], imported['lon'], imported['address'])
+                st.session_state.imported_file = uploaded.file_id
+                st.success(f"{added} yeni lokasyon eklendi ({len(imported) - added} yinelenen/geçersiz satır atlandı)")
+            except Exception as e:
+                st.error(f"Dosya okunurken hata oluştu: {str(e)}")
+        
+        # Seçili lokasyonları sayfa sayfa listele
+        if len(selected_points):
+            n_pages = (len(selected_points) - 1) // POINTS_PER_PAGE + 1
+            page = st.number_input(
+                f"Sayfa (toplam {len(selected_points):,} lokasyon)",
+                min_value=1,
+                max_value=n_pages,
+                value=n_pages
+            ) if n_pages > 1 else 1
+            for point in selected_points.page(page - 1, POINTS_PER_PAGE):
+                i = point['position']
                 with st.container():
                     st.markdown(f"""
                     **Lokasyon {i+1}**  
-                    📍 {point['address']}  
+                    📍 {point['address'] or 'Adres çözülmedi'}  
                     🌍 Koordinatlar: {point['lat']:.4f}, {point['lon']:.4f}
                     """)
                     if st.button(f"Sil {i+1}", key=f"delete_{i}"):
-                        st.session_state.selected_points.pop(i)
+                        selected_points.remove(i)
                         st.rerun()
                 st.markdown("---")
         else:
@@ -521,14 +635,33 @@ def main():
         # Harita container'ı
         st.markdown('<div class="stCard">', unsafe_allow_html=True)
         
-        # Seçili şehrin koordinatlarını al
-        center_lat, center_lon = city_coords[selected_city]
-        
-        # Haritayı oluştur
-        m = create_map(center_lat, center_lon, st.session_state.selected_points)
+        # Taban harita şehir başına bir kez kurulur; noktalar, istasyonlar ve ısı haritası
+        # ayrı katmanlar olarak eklendiği için tarayıcıda harita yeniden yüklenmez
+        points = selected_points.snapshot()
+        # Örtüşme ağı yalnızca nokta kümesi değiştiğinde ve yalnızca farklar için güncellenir
+        if st.session_state.get('network_token') != points.token:
+            network.sync(point_keys(points.lats, points.lons).tolist(), points.lats, points.lons)
+            st.session_state.network_token = points.token
+        with st.spinner("Harita hazırlanıyor..."):
+            # st_folium haritayı ve katmanları değiştirir; önbellekteki şablon yerine kopyası,
+            # önbellekteki katman verisinden her seferinde yeniden kurulan katmanlar verilir
+            m = map_layers.fresh_map(graph.get('base_map', city=selected_city))
+            layers = map_layers.create_layers(**graph.get(
+                'layer_data',
+                city=selected_city,
+                points=points,
+                heatmap_resolution=heatmap_resolution if show_heatmap else None,
+                show_stations=show_stations
+            ))
         
         # Haritayı göster ve tıklama olayını yakala
-        map_data = st_folium(m, width=800, height=500)
+        map_data = streamlit_folium.st_folium(
+            m,
+            width=800,
+            height=500,
+            feature_group_to_add=layers or None,
+            returned_objects=['last_clicked']
+        )
         
         # Haritadan gelen veriyi kontrol et
         if map_data['last_clicked']:
@@ -536,18 +669,14 @@ def main():
                 lat = map_data['last_clicked']['lat']
                 lon = map_data['last_clicked']['lng']
                 
-                # Adres bilgisini al
-                address = get_address_from_coords(lat, lon)
-                
-                new_point = {
-                    'lat': lat,
-                    'lon': lon,
-                    'address': address
-                }
-                
-                if new_point not in st.session_state.selected_points:
-                    st.session_state.selected_points.append(new_point)
-                    st.success(f"Yeni lokasyon eklendi: {address}")
+                # Son tıklama her yeniden çalıştırmada tekrar gelir; yalnızca yeni tıklamalar işlenir
+                if (lat, lon) != st.session_state.get('last_click') and not selected_points.contains(lat, lon):
+                    st.session_state.last_click = (lat, lon)
+                    
+                    # Adres bilgisini al
+                    address = graph.get('address', lat=lat, lon=lon)
+                    selected_points.add(lat, lon, address)
+                    st.success(f"Yeni lokasyon eklendi: {address or 'Adres çözülmedi'}")
                     st.rerun()
                     
             except Exception as e:
@@ -556,29 +685,99 @@ def main():
         st.markdown('</div>', unsafe_allow_html=True)
         
         # Tüm noktaları temizleme butonu
-        if st.session_state.selected_points:
+        if len(selected_points):
             if st.button("Tüm Lokasyonları Temizle"):
-                st.session_state.selected_points = []
+                selected_points.clear()
                 st.rerun()
+        
+        # Bütçeye göre çoklu lokasyon önerisi
+        with st.expander("🧮 Bütçeye Göre Optimum Lokasyonlar"):
+            coverage_radius = st.slider("Kapsama Yarıçapı (km)", 0.5, 5.0, 2.0, step=0.5)
+            n_candidates = st.select_slider("Aday Sayısı", options=[1000, 5000, 20000, 100000], value=20000)
+            exact_mode = st.checkbox(
+                "Kesin çözüm (ILP)",
+                value=False,
+                help=f"Yalnızca en fazla {MAX_EXACT_CANDIDATES} aday için kullanılabilir"
+            )
+            
+            if st.button("Lokasyonları Öner"):
+                with st.spinner("Optimum lokasyonlar hesaplanıyor..."):
+                    st.session_state.optimized_sites = graph.get(
+                        'optimized_sites',
+                        city=selected_city,
+                        budget=investment_budget,
+                        station_type=station_type,
+                        coverage_radius=coverage_radius,
+                        n_candidates=n_candidates,
+                        exact=exact_mode
+                    )
+            
+            result = st.session_state.get('optimized_sites')
+            if result is not None:
+                st.markdown(f"""
+                    - **Önerilen Lokasyon:** {len(result['selected'])} adet
+                    - **Toplam Kurulum Maliyeti:** {result['total_cost']:,.0f} ₺
+                    - **Kapsanan Net Talep:** {result['covered_demand']:.1f} (üst sınır {result['upper_bound']:.1f})
+                """)
+                st.dataframe(result['selected'], use_container_width=True)
+                
+                if st.button("Önerilenleri Seçili Lokasyonlara Ekle"):
+                    sites = result['selected']
+                    addresses = ['' if a == NOT_FOUND else a for a in reverse_geocode_batch(zip(sites['lat'], sites['lon']))]
+                    selected_points.add_many(sites['lat'], sites['lon'], addresses)
+                    st.session_state.optimized_sites = None
+                    st.rerun()
     
     with col_analysis:
         st.markdown("### 📊 Finansal Projeksiyon")
         
-        if st.session_state.selected_points:
-            # Seçili lokasyon varsa analiz yap
-            selected_location = st.session_state.selected_points[-1]
+        portfolio_mode = len(selected_points) > 1 and st.checkbox(
+            "Portföy Modu",
+            value=False,
+            help="Tüm seçili lokasyonları tek seferde analiz eder ve karşılaştırır"
+        )
+        
+        if portfolio_mode:
+            with st.spinner("Portföy analiz ediliyor..."):
+                portfolio_inputs = {'points': points, 'budget': investment_budget, 'station_type': station_type}
+                table = graph.get('portfolio', **portfolio_inputs)
+                summary = graph.get('portfolio_summary', **portfolio_inputs)
             
-            # Demografik ve rekabet verilerini al
-            demo_data = analyze_demographics(selected_location['lat'], selected_location['lon'])
-            comp_data = analyze_competition(selected_location['lat'], selected_location['lon'])
+            create_metric_card(
+                f"Portföy ROI ({summary['n_sites']} lokasyon)",
+                f"%{summary['roi']}",
+                f"{'+' if summary['roi'] > 20 else ''}{summary['roi'] - 20:.1f}%"
+            )
+            st.markdown(f"""
+                #### 💼 Portföy Özeti
+                - **Toplam Yatırım:** {summary['total_investment']:,.0f} ₺
+                - **3 Yıllık Toplam Gelir:** {sum(summary['revenues']):,.0f} ₺
+                - **3 Yıllık Toplam Maliyet:** {sum(summary['costs']):,.0f} ₺
+                - **3. Yıl Sonu Kümülatif Nakit Akışı:** {summary['cash_flow'][-1]:,.0f} ₺
+            """)
+            st.plotly_chart(graph.get('portfolio_chart', **portfolio_inputs), use_container_width=True)
             
-            # Finansal projeksiyonu hesapla
-            projection = calculate_financial_projection(
-                demo_data['city_name'],
-                demo_data['ev_ownership'],
-                comp_data,
-                investment_budget
+            # Sütun başlıklarına tıklanarak sıralanabilir karşılaştırma tablosu
+            st.dataframe(
+                table[['address', 'city_name', 'score', 'roi', 'catchment_population', 'ev_ownership', 'market_share', 'retention', 'nearby_stations',
+                       'nearest_distance', 'occupancy_rate', 'p95_waiting_time', 'turned_away_rate',
+                       'energy_cost_y1', 'peak_kw', 'curtailed_sessions', 'daily_traffic', 'ev_traffic']].sort_values('roi', ascending=False),
+                use_container_width=True,
+                hide_index=True
             )
+        elif len(selected_points):
+            # Seçili lokasyon varsa analiz yap
+            selected_location = selected_points.last()
+            inputs = {
+                'lat': selected_location['lat'],
+                'lon': selected_location['lon'],
+                'budget': investment_budget,
+                'station_type': station_type,
+                'retention': round(network.retention(int(point_keys(selected_location['lat'], selected_location['lon']))), 3)
+            }
+            
+            # Finansal projeksiyonu hesapla (konuma bağlı analizler önbellekten gelir)
+            projection = graph.get('projection', **inputs)
             
             # ROI metrik kartı
             create_metric_card(
@@ -587,40 +786,6 @@ def main():
                 f"{'+' if projection['roi'] > 20 else ''}{projection['roi'] - 20:.1f}%"
             )
             
-            # Finansal analiz grafiği
-            fig = go.Figure()
-            
-            # Gelir çubuğu
-            fig.add_trace(go.Bar(
-                name='Tahmini Gelir',
-                x=['1. Yıl', '2. Yıl', '3. Yıl'],
-                y=projection['revenues'],
-                marker_color='#2E86C1',
-                text=[f'{x:,.0f} ₺' for x in projection['revenues']],
-                textposition='auto'
-            ))
-            
-            # Maliyet çubuğu
-            fig.add_trace(go.Bar(
-                name='İşletme Maliyeti',
-                x=['1. Yıl', '2. Yıl', '3. Yıl'],
-                y=projection['costs'],
-                marker_color='#E74C3C',
-                text=[f'{x:,.0f} ₺' for x in projection['costs']],
-                textposition='auto'
-            ))
-            
-            # Grafik düzeni
-            fig.update_layout(
-                barmode='group',
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                margin=dict(l=20, r=20, t=40, b=20),
-                height=300,
-                yaxis_title='TL',
-                title=f"{demo_data['city_name']} İli 3 Yıllık Finansal Projeksiyon"
-            )
-            
             # Açıklama metni
             st.markdown(f"""
                 #### 💰 Finansal Özet
@@ -628,25 +793,48 @@ def main():
                 - **3 Yıllık Toplam Gelir:** {sum(projection['revenues']):,.0f} ₺
                 - **3 Yıllık Toplam Maliyet:** {sum(projection['costs']):,.0f} ₺
                 - **Tahmini Geri Ödeme Süresi:** {max(1, min(5, investment_budget / (projection['revenues'][0] - projection['costs'][0]))): .1f} yıl
+                - **Ağ İçi Pay Kaybı (Kanibalizasyon):** %{(1 - inputs['retention']) * 100:.1f}
                 
-                *Not: Projeksiyonlar şehir büyüklüğü, EV sahiplik oranı ve rekabet durumu dikkate alınarak hesaplanmıştır.*
+                *Not: Projeksiyonlar şehir büyüklüğü, EV sahiplik oranı, rekabet durumu ve diğer seçili lokasyonlarla çekim alanı örtüşmesi dikkate alınarak hesaplanmıştır.*
             """)
             
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(graph.get('projection_chart', **inputs), use_container_width=True)
+            
+            # Monte Carlo belirsizlik bantları
+            bands = graph.get('bands', **inputs)
+            st.markdown(f"""
+                #### 🎲 Senaryo Analizi ({bands['n_scenarios']:,} senaryo)
+                - **ROI Aralığı (P10 / P50 / P90):** %{bands['roi_p10']} / %{bands['roi_p50']} / %{bands['roi_p90']}
+                - **{bands['payback_horizon']} Yıl İçinde Geri Ödeme Olasılığı:** %{bands['payback_probability'] * 100:.1f}
+            """)
+            st.plotly_chart(graph.get('fan_chart', **inputs), use_container_width=True)
         else:
             st.info("Finansal projeksiyon için haritadan bir lokasyon seçin.")
     
     # Detaylı analiz bölümü
     st.markdown("### 🔍 Detaylı Analiz")
-    tabs = st.tabs(["�� Trafik Analizi", "👥 Demografik Veriler", "🎯 Rekabet Analizi"])
+    tabs = st.tabs(["�� Trafik Analizi", "👥 Demografik Veriler", "🎯 Rekabet Analizi", "⚡ Enerji ve Şebeke"])
     
     # Seçili lokasyon varsa analiz yap
-    selected_location = st.session_state.selected_points[-1] if st.session_state.selected_points else None
+    selected_location = selected_points.last()
+    if selected_location:
+        location = {
+            'lat': selected_location['lat'],
+            'lon': selected_location['lon'],
+            'station_type': station_type,
+            'retention': round(network.retention(int(point_keys(selected_location['lat'], selected_location['lon']))), 3)
+        }
+        unavailable = graph.get('enrichment', **location)['errors']
+        if unavailable:
+            st.warning(
+                "Bazı veri kaynaklarına ulaşılamadı, yaklaşık değerler gösteriliyor: "
+                + ", ".join(f"{name} ({error})" for name, error in unavailable.items())
+            )
     
     with tabs[0]:
         st.markdown('<div class="stCard">', unsafe_allow_html=True)
         if selected_location:
-            traffic_data = analyze_traffic(selected_location['lat'], selected_location['lon'])
+            traffic_data = graph.get('traffic', **location)
             
             col1, col2 = st.columns(2)
             with col1:
@@ -662,7 +850,7 @@ def main():
                 """)
             
             with col2:
-                st.plotly_chart(create_traffic_chart(traffic_data), use_container_width=True)
+                st.plotly_chart(graph.get('traffic_chart', **location), use_container_width=True)
         else:
             st.info("Trafik analizi için haritadan bir lokasyon seçin.")
         st.markdown('</div>', unsafe_allow_html=True)
@@ -670,10 +858,10 @@ def main():
     with tabs[1]:
         st.markdown('<div class="stCard">', unsafe_allow_html=True)
         if selected_location:
-            demo_data = analyze_demographics(selected_location['lat'], selected_location['lon'])
+            demo_data = graph.get('demographics', **location)
             
             st.markdown(f"""
-                #### 👥 {demo_data['city_name']} İli Demografik Analizi
+                #### 👥 {demo_data['city_name']} İli{f" / {demo_data['district']}" if demo_data.get('district') else ''} Demografik Analizi
                 
                 **📊 Nüfus Bilgileri**
                 - Toplam Nüfus: {demo_data['population']:,} kişi
@@ -688,26 +876,15 @@ def main():
                 - EV Sahiplik Oranı: %{demo_data['ev_ownership']:.1f}
                 - İşyeri Yoğunluğu: {demo_data['business_density']} işletme/km²
             """)
+            if 'catchment_population' in demo_data:
+                st.markdown(f"""
+                    **📍 Çekim Alanı (mesafeyle azalan ağırlıkla)**
+                    - Erişilebilir Nüfus: {demo_data['catchment_population']:,} kişi
+                    - EV Sahibi: {demo_data['catchment_ev_owners']:,} kişi
+                """)
             
             # Nüfus dağılımı bar grafiği
-            urban_rural_data = {
-                'Kategori': ['Şehir Merkezi', 'Kırsal Kesim'],
-                'Nüfus': [demo_data['urban_population'], demo_data['rural_population']]
-            }
-            fig = go.Figure(data=[
-                go.Bar(
-                    x=urban_rural_data['Kategori'],
-                    y=urban_rural_data['Nüfus'],
-                    marker_color=['#2E86C1', '#28B463']
-                )
-            ])
-            fig.update_layout(
-                title='Şehir-Kırsal Nüfus Dağılımı',
-                height=400,
-                yaxis_title='Nüfus',
-                showlegend=False
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(graph.get('population_chart', **location), use_container_width=True)
         else:
             st.info("Demografik analiz için haritadan bir lokasyon seçin.")
         st.markdown('</div>', unsafe_allow_html=True)
@@ -715,7 +892,7 @@ def main():
     with tabs[2]:
         st.markdown('<div class="stCard">', unsafe_allow_html=True)
         if selected_location:
-            comp_data = analyze_competition(selected_location['lat'], selected_location['lon'])
+            comp_data = graph.get('competition', **location)
             
             col1, col2 = st.columns(2)
             with col1:
@@ -723,32 +900,68 @@ def main():
                     #### 🎯 Rekabet Analizi
                     - **5 km Yarıçapta Rakip İstasyon:** {comp_data['nearby_stations']} adet
                     - **En Yakın Rakip Mesafesi:** {comp_data['nearest_distance']} km
+                    - **Günlük Şarj Oturumu:** {comp_data['daily_sessions']}
                     - **Ortalama Doluluk Oranı:** %{comp_data['occupancy_rate']}
                     - **Ortalama Bekleme Süresi:** {comp_data['avg_waiting_time']} dakika
+                    - **P95 Bekleme Süresi:** {comp_data['p95_waiting_time']} dakika
+                    - **Beklemeden Vazgeçen Sürücü:** %{comp_data['turned_away_rate']}
                     - **Tahmini Pazar Payı:** %{comp_data['market_share']}
+                    
+                    *Kuyruk modeli: {'analitik (M/M/c)' if comp_data['queue_method'] == 'analytic' else 'olay simülasyonu'}*
                 """)
             
             with col2:
                 # Doluluk oranı göstergesi
-                fig = go.Figure(go.Indicator(
-                    mode = "gauge+number",
-                    value = comp_data['occupancy_rate'],
-                    title = {'text': "Doluluk Oranı"},
-                    gauge = {
-                        'axis': {'range': [None, 100]},
-                        'bar': {'color': "#2E86C1"},
-                        'steps': [
-                            {'range': [0, 50], 'color': "lightgray"},
-                            {'range': [50, 75], 'color': "gray"},
-                            {'range': [75, 100], 'color': "darkgray"}
-                        ]
-                    }
-                ))
-                fig.update_layout(height=300)
-                st.plotly_chart(fig, use_container_width=True)
+                st.plotly_chart(graph.get('occupancy_gauge', **location), use_container_width=True)
+            
+            # Soket sayısı duyarlılığı
+            st.plotly_chart(graph.get('queue_chart', **location), use_container_width=True)
         else:
             st.info("Rekabet analizi için haritadan bir lokasyon seçin.")
         st.markdown('</div>', unsafe_allow_html=True)
+    
+    with tabs[3]:
+        st.markdown('<div class="stCard">', unsafe_allow_html=True)
+        if selected_location:
+            energy = graph.get('energy', **location)
+            bands = ', '.join(f"{band}: {kwh:,} kWh" for band, kwh in energy['band_kwh'].items())
+            
+            col1, col2 = st.columns(2)
+            with col1:
+                st.markdown(f"""
+                    #### ⚡ Enerji ve Şebeke Analizi
+                    - **Yıllık Enerji Maliyeti:** {' / '.join(f'{x:,} ₺' for x in energy['energy_cost'])}
+                    - **Güç Bedeli (1. Yıl):** {energy['demand_charge'][0]:,} ₺
+                    - **Verilen Enerji (1. Yıl):** {energy['energy_kwh'][0]:,} kWh
+                    - **Tarife Dilimleri:** {bands}
+                    - **En Yüksek Çekilen Güç:** {energy['peak_kw'][0]} kW (bağlantı {energy['capacity_kw']:.0f} kW)
+                    - **Kapasite Nedeniyle Karşılanamayan Oturum:** {' / '.join(f'{x:,}' for x in energy['curtailed_sessions'])}
+                    
+                    *Not: 8760 saatlik talep profili ve üç zamanlı tarifeyle hesaplanmıştır.*
+                """)
+            
+            with col2:
+                st.plotly_chart(graph.get('energy_chart', **location), use_container_width=True)
+        else:
+            st.info("Enerji analizi için haritadan bir lokasyon seçin.")
+        st.markdown('</div>', unsafe_allow_html=True)
+    
+    # Aşama bazında önbellek istatistikleri
+    with st.expander("⚙️ Hesaplama Önbelleği"):
+        shared = get_shared_cache().stats()
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Paylaşılan İsabet Oranı", f"%{shared['hit_rate'] * 100:.1f}")
+        col2.metric("Kayıt", f"{shared['entries']:,}")
+        col3.metric("Bellek", f"{shared['resident_bytes'] / 2**20:.1f} / {shared['max_bytes'] / 2**20:.0f} MB")
+        col4.metric("Çıkarılan", f"{shared['evictions'] + shared['expirations']:,}")
+        st.caption(
+            f"İsabet: {shared['hits']:,} · Bekleyerek paylaşılan: {shared['coalesced']:,} · "
+            f"Iska: {shared['misses']:,} · Süresi dolan: {shared['expirations']:,} · Hata: {shared['errors']:,}"
+        )
+        st.dataframe(
+            [{'Aşama': name, **counts} for name, counts in graph.stats().items()],
+            use_container_width=True
+        )
 
 if __name__ == "__main__":
     main() 
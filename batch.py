@@ -0,0 +1,194 @@
+"""
+Koordinat listesini toplu olarak analiz eden komut satırı aracı.
+
+Örnek:
+    python batch.py adaylar.csv sonuclar.parquet --budget 1000000 --workers 8
+"""
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator
+
+import pandas as pd
+
+from analysis import DEFAULT_STATION_TYPE, analyze_portfolio, fetch_ev_data
+from points import geojson_points
+from queueing import STATION_PROFILES
+
+CHUNK_SIZE = 500
+
+# analyze_portfolio çıktısının sütun tipleri; Parquet şeması ilk parçadan değil
+# buradan kurulur, böylece boş veya tamsayı gelen sütunlar şemayı bozmaz
+RESULT_COLUMNS = {
+    'lat': 'float64',
+    'lon': 'float64',
+    'city_name': 'string',
+    'population': 'int64',
+    'ev_ownership': 'float64',
+    'catchment_population': 'float64',
+    'nearby_stations': 'int64',
+    'nearest_distance': 'float64',
+    'market_share': 'float64',
+    'own_overlap': 'float64',
+    'retention': 'float64',
+    'occupancy_rate': 'float64',
+    'p95_waiting_time': 'float64',
+    'turned_away_rate': 'float64',
+    'daily_traffic': 'int64',
+    'ev_traffic': 'int64',
+    'energy_cost_y1': 'int64',
+    'peak_kw': 'float64',
+    'curtailed_sessions': 'int64',
+    'score': 'float64',
+    'roi': 'float64',
+    **{f'{name}_y{year}': 'int64' for year in (1, 2, 3) for name in ('revenue', 'cost')}
+}
+
+
+def result_columns(geocode: bool = False) -> dict:
+    """Çıktı dosyasının sütun adı -> tip eşlemesi"""
+    return {**RESULT_COLUMNS, 'address': 'string'} if geocode else dict(RESULT_COLUMNS)
+
+
+def read_points(path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """
+    CSV ('lat', 'lon' sütunları) veya GeoJSON (Point nesneleri) dosyasını parça parça okur.
+
+    Args:
+        path: Girdi dosyası
+        chunk_size: Parça başına nokta sayısı
+
+    Yields:
+        pd.DataFrame: 'lat' ve 'lon' sütunlu parçalar
+    """
+    if path.lower().endswith(('.geojson', '.json')):
+        with open(path, 'r', encoding='utf-8') as f:
+            points = geojson_points(json.load(f))[['lat', 'lon']]
+        for start in range(0, len(points), chunk_size):
+            yield points.iloc[start:start + chunk_size]
+        return
+
+    for chunk in pd.read_csv(path, usecols=['lat', 'lon'], chunksize=chunk_size):
+        yield chunk
+
+
+def analyze_chunk(
+    points: pd.DataFrame,
+    investment_budget: float,
+    geocode: bool = False,
+    ev_data: dict = None,
+    station_type: str = DEFAULT_STATION_TYPE
+) -> pd.DataFrame:
+    """Bir parçadaki tüm noktaları tek seferde analiz eder (işçi süreçte çalışır)"""
+    # İşçi süreç içinde ikinci bir süreç havuzu açılmaz; kuyruk simülasyonları sırayla çalışır.
+    # Girdi bir ağ değil aday listesidir; parçalar arasında tutarlı kalması için
+    # adaylar birbirlerinin payını düşürmeden bağımsız değerlendirilir.
+    return analyze_portfolio(
+        points['lat'], points['lon'], investment_budget,
+        geocode=geocode, ev_data=ev_data, station_type=station_type, workers=1, cannibalize=False
+    )
+
+
+class ResultWriter:
+    """Sonuçları sırayla Parquet veya CSV dosyasına akıtır"""
+
+    def __init__(self, path: str, columns: dict):
+        self.path = path
+        self.columns = columns
+        self.parquet = path.lower().endswith('.parquet')
+        self._writer = None
+        self._header_written = False
+
+    def _schema(self):
+        """Sütun tiplerinden Parquet şeması"""
+        import pyarrow as pa
+        types = {'float64': pa.float64(), 'int64': pa.int64(), 'string': pa.string()}
+        return pa.schema([(name, types[dtype]) for name, dtype in self.columns.items()])
+
+    def write(self, df: pd.DataFrame):
+        df = df[list(self.columns)]
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, self._schema())
+            self._writer.write_table(pa.Table.from_pandas(df, schema=self._writer.schema, preserve_index=False))
+        else:
+            df.to_csv(self.path, mode='a' if self._header_written else 'w', header=not self._header_written, index=False)
+            self._header_written = True
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def run(
+    input_path: str,
+    output_path: str,
+    investment_budget: float,
+    workers: int = None,
+    chunk_size: int = CHUNK_SIZE,
+    geocode: bool = False,
+    station_type: str = DEFAULT_STATION_TYPE
+) -> int:
+    """
+    Girdi dosyasındaki noktaları süreç havuzunda analiz eder ve sonuçları akıtır.
+
+    Aynı anda en fazla 2 x workers parça işlenir; sonuçlar girdi sırasıyla yazılır.
+
+    Args:
+        input_path: CSV veya GeoJSON girdi dosyası
+        output_path: .parquet veya .csv çıktı dosyası
+        investment_budget: Lokasyon başına yatırım bütçesi (TL)
+        workers: İşçi süreç sayısı (None ise CPU sayısı)
+        chunk_size: Parça başına nokta sayısı
+        geocode: Adresleri de çöz (hız sınırı nedeniyle yavaştır)
+        station_type: Kuyruk modelinde kullanılacak istasyon tipi
+
+    Returns:
+        int: Yazılan satır sayısı
+    """
+    workers = workers or os.cpu_count() or 1
+    # Ulaşım verisi lokasyondan bağımsızdır; ana süreçte bir kez çekilip işçilere verilir
+    ev_data = fetch_ev_data() or {}
+    writer = ResultWriter(output_path, result_columns(geocode))
+    written = 0
+    pending = []
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for chunk in read_points(input_path, chunk_size):
+                pending.append(executor.submit(analyze_chunk, chunk, investment_budget, geocode, ev_data, station_type))
+                # Bellek kullanımını sınırlamak için en eski parçanın bitmesini bekle
+                if len(pending) >= 2 * workers:
+                    result = pending.pop(0).result()
+                    writer.write(result)
+                    written += len(result)
+            for future in pending:
+                result = future.result()
+                writer.write(result)
+                written += len(result)
+    finally:
+        writer.close()
+
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Koordinat listesini puanlar ve finansal projeksiyon üretir")
+    parser.add_argument('input', help="CSV ('lat', 'lon' sütunları) veya GeoJSON dosyası")
+    parser.add_argument('output', help=".parquet veya .csv çıktı dosyası")
+    parser.add_argument('--budget', type=float, default=1000000, help="Lokasyon başına yatırım bütçesi (TL)")
+    parser.add_argument('--workers', type=int, default=None, help="İşçi süreç sayısı")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--geocode', action='store_true', help="Adresleri de çöz")
+    parser.add_argument('--station-type', default=DEFAULT_STATION_TYPE, choices=sorted(STATION_PROFILES), help="İstasyon tipi")
+    args = parser.parse_args()
+
+    written = run(args.input, args.output, args.budget, args.workers, args.chunk_size, args.geocode, args.station_type)
+    print(f"{written} lokasyon analiz edildi: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
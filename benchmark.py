@@ -0,0 +1,464 @@
+"""
+Puanlama, finansal projeksiyon, harita/grafik ve analiz yolları için performans ölçüm takımı.
+
+Her ölçüm bir veya daha çok girdi boyutunda çalıştırılır; çağrı başına en
+düşük ve ortanca süre raporlanır. Sonuçlar JSON geçmiş dosyasına eklenir ve
+aynı makinedeki son çalıştırmaların ortancasına göre REGRESSION_THRESHOLD
+oranından fazla yavaşlayan ölçümler gerileme olarak işaretlenir.
+
+Ulaşım API'si ve Nominatim yerine yerel sahte kaynaklar kullanılır; adresler
+geçici bir SQLite dosyasına yazılır. Böylece ölçümler ağdan bağımsızdır ve
+gerçek önbelleklere sahte veri yazılmaz.
+
+Örnek:
+    python benchmark.py --filter roi --repeat 7
+    python benchmark.py --no-save --threshold 0.3
+"""
+import argparse
+import contextlib
+import json
+import logging
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+from functools import partial
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+from unittest import mock
+
+import numpy as np
+
+BENCHMARK_HISTORY_PATH = 'benchmark_history.json'
+
+# Ortancaya göre izin verilen yavaşlama oranı; makineye göre ortamdan ayarlanabilir
+REGRESSION_THRESHOLD = float(os.getenv('BENCHMARK_THRESHOLD', 0.2))
+
+# Taban çizgisinde kullanılacak son çalıştırma sayısı
+BASELINE_RUNS = 5
+
+# Ölçüm gürültüsünü azaltmak için tekrar sayısı ve tekrar başına en az süre (saniye)
+DEFAULT_REPEAT = 5
+MIN_REPEAT_SECONDS = 0.2
+
+# İstanbul çevresinde rastgele lokasyonlar
+_BENCH_BOUNDS = (40.85, 41.20, 28.60, 29.40)
+
+# Türkiye'yi kapsayan kutu; yapay sınır katmanları ve bölge sorguları için
+_TURKEY_BOUNDS = (36.0, 42.0, 26.0, 45.0)
+
+_BENCHMARKS: Dict[str, Dict] = {}
+
+
+def benchmark(name: str, sizes: Sequence[int] = (1,), threshold: Optional[float] = None) -> Callable:
+    """
+    Ölçüm kaydeden dekoratör. Süslenen fonksiyon girdi boyutunu alır ve
+    ölçülecek argümansız fonksiyonu döndürür (hazırlık süresi ölçüme girmez).
+
+    Args:
+        name: Ölçüm adı
+        sizes: Girdi boyutları
+        threshold: Bu ölçüme özel gerileme eşiği (None ise genel eşik)
+    """
+    def decorator(setup: Callable[[int], Callable[[], object]]) -> Callable:
+        _BENCHMARKS[name] = {'setup': setup, 'sizes': tuple(sizes), 'threshold': threshold}
+        return setup
+    return decorator
+
+
+def _random_points(n: int, seed: int = 0, bounds=_BENCH_BOUNDS):
+    rng = np.random.default_rng(seed)
+    south, north, west, east = bounds
+    return rng.uniform(south, north, n), rng.uniform(west, east, n)
+
+
+def _synthetic_layer(n_polygons: int, vertices: int, seed: int = 0):
+    """
+    Türkiye kutusunu ızgara halinde kaplayan, kenarları girintili çıkıntılı
+    yapay sınır katmanı (gerçek il/ilçe dosyalarına benzer köşe sayısıyla).
+    """
+    import shapely
+    from regions import build_layer
+
+    rng = np.random.default_rng(seed)
+    south, north, west, east = _TURKEY_BOUNDS
+    side = int(np.ceil(np.sqrt(n_polygons)))
+    width, height = (east - west) / side, (north - south) / side
+    angles = np.linspace(0, 2 * np.pi, vertices, endpoint=False)
+
+    polygons = []
+    for k in range(n_polygons):
+        row, col = divmod(k, side)
+        center_lon, center_lat = west + (col + 0.5) * width, south + (row + 0.5) * height
+        radius = 0.7 * (1 + 0.1 * np.sin(7 * angles) + 0.03 * rng.standard_normal(vertices))
+        polygons.append(shapely.Polygon(np.c_[
+            center_lon + radius * width * np.cos(angles),
+            center_lat + radius * height * np.sin(angles)
+        ]))
+    return build_layer(np.array(polygons), np.array([f"Birim {k}" for k in range(n_polygons)], dtype=object))
+
+
+# Yerel sahte kaynaklar
+
+_LOCAL_EV_DATA = json.dumps({
+    'result': {
+        'records': [],
+        'total': 0,
+        'daily_traffic': 12000,
+        'weekend_density': 65,
+        'ev_traffic': 300,
+        'traffic_growth': 10
+    }
+}).encode()
+
+
+class _LocalLocation:
+    def __init__(self, address: str):
+        self.address = address
+
+
+class _LocalGeolocator:
+    """Nominatim yerine koordinattan sabit biçimli adres üreten yerel çözücü"""
+
+    def reverse(self, point, language: str = 'tr'):
+        lat, lon = point
+        return _LocalLocation(f"Yerel Adres {lat:.4f}, {lon:.4f}")
+
+
+@contextlib.contextmanager
+def local_services() -> Iterator[str]:
+    """
+    Ölçüm süresince ulaşım API'si ve Nominatim yerine yerel sahte kaynakları kullanır.
+
+    Yields:
+        str: Adreslerin yazıldığı geçici SQLite dosyası
+    """
+    import analysis
+    import geocode
+
+    with tempfile.TemporaryDirectory() as directory, contextlib.ExitStack() as stack:
+        db_path = os.path.join(directory, 'geocode.sqlite')
+        stack.enter_context(mock.patch.object(analysis, 'has_local_store', lambda: False))
+        stack.enter_context(mock.patch.object(analysis, 'cached_fetch', lambda url, **kwargs: _LOCAL_EV_DATA))
+        stack.enter_context(mock.patch.object(geocode, 'get_geolocator', _LocalGeolocator))
+        stack.enter_context(mock.patch.object(geocode, 'MIN_REQUEST_INTERVAL', 0.0))
+        stack.enter_context(mock.patch.object(analysis, 'reverse_geocode', partial(geocode.reverse_geocode, db_path=db_path)))
+        stack.enter_context(mock.patch.object(
+            analysis, 'reverse_geocode_batch', partial(geocode.reverse_geocode_batch, db_path=db_path)
+        ))
+        yield db_path
+
+
+def _import_app():
+    """app modülünü Streamlit çalışma zamanı dışında içe aktarır (bağlam uyarıları bastırılır)"""
+    from streamlit.logger import set_log_level
+    set_log_level('error')
+    # İçe aktarım sırasındaki çıplak mod uyarıları seviyeden bağımsız yazılır
+    logging.disable(logging.WARNING)
+    try:
+        import app
+    finally:
+        logging.disable(logging.NOTSET)
+    return app
+
+
+# Mikro ölçümler: tekil fonksiyon N kez ve vektörel sürüm N lokasyonda
+
+@benchmark('calculate_location_score', sizes=(1, 100, 10000))
+def _location_score(n: int):
+    from utils import calculate_location_score
+    rng = np.random.default_rng(0)
+    rows = rng.uniform(0, 1, (n, 4)).tolist()
+    return lambda: [calculate_location_score(t, p, c * 10, d) for t, p, c, d in rows]
+
+
+@benchmark('calculate_location_scores', sizes=(100, 10000, 1000000))
+def _location_scores(n: int):
+    from utils import calculate_location_scores
+    rng = np.random.default_rng(0)
+    traffic, pedestrian, competitor, demographic = rng.uniform(0, 1, (4, n))
+    return lambda: calculate_location_scores(traffic, pedestrian, competitor * 10, demographic)
+
+
+@benchmark('calculate_roi', sizes=(1, 100, 10000))
+def _roi(n: int):
+    from utils import calculate_roi
+    rng = np.random.default_rng(0)
+    rows = list(zip(rng.uniform(5e5, 2e6, n).tolist(), rng.integers(20, 200, n).tolist()))
+    return lambda: [calculate_roi(cost, users, 150, 200000) for cost, users in rows]
+
+
+@benchmark('calculate_roi_grid', sizes=(100, 10000, 1000000))
+def _roi_grid(n: int):
+    from utils import calculate_roi_grid
+    rng = np.random.default_rng(0)
+    cost, users = rng.uniform(5e5, 2e6, n), rng.integers(20, 200, n)
+    return lambda: calculate_roi_grid(cost, users, 150, 200000, growth_rate=0.1)
+
+
+@benchmark('utils.analyze_demographics', sizes=(1, 100, 10000))
+def _demographics_score(n: int):
+    from utils import analyze_demographics
+    rng = np.random.default_rng(0)
+    ages = {'18-24': 0.15, '25-40': 0.35, '41-55': 0.3, '55+': 0.2}
+    rows = list(zip(rng.integers(10000, 100000, n).tolist(), rng.uniform(4e4, 2.5e5, n).tolist(), rng.uniform(0, 0.1, n).tolist()))
+    return lambda: [analyze_demographics(population, income, ev, ages) for population, income, ev in rows]
+
+
+@benchmark('utils.analyze_demographics_batch', sizes=(100, 10000, 1000000))
+def _demographics_score_batch(n: int):
+    from utils import analyze_demographics_batch
+    rng = np.random.default_rng(0)
+    ages = {group: np.full(n, share) for group, share in {'18-24': 0.15, '25-40': 0.35, '41-55': 0.3, '55+': 0.2}.items()}
+    income, ev = rng.uniform(4e4, 2.5e5, n), rng.uniform(0, 0.1, n)
+    return lambda: analyze_demographics_batch(income, ev, ages)
+
+
+@benchmark('calculate_financial_projection', sizes=(1, 100, 1000))
+def _financial_projection(n: int):
+    from analysis import CITY_GROWTH_FACTORS, calculate_financial_projection
+    rng = np.random.default_rng(0)
+    cities = list(CITY_GROWTH_FACTORS)
+    rows = [
+        (cities[i % len(cities)], ev, {'market_share': share})
+        for i, (ev, share) in enumerate(zip(rng.uniform(2, 8, n).tolist(), rng.integers(10, 41, n).tolist()))
+    ]
+    return lambda: [calculate_financial_projection(city, ev, comp, 1000000) for city, ev, comp in rows]
+
+
+@benchmark('projection_arrays', sizes=(100, 10000, 1000000))
+def _projection_arrays(n: int):
+    from analysis import projection_arrays
+    rng = np.random.default_rng(0)
+    growth, ev, share = rng.uniform(1.1, 1.4, n), rng.uniform(2, 8, n), rng.integers(10, 41, n)
+    return lambda: projection_arrays(growth, ev, share, 1000000)
+
+
+# Arayüz ölçümleri
+
+@benchmark('create_map', sizes=(10, 100, 1000), threshold=0.3)
+def _create_map(n: int):
+    """Taban harita, n işaretçili katmanlar ve HTML çıktısı (st_folium'un yaptığı gibi)"""
+    import map_layers
+    from points import PointStore
+
+    store = PointStore()
+    lats, lons = _random_points(n)
+    store.add_many(lats, lons, [f"Lokasyon {i}" for i in range(n)])
+    snapshot = store.snapshot()
+
+    def run():
+        m = map_layers.create_base_map('İstanbul')
+        for layer in map_layers.create_layers(snapshot):
+            layer.add_to(m)
+        return m.get_root().render()
+    return run
+
+
+@benchmark('create_traffic_chart', threshold=0.3)
+def _traffic_chart(n: int):
+    app = _import_app()
+    from analysis import _reported_traffic
+    traffic = _reported_traffic(41.0, 29.0, {})
+    return lambda: app.create_traffic_chart(traffic)
+
+
+@benchmark('load_population_data', threshold=0.3)
+def _population_data(n: int):
+    """Streamlit önbelleği her çağrıda temizlenir; dosya okuma ve Feather önbelleği ölçülür"""
+    app = _import_app()
+
+    def run():
+        app.load_population_data.clear()
+        return app.load_population_data()
+    return run
+
+
+@benchmark('regions.locate_provinces', sizes=(1000, 100000))
+def _locate_provinces(n: int):
+    """81 il, poligon başına 2000 köşe; 100 bin nokta saniyenin çok altında kalmalı"""
+    from regions import locate
+    layer = _synthetic_layer(81, 2000)
+    lats, lons = _random_points(n, bounds=_TURKEY_BOUNDS)
+    return lambda: locate(layer, lats, lons)
+
+
+@benchmark('regions.locate_districts', sizes=(1000, 100000))
+def _locate_districts(n: int):
+    """973 ilçe, poligon başına 400 köşe"""
+    from regions import locate
+    layer = _synthetic_layer(973, 400)
+    lats, lons = _random_points(n, bounds=_TURKEY_BOUNDS)
+    return lambda: locate(layer, lats, lons)
+
+
+# Makro ölçümler: analiz yolları (yerel sahte kaynaklarla)
+
+@benchmark('analyze_location', threshold=0.3)
+def _analyze_location(n: int):
+    from analysis import analyze_location
+    return lambda: analyze_location(41.01, 28.97, 1000000, geocode=True)
+
+
+@benchmark('analyze_portfolio', sizes=(10, 100, 1000), threshold=0.3)
+def _analyze_portfolio(n: int):
+    from analysis import analyze_portfolio
+    lats, lons = _random_points(n)
+    return lambda: analyze_portfolio(lats, lons, 1000000, geocode=True, workers=1)
+
+
+def measure(fn: Callable[[], object], repeat: int = DEFAULT_REPEAT, min_seconds: float = MIN_REPEAT_SECONDS) -> Dict:
+    """
+    Fonksiyonun çağrı başına süresini ölçer.
+
+    Çağrı sayısı, bir tekrar en az min_seconds sürecek şekilde seçilir.
+
+    Returns:
+        Dict: 'min_ms', 'median_ms' (çağrı başına) ve 'number' (tekrar başına çağrı)
+    """
+    timer = timeit.Timer(fn)
+    # İlk çağrı önbellekleri ve tembel içe aktarımları ısıtır
+    started = time.perf_counter()
+    fn()
+    first = time.perf_counter() - started
+    number = max(1, int(min_seconds / first)) if first > 0 else 1
+    times = [t / number * 1000 for t in timer.repeat(repeat=repeat, number=number)]
+    return {'min_ms': round(min(times), 4), 'median_ms': round(statistics.median(times), 4), 'number': number}
+
+
+def run_benchmarks(pattern: Optional[str] = None, repeat: int = DEFAULT_REPEAT) -> Dict[str, Dict]:
+    """
+    Kayıtlı ölçümleri yerel sahte kaynaklarla çalıştırır.
+
+    Args:
+        pattern: Yalnızca adı bu düzenli ifadeyle eşleşen ölçümler
+        repeat: Tekrar sayısı
+
+    Returns:
+        Dict[str, Dict]: 'ad[boyut]' -> measure sonucu
+    """
+    results = {}
+    with local_services():
+        for name, spec in _BENCHMARKS.items():
+            if pattern and not re.search(pattern, name):
+                continue
+            for size in spec['sizes']:
+                results[f"{name}[{size}]"] = measure(spec['setup'](size), repeat)
+    return results
+
+
+def machine_id() -> str:
+    """Geçmişteki çalıştırmaları yalnızca aynı makineyle karşılaştırmak için kimlik"""
+    return f"{platform.node()}|{platform.machine()}|{platform.python_version()}|{os.cpu_count()}"
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        result = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True, timeout=10
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def load_history(path: str = BENCHMARK_HISTORY_PATH) -> List[Dict]:
+    """Geçmiş çalıştırmaları döndürür (dosya yoksa boş liste)"""
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_run(results: Dict[str, Dict], path: str = BENCHMARK_HISTORY_PATH) -> Dict:
+    """Çalıştırmayı geçmiş dosyasına ekler (geçici dosya üzerinden atomik yazım)"""
+    run = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': _git_commit(),
+        'machine': machine_id(),
+        'results': results
+    }
+    history = load_history(path) + [run]
+    directory = os.path.dirname(os.path.abspath(path))
+    with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=directory, delete=False, suffix='.tmp') as f:
+        json.dump(history, f, ensure_ascii=False, indent=1)
+    os.replace(f.name, path)
+    return run
+
+
+def compare(
+    results: Dict[str, Dict],
+    history: List[Dict],
+    threshold: float = REGRESSION_THRESHOLD,
+    baseline_runs: int = BASELINE_RUNS
+) -> List[Dict]:
+    """
+    Sonuçları aynı makinedeki son çalıştırmaların ortancasıyla karşılaştırır.
+
+    Args:
+        results: run_benchmarks sonucu
+        history: load_history sonucu
+        threshold: Genel gerileme eşiği (ölçüme özel eşik varsa o kullanılır)
+        baseline_runs: Taban çizgisine alınacak son çalıştırma sayısı
+
+    Returns:
+        List[Dict]: Ölçüm başına 'benchmark', 'min_ms', 'baseline_ms', 'change'
+        (oran; taban yoksa None), 'threshold' ve 'regression'
+    """
+    machine = machine_id()
+    previous = [run['results'] for run in history if run.get('machine') == machine]
+    rows = []
+    for key, result in results.items():
+        name = key.split('[', 1)[0]
+        limit = _BENCHMARKS.get(name, {}).get('threshold') or threshold
+        past = [run[key]['min_ms'] for run in previous if key in run][-baseline_runs:]
+        baseline = statistics.median(past) if past else None
+        change = result['min_ms'] / baseline - 1 if baseline else None
+        rows.append({
+            'benchmark': key,
+            'min_ms': result['min_ms'],
+            'baseline_ms': baseline,
+            'change': change,
+            'threshold': limit,
+            'regression': change is not None and change > limit
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Performans ölçümlerini çalıştırır ve geçmişle karşılaştırır")
+    parser.add_argument('--filter', default=None, help="Ölçüm adı için düzenli ifade")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('--history', default=BENCHMARK_HISTORY_PATH, help="JSON geçmiş dosyası")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD, help="İzin verilen yavaşlama oranı")
+    parser.add_argument('--no-save', action='store_true', help="Sonuçları geçmişe yazma")
+    parser.add_argument('--list', action='store_true', help="Ölçümleri listele")
+    args = parser.parse_args()
+
+    if args.list:
+        for name, spec in _BENCHMARKS.items():
+            print(f"{name}: {', '.join(map(str, spec['sizes']))}")
+        return
+
+    results = run_benchmarks(args.filter, args.repeat)
+    rows = compare(results, load_history(args.history), args.threshold)
+    for row in rows:
+        change = '-' if row['change'] is None else f"{row['change'] * 100:+.1f}%"
+        status = 'GERİLEME' if row['regression'] else ''
+        print(f"{row['benchmark']:<42} {row['min_ms']:>12.4f} ms  {change:>8}  {status}")
+
+    if not args.no_save:
+        save_run(results, args.history)
+    regressions = [row['benchmark'] for row in rows if row['regression']]
+    if regressions:
+        print(f"\n{len(regressions)} ölçümde gerileme: {', '.join(regressions)}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
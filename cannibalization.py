@@ -0,0 +1,229 @@
+"""
+Kendi istasyon ağımızdaki lokasyonlar arasındaki çekim alanı örtüşmesi (kanibalizasyon).
+
+İki lokasyonun örtüşme katsayısı, aralarındaki uzaklığın azalan bir
+fonksiyonudur (aynı noktada 1, OVERLAP_RADIUS_KM ve ötesinde 0). Her
+lokasyonun kendi ağımızla (O) ve rakip istasyonlarla (C) toplam örtüşmesi
+tutulur; Huff tipi bir paylaşımla, ağın diğer lokasyonları yokken elde
+edilecek payın korunan oranı (1 + C) / (1 + C + O) olur.
+
+Yalnızca yarıçap içindeki çiftler hesaplanır: toplu kurulumda BallTree
+yarıçap sorgusu ve seyrek matris, tekil ekleme/silmede ise hücre boyu
+yarıçap kadar olan bir ızgara indeksi kullanılır; böylece bir lokasyonun
+eklenmesi veya silinmesi yalnızca komşularını günceller.
+"""
+import math
+from collections import defaultdict
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from catchment import DECAY_KM
+from heatmap import KM_PER_DEGREE
+from stations import EARTH_RADIUS_KM, _query_points, get_station_tree
+
+# Örtüşmenin sıfıra indiği uzaklık (km)
+OVERLAP_RADIUS_KM = 6.0
+
+# Izgara indeksinde boylam hücresi genişliği bu enlemdeki km'ye göre seçilir
+# (Türkiye'nin kuzey sınırı; daha güneyde hücreler yarıçaptan geniş kalır)
+_GRID_REFERENCE_LAT = 42.5
+
+# Seyrek matrisle toplu kurulumun tekil eklemeye tercih edildiği en az nokta sayısı
+BULK_MIN_SITES = 64
+
+
+def overlap_weight(distance_km, decay_km: float = DECAY_KM, radius_km: float = OVERLAP_RADIUS_KM) -> np.ndarray:
+    """
+    Uzaklığa göre örtüşme katsayısı.
+
+    exp(-d / decay_km) çekirdekli iki çekim alanının örtüşmesi (1 + d/λ)·e^(-d/λ)
+    ile yaklaşık hesaplanır ve radius_km'de sıfıra inecek şekilde ölçeklenir.
+    """
+    def kernel(d):
+        x = np.asarray(d, dtype=np.float64) / decay_km
+        return (1 + x) * np.exp(-x)
+
+    edge = kernel(radius_km)
+    return np.clip((kernel(distance_km) - edge) / (1 - edge), 0, 1)
+
+
+def _haversine_km(lat1, lon1, lat2, lon2) -> np.ndarray:
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(x, dtype=np.float64)) for x in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1)))
+
+
+def competitor_overlap(lats, lons, radius_km: float = OVERLAP_RADIUS_KM) -> np.ndarray:
+    """Her noktanın yarıçap içindeki rakip istasyonlarla toplam örtüşmesi"""
+    _, distances = get_station_tree().query_radius(
+        _query_points(lats, lons), r=radius_km / EARTH_RADIUS_KM, return_distance=True
+    )
+    return np.array([overlap_weight(d * EARTH_RADIUS_KM, radius_km=radius_km).sum() for d in distances])
+
+
+def overlap_matrix(lats, lons, radius_km: float = OVERLAP_RADIUS_KM):
+    """
+    Lokasyonlar arası örtüşme katsayılarını seyrek matris olarak hesaplar.
+
+    Args:
+        lats: Enlem dizisi
+        lons: Boylam dizisi
+        radius_km: Örtüşme yarıçapı
+
+    Returns:
+        scipy.sparse.csr_matrix: (n x n) simetrik, köşegeni sıfır örtüşme matrisi
+    """
+    # scikit-learn ve scipy içe aktarımı pahalıdır; yalnızca ilk kullanımda yüklenir
+    from scipy.sparse import csr_matrix
+    from sklearn.neighbors import BallTree
+
+    points = _query_points(lats, lons)
+    n = len(points)
+    indices, distances = BallTree(points, metric='haversine').query_radius(
+        points, r=radius_km / EARTH_RADIUS_KM, return_distance=True
+    )
+    rows = np.repeat(np.arange(n), [len(i) for i in indices])
+    cols = np.concatenate(indices) if n else np.empty(0, dtype=np.int64)
+    weights = overlap_weight(np.concatenate(distances) * EARTH_RADIUS_KM, radius_km=radius_km) if n else np.empty(0)
+    keep = rows != cols
+    return csr_matrix((weights[keep], (rows[keep], cols[keep])), shape=(n, n))
+
+
+class SiteNetwork:
+    """
+    Kendi lokasyonlarımızın örtüşme toplamlarını artımlı olarak tutar.
+
+    Lokasyonlar dışarıdan verilen hashlenebilir anahtarlarla (örn. points.point_keys)
+    izlenir; sync ile bir nokta kümesine yalnızca farklar uygulanarak eşitlenir.
+    """
+
+    def __init__(self, radius_km: float = OVERLAP_RADIUS_KM):
+        self.radius_km = radius_km
+        self._cell_lat = radius_km / KM_PER_DEGREE
+        self._cell_lon = radius_km / (KM_PER_DEGREE * math.cos(math.radians(_GRID_REFERENCE_LAT)))
+        self._coords: Dict[Hashable, Tuple[float, float]] = {}
+        self._cells: Dict[Tuple[int, int], set] = defaultdict(set)
+        self._own: Dict[Hashable, float] = {}
+        self._competitor: Dict[Hashable, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._coords)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._coords
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return math.floor(lat / self._cell_lat), math.floor(lon / self._cell_lon)
+
+    def _neighbours(self, lat: float, lon: float) -> Tuple[List[Hashable], np.ndarray]:
+        """Yarıçap içindeki lokasyonların anahtarları ve örtüşme katsayıları (3 x 3 hücre taranır)"""
+        row, col = self._cell(lat, lon)
+        keys = [key for dr in (-1, 0, 1) for dc in (-1, 0, 1) for key in self._cells.get((row + dr, col + dc), ())]
+        if not keys:
+            return [], np.empty(0)
+        coords = np.array([self._coords[key] for key in keys])
+        weights = overlap_weight(_haversine_km(lat, lon, coords[:, 0], coords[:, 1]), radius_km=self.radius_km)
+        close = weights > 0
+        return [key for key, c in zip(keys, close) if c], weights[close]
+
+    def _insert(self, key: Hashable, lat: float, lon: float, competitor: float):
+        self._coords[key] = (lat, lon)
+        self._cells[self._cell(lat, lon)].add(key)
+        self._own[key] = 0.0
+        self._competitor[key] = competitor
+
+    def add(self, key: Hashable, lat: float, lon: float):
+        """Tek lokasyon ekler; yalnızca komşuların örtüşme toplamları güncellenir"""
+        if key in self._coords:
+            return
+        neighbours, weights = self._neighbours(lat, lon)
+        self._insert(key, lat, lon, float(competitor_overlap([lat], [lon], self.radius_km)[0]))
+        for neighbour, weight in zip(neighbours, weights):
+            self._own[neighbour] += weight
+        self._own[key] = float(weights.sum())
+
+    def add_many(self, keys: Iterable[Hashable], lats, lons):
+        """
+        Lokasyonları toplu ekler. Ağ boşsa ve nokta sayısı yüksekse örtüşmeler
+        tek bir seyrek matrisle, aksi halde tek tek hesaplanır.
+        """
+        keys = list(keys)
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        if self._coords or len(keys) < BULK_MIN_SITES:
+            for key, lat, lon in zip(keys, lats.tolist(), lons.tolist()):
+                self.add(key, lat, lon)
+            return
+
+        own = np.asarray(overlap_matrix(lats, lons, self.radius_km).sum(axis=1)).ravel()
+        competitor = competitor_overlap(lats, lons, self.radius_km)
+        for key, lat, lon, o, c in zip(keys, lats.tolist(), lons.tolist(), own.tolist(), competitor.tolist()):
+            self._insert(key, lat, lon, c)
+            self._own[key] = o
+
+    def remove(self, key: Hashable):
+        """Lokasyonu siler; komşuların örtüşme toplamlarından payı düşülür"""
+        if key not in self._coords:
+            return
+        lat, lon = self._coords.pop(key)
+        cell = self._cells[self._cell(lat, lon)]
+        cell.discard(key)
+        if not cell:
+            del self._cells[self._cell(lat, lon)]
+        del self._own[key]
+        del self._competitor[key]
+
+        neighbours, weights = self._neighbours(lat, lon)
+        for neighbour, weight in zip(neighbours, weights):
+            self._own[neighbour] = max(self._own[neighbour] - weight, 0.0)
+
+    def sync(self, keys: Iterable[Hashable], lats, lons):
+        """Ağı verilen nokta kümesine eşitler; yalnızca eklenen ve silinen noktalar işlenir"""
+        keys = list(keys)
+        wanted = set(keys)
+        for key in [key for key in self._coords if key not in wanted]:
+            self.remove(key)
+        new = [i for i, key in enumerate(keys) if key not in self._coords]
+        if new:
+            self.add_many([keys[i] for i in new], np.asarray(lats)[new], np.asarray(lons)[new])
+
+    def retention(self, key: Hashable) -> float:
+        """Lokasyonun ağdaki diğer lokasyonlar yüzünden kaybetmediği pay oranı (0-1)"""
+        competitor = self._competitor[key]
+        return (1 + competitor) / (1 + competitor + self._own[key])
+
+    def summary(self, keys: Optional[Iterable[Hashable]] = None) -> pd.DataFrame:
+        """
+        Lokasyon başına örtüşme özetini döndürür.
+
+        Returns:
+            pd.DataFrame: 'own_overlap', 'competitor_overlap' ve 'retention' sütunları
+        """
+        keys = list(self._coords) if keys is None else list(keys)
+        own = np.array([self._own[key] for key in keys], dtype=np.float64)
+        competitor = np.array([self._competitor[key] for key in keys], dtype=np.float64)
+        return pd.DataFrame({
+            'own_overlap': own,
+            'competitor_overlap': competitor,
+            'retention': (1 + competitor) / (1 + competitor + own)
+        }, index=keys)
+
+
+def cannibalization(lats, lons, radius_km: float = OVERLAP_RADIUS_KM) -> pd.DataFrame:
+    """
+    Bir nokta kümesi için örtüşme özetini tek seferde hesaplar.
+
+    Returns:
+        pd.DataFrame: Girdi sırasıyla 'own_overlap', 'competitor_overlap' ve 'retention'
+    """
+    lats = np.asarray(lats, dtype=np.float64)
+    lons = np.asarray(lons, dtype=np.float64)
+    own = np.asarray(overlap_matrix(lats, lons, radius_km).sum(axis=1)).ravel()
+    competitor = competitor_overlap(lats, lons, radius_km)
+    return pd.DataFrame({
+        'own_overlap': own,
+        'competitor_overlap': competitor,
+        'retention': (1 + competitor) / (1 + competitor + own)
+    })
@@ -0,0 +1,200 @@
+"""
+Nüfus ve EV sahipliği rasterı üzerinden mesafeyle azalan çekim alanı talebi.
+
+Şehir, CATCHMENT_RESOLUTION_M çözünürlüklü bir ızgaraya bölünür. Nüfus
+noktaları dosyası (veriler/nufus_noktalari.csv) varsa nüfus hücrelere
+toplanır; yoksa şehir nüfusu merkezden uzaklaştıkça azalan bir yoğunlukla
+dağıtılır. Her hücrenin çekim alanı nüfusu ve EV sahibi sayısı, üstel
+azalan çekirdekle FFT konvolüsyonu kullanılarak tüm hücreler için tek
+seferde hesaplanır. Raster şehir başına bir kez hesaplanır; nokta sorguları
+yalnızca hücre indeksi hesabıdır.
+"""
+import math
+import os
+from functools import lru_cache
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from heatmap import CITY_COORDS, CITY_EXTENT_KM, KM_PER_DEGREE, city_bounds
+
+POPULATION_POINTS_PATH = os.path.join('veriler', 'nufus_noktalari.csv')
+
+CATCHMENT_RESOLUTION_M = 250.0
+
+# Çekim alanı ağırlığı exp(-d / DECAY_KM); CATCHMENT_RADIUS_KM ötesi sıfır
+DECAY_KM = 2.0
+CATCHMENT_RADIUS_KM = 6.0
+
+# Nüfus noktası verisi yokken nüfus yoğunluğunun merkezden azalma ölçeği
+# (şehir yarıçapına oran) ve EV sahipliğinin merkez/çevre oranı
+POPULATION_SPREAD = 0.35
+EV_OUTSKIRT_RATIO = 0.6
+
+
+class CatchmentRaster:
+    """Bir şehrin nüfus, çekim alanı nüfusu ve çekim alanı EV sahibi rasterları"""
+
+    def __init__(self, city: str, south: float, west: float, step_lat: float, step_lon: float,
+                 population: np.ndarray, catchment_population: np.ndarray, catchment_ev: np.ndarray):
+        self.city = city
+        self.south = south
+        self.west = west
+        self.step_lat = step_lat
+        self.step_lon = step_lon
+        self.population = population
+        self.catchment_population = catchment_population
+        self.catchment_ev = catchment_ev
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.ev_share = np.where(catchment_population > 0, catchment_ev / catchment_population * 100, 0).astype(np.float32)
+        self.shape = population.shape
+        for array in (population, catchment_population, catchment_ev, self.ev_share):
+            array.setflags(write=False)
+
+    def cell(self, lat: float, lon: float) -> Optional[tuple]:
+        """Noktanın hücre indeksi (raster dışındaysa None)"""
+        row = math.floor((lat - self.south) / self.step_lat)
+        col = math.floor((lon - self.west) / self.step_lon)
+        if 0 <= row < self.shape[0] and 0 <= col < self.shape[1]:
+            return row, col
+        return None
+
+    def lookup(self, lat: float, lon: float) -> Optional[Dict[str, float]]:
+        """
+        Tek noktanın çekim alanı değerleri.
+
+        Returns:
+            Optional[Dict[str, float]]: 'catchment_population', 'catchment_ev_owners'
+            ve 'ev_ownership' (%); nokta raster dışındaysa None
+        """
+        cell = self.cell(lat, lon)
+        if cell is None:
+            return None
+        return {
+            'catchment_population': float(self.catchment_population[cell]),
+            'catchment_ev_owners': float(self.catchment_ev[cell]),
+            'ev_ownership': float(self.ev_share[cell])
+        }
+
+    def lookup_many(self, lats, lons) -> pd.DataFrame:
+        """lookup'ın toplu sürümü; raster dışındaki noktalar NaN"""
+        rows = np.floor((np.asarray(lats, dtype=np.float64) - self.south) / self.step_lat).astype(np.int64)
+        cols = np.floor((np.asarray(lons, dtype=np.float64) - self.west) / self.step_lon).astype(np.int64)
+        inside = (rows >= 0) & (rows < self.shape[0]) & (cols >= 0) & (cols < self.shape[1])
+        rows, cols = np.where(inside, rows, 0), np.where(inside, cols, 0)
+
+        def pick(raster):
+            return np.where(inside, raster[rows, cols], np.nan)
+
+        return pd.DataFrame({
+            'catchment_population': pick(self.catchment_population),
+            'catchment_ev_owners': pick(self.catchment_ev),
+            'ev_ownership': pick(self.ev_share)
+        })
+
+
+def decay_kernel(step_y_km: float, step_x_km: float, decay_km: float = DECAY_KM, radius_km: float = CATCHMENT_RADIUS_KM) -> np.ndarray:
+    """Hücre boyutlarına göre exp(-d / decay_km) çekirdeği (radius_km ile kesilmiş)"""
+    ny = int(radius_km // step_y_km)
+    nx = int(radius_km // step_x_km)
+    dy = np.arange(-ny, ny + 1)[:, None] * step_y_km
+    dx = np.arange(-nx, nx + 1)[None, :] * step_x_km
+    distance = np.sqrt(dy * dy + dx * dx)
+    return np.where(distance <= radius_km, np.exp(-distance / decay_km), 0.0)
+
+
+def fft_convolve(raster: np.ndarray, kernel: np.ndarray) -> np.ndarray:
+    """
+    Rasterı çekirdekle FFT üzerinden konvolüsyona sokar ('same' boyutunda).
+
+    Taşmayı önlemek için her iki dizi de tam konvolüsyon boyutuna sıfırla
+    doldurulur; sonuç rasterla aynı boyutta kırpılır.
+    """
+    shape = (raster.shape[0] + kernel.shape[0] - 1, raster.shape[1] + kernel.shape[1] - 1)
+    spectrum = np.fft.rfft2(raster, shape) * np.fft.rfft2(kernel, shape)
+    full = np.fft.irfft2(spectrum, shape)
+    top = (kernel.shape[0] - 1) // 2
+    left = (kernel.shape[1] - 1) // 2
+    # FFT yuvarlama hatası nedeniyle oluşan çok küçük negatif değerler temizlenir
+    return np.maximum(full[top:top + raster.shape[0], left:left + raster.shape[1]], 0)
+
+
+def _modelled_population(city: str, lats: np.ndarray, lons: np.ndarray, population: float, ev_ownership: float):
+    """Nüfus verisi yokken şehir nüfusunu merkezden azalan yoğunlukla hücrelere dağıtır"""
+    center_lat, center_lon = CITY_COORDS[city]
+    dy = (lats[:, None] - center_lat) * KM_PER_DEGREE
+    dx = (lons[None, :] - center_lon) * KM_PER_DEGREE * np.cos(np.radians(center_lat))
+    decay = np.exp(-(np.sqrt(dx * dx + dy * dy) / (POPULATION_SPREAD * CITY_EXTENT_KM[city])) ** 2)
+
+    people = decay / decay.sum() * population
+    # EV sahipliği merkezde daha yüksek; nüfus ağırlıklı ortalama şehir oranına eşit
+    share = EV_OUTSKIRT_RATIO + (1 - EV_OUTSKIRT_RATIO) * decay
+    share = share * ev_ownership / ((share * people).sum() / people.sum())
+    return people, people * share / 100
+
+
+def _rasterize_points(points: pd.DataFrame, south: float, west: float, step_lat: float, step_lon: float,
+                      shape: tuple, default_ev_ownership: float):
+    """Nüfus noktalarını hücrelere toplar"""
+    rows = np.floor((points['lat'].to_numpy() - south) / step_lat).astype(np.int64)
+    cols = np.floor((points['lon'].to_numpy() - west) / step_lon).astype(np.int64)
+    inside = (rows >= 0) & (rows < shape[0]) & (cols >= 0) & (cols < shape[1])
+    flat = rows[inside] * shape[1] + cols[inside]
+
+    people = points['population'].to_numpy(dtype=np.float64)[inside]
+    if 'ev_ownership' in points:
+        share = points['ev_ownership'].fillna(default_ev_ownership).to_numpy(dtype=np.float64)[inside]
+    else:
+        share = np.full(len(people), default_ev_ownership)
+
+    size = shape[0] * shape[1]
+    population = np.bincount(flat, weights=people, minlength=size).reshape(shape)
+    ev_owners = np.bincount(flat, weights=people * share / 100, minlength=size).reshape(shape)
+    return population, ev_owners
+
+
+@lru_cache(maxsize=1)
+def load_population_points(path: str = POPULATION_POINTS_PATH) -> Optional[pd.DataFrame]:
+    """'lat', 'lon', 'population' (ve isteğe bağlı 'ev_ownership' %) sütunlu nüfus noktaları"""
+    if not os.path.exists(path):
+        return None
+    df = pd.read_csv(path)
+    return df.dropna(subset=['lat', 'lon', 'population'])
+
+
+@lru_cache(maxsize=8)
+def city_catchment(city: str, population: float, ev_ownership: float, resolution_m: float = CATCHMENT_RESOLUTION_M) -> CatchmentRaster:
+    """
+    Şehrin çekim alanı rasterını hesaplar (şehir başına bir kez, önbellekli).
+
+    Args:
+        city: Şehir adı (CITY_COORDS anahtarı)
+        population: Nüfus verisi yokken dağıtılacak şehir nüfusu
+        ev_ownership: Şehir geneli EV sahiplik oranı (%)
+        resolution_m: Hücre kenar uzunluğu (metre)
+
+    Returns:
+        CatchmentRaster: Salt okunur rasterlar ve nokta sorguları
+    """
+    south, west, north, east = city_bounds(city)
+    center_lat = CITY_COORDS[city][0]
+    step_km = resolution_m / 1000
+    step_lat = step_km / KM_PER_DEGREE
+    step_lon = step_km / (KM_PER_DEGREE * np.cos(np.radians(center_lat)))
+    lats = south + (np.arange(int(math.ceil((north - south) / step_lat))) + 0.5) * step_lat
+    lons = west + (np.arange(int(math.ceil((east - west) / step_lon))) + 0.5) * step_lon
+
+    points = load_population_points()
+    if points is not None:
+        people, ev_owners = _rasterize_points(points, south, west, step_lat, step_lon, (len(lats), len(lons)), ev_ownership)
+    else:
+        people, ev_owners = _modelled_population(city, lats, lons, population, ev_ownership)
+
+    kernel = decay_kernel(step_km, step_km)
+    return CatchmentRaster(
+        city, south, west, step_lat, step_lon,
+        people.astype(np.float32),
+        fft_convolve(people, kernel).astype(np.float32),
+        fft_convolve(ev_owners, kernel).astype(np.float32)
+    )
@@ -0,0 +1,180 @@
+"""
+İstasyon tipine göre yıllık (8760 saat) enerji maliyeti ve şebeke kapasitesi modeli.
+
+Saatlik talep, trafik grafiğindeki günlük sinüs eğrisinin hafta sonu ve
+mevsim çarpanlarıyla yıla yayılmasından elde edilir; şarj süresi bir saati
+aşan istasyonlarda oturumun enerjisi sonraki saatlere dağıtılır. Her saat
+çekilen güç, şebeke bağlantı gücü ve kurulu şarj gücüyle sınırlanır;
+sınırı aşan enerji karşılanamayan oturum olarak raporlanır.
+
+Tüm lokasyonlar aynı normalize profili paylaştığı için bir lokasyonun saatlik
+yükü tek bir ölçek çarpanıdır. Tarife dilimi başına sıralanmış profil ve
+kümülatif toplamlar sayesinde min(ölçek x profil, kapasite) toplamları
+8760 saatin tamamı üzerinden tam olarak, ancak (lokasyon x yıl x 8760)
+boyutlu dizi oluşturulmadan hesaplanır.
+"""
+from typing import Dict, Optional
+
+import numpy as np
+
+from queueing import STATION_PROFILES
+
+HOURS_PER_YEAR = 8760
+
+# Şarj eğrisi nedeniyle oturum boyunca ortalama gücün anma gücüne oranı
+AVERAGE_POWER_FACTOR = 0.6
+
+# İstasyon tipine göre şebeke bağlantı gücü (kW); kurulu güçten düşük olabilir
+GRID_CONNECTION_KW = {
+    "AC Normal Şarj": 50,
+    "DC Hızlı Şarj": 200,
+    "Ultra Hızlı Şarj": 400
+}
+
+# Üç zamanlı ticari tarife: dilim adı -> (başlangıç saati, bitiş saati, TL/kWh)
+TARIFF_BANDS = {
+    "Gündüz": (6, 17, 3.0),
+    "Puant": (17, 22, 4.5),
+    "Gece": (22, 6, 1.9)
+}
+
+# Aylık en yüksek çekilen güç üzerinden güç bedeli (TL/kW/ay)
+DEMAND_CHARGE_TL_PER_KW = 80.0
+
+# Hafta sonu talep çarpanı ve mevsimsel (kışın daha yüksek) talep genliği
+WEEKEND_FACTOR = 0.85
+SEASONAL_AMPLITUDE = 0.1
+
+_MONTH_DAYS = np.array([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+MONTH_OF_HOUR = np.repeat(np.arange(12), _MONTH_DAYS * 24)
+
+
+def daily_shape(hours) -> np.ndarray:
+    """Trafik grafiğindeki günlük sinüs eğrisi (ortalaması 1, öğleden sonra zirveli)"""
+    return 1 + 0.5 * np.sin((np.asarray(hours, dtype=np.float64) - 8) * np.pi / 12)
+
+
+def _hour_band(hours: np.ndarray) -> np.ndarray:
+    """Günün saatlerini TARIFF_BANDS sırasındaki dilim indeksine çevirir"""
+    band = np.empty(len(hours), dtype=np.int64)
+    for i, (start, end, _) in enumerate(TARIFF_BANDS.values()):
+        in_band = (hours >= start) & (hours < end) if start < end else (hours >= start) | (hours < end)
+        band[in_band] = i
+    return band
+
+
+def annual_profile(station_type: str) -> np.ndarray:
+    """
+    İstasyon tipinin yıllık saatlik enerji profilini döndürür.
+
+    Profil, günlük ortalama 1 oturumluk enerjiyi (toplamı 365) saatlere dağıtır.
+
+    Args:
+        station_type: İstasyon tipi
+
+    Returns:
+        np.ndarray: 8760 uzunluğunda profil
+    """
+    hour = np.arange(HOURS_PER_YEAR)
+    day = hour // 24
+    profile = daily_shape(hour % 24)
+    profile = profile * np.where(day % 7 >= 5, WEEKEND_FACTOR, 1.0)
+    profile = profile * (1 + SEASONAL_AMPLITUDE * np.cos(2 * np.pi * (day - 15) / 365))
+
+    # Bir saatten uzun oturumların enerjisi sonraki saatlere dağılır (dairesel)
+    span = max(1, int(round(STATION_PROFILES[station_type]['mean_minutes'] / 60)))
+    if span > 1:
+        profile = sum(np.roll(profile, shift) for shift in range(span)) / span
+
+    return profile * 365 / profile.sum()
+
+
+def session_energy_kwh(station_type: str) -> float:
+    """Ortalama oturumda verilen enerji (kWh)"""
+    profile = STATION_PROFILES[station_type]
+    return profile['power_kw'] * AVERAGE_POWER_FACTOR * profile['mean_minutes'] / 60
+
+
+def capacity_kw(station_type: str, chargers: Optional[int] = None, grid_kw: Optional[float] = None) -> float:
+    """Şebeke bağlantı gücü ile kurulu şarj gücünden küçük olanı"""
+    profile = STATION_PROFILES[station_type]
+    if chargers is None:
+        chargers = int(profile['chargers'])
+    if grid_kw is None:
+        grid_kw = GRID_CONNECTION_KW[station_type]
+    return float(min(grid_kw, chargers * profile['power_kw']))
+
+
+def _capped_sum(sorted_profile: np.ndarray, cumulative: np.ndarray, scale: np.ndarray, cap: float) -> np.ndarray:
+    """Σ min(scale x profil, cap) toplamını sıralı profil üzerinden hesaplar"""
+    with np.errstate(divide='ignore'):
+        threshold = np.where(scale > 0, cap / scale, np.inf)
+    below = np.searchsorted(sorted_profile, threshold, side='right')
+    return scale * cumulative[below] + cap * (len(sorted_profile) - below)
+
+
+def energy_model(
+    daily_sessions,
+    station_type: str,
+    years: int = 3,
+    growth_factor=1.0,
+    chargers: Optional[int] = None,
+    grid_kw: Optional[float] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Lokasyon ve yıl başına enerji maliyeti, en yüksek güç ve karşılanamayan oturumları hesaplar.
+
+    Args:
+        daily_sessions: Lokasyon başına ilk yıl günlük (karşılanan) şarj oturumu
+        station_type: İstasyon tipi
+        years: Projeksiyon yılı sayısı
+        growth_factor: Lokasyon başına yıllık oturum büyüme çarpanı
+        chargers: Soket sayısı (None ise tipin varsayılanı)
+        grid_kw: Şebeke bağlantı gücü (None ise tipin varsayılanı)
+
+    Returns:
+        Dict[str, np.ndarray]: (lokasyon x yıl) boyutlu 'energy_kwh', 'energy_cost',
+        'demand_charge', 'peak_kw', 'curtailed_kwh', 'curtailed_sessions';
+        (lokasyon x yıl x dilim) 'band_kwh' ve (lokasyon x yıl x 12) 'monthly_peak_kw'
+    """
+    daily_sessions = np.atleast_1d(np.asarray(daily_sessions, dtype=np.float64))
+    growth_factor = np.broadcast_to(np.asarray(growth_factor, dtype=np.float64), daily_sessions.shape)
+    profile = annual_profile(station_type)
+    energy = session_energy_kwh(station_type)
+    cap = capacity_kw(station_type, chargers, grid_kw)
+
+    # (lokasyon x yıl) saatlik yük ölçeği: günlük ortalama enerji (kWh)
+    scale = daily_sessions[:, None] * growth_factor[:, None] ** np.arange(years) * energy
+
+    bands = _hour_band(np.arange(HOURS_PER_YEAR) % 24)
+    prices = np.array([price for _, _, price in TARIFF_BANDS.values()])
+    band_kwh = np.empty(scale.shape + (len(prices),))
+    for i in range(len(prices)):
+        sorted_profile = np.sort(profile[bands == i])
+        cumulative = np.concatenate([[0.0], np.cumsum(sorted_profile)])
+        band_kwh[..., i] = _capped_sum(sorted_profile, cumulative, scale, cap)
+
+    # Aylık zirve: min(ölçek x aylık profil zirvesi, kapasite)
+    month_peak = np.array([profile[MONTH_OF_HOUR == m].max() for m in range(12)])
+    monthly_peak_kw = np.minimum(scale[..., None] * month_peak, cap)
+
+    energy_kwh = band_kwh.sum(axis=-1)
+    demand_charge = monthly_peak_kw.sum(axis=-1) * DEMAND_CHARGE_TL_PER_KW
+    curtailed_kwh = np.maximum(scale * profile.sum() - energy_kwh, 0)
+
+    return {
+        'energy_kwh': energy_kwh,
+        'energy_cost': band_kwh @ prices + demand_charge,
+        'demand_charge': demand_charge,
+        'band_kwh': band_kwh,
+        'peak_kw': monthly_peak_kw.max(axis=-1),
+        'monthly_peak_kw': monthly_peak_kw,
+        'curtailed_kwh': curtailed_kwh,
+        'curtailed_sessions': curtailed_kwh / energy
+    }
+
+
+def hourly_load(daily_sessions: float, station_type: str, chargers: Optional[int] = None, grid_kw: Optional[float] = None) -> np.ndarray:
+    """Tek lokasyonun ilk yıl 8760 saatlik çekilen gücü (kW, kapasiteyle sınırlı)"""
+    load = daily_sessions * session_energy_kwh(station_type) * annual_profile(station_type)
+    return np.minimum(load, capacity_kw(station_type, chargers, grid_kw))
@@ -0,0 +1,176 @@
+"""
+Lokasyon verisi kaynaklarını (adres, demografi, trafik, rekabet) eşzamanlı çalıştıran zenginleştirme katmanı.
+
+Her kaynak, pipeline aşamaları gibi hangi girdilere veya hangi diğer
+kaynaklara bağlı olduğunu bildirir. Bağımlılıkları hazır olan kaynaklar
+süreç genelinde paylaşılan, sınırlı boyutlu bir iş parçacığı havuzunda
+aynı anda çalıştırılır; böylece bir lokasyonun toplam gecikmesi kaynak
+sürelerinin toplamı yerine en yavaş bağımlılık zincirine iner. Birden çok
+satır (lokasyon) verildiğinde tüm satırların kaynakları aynı havuzda
+birlikte yürütülür.
+
+Zaman aşımına uğrayan veya hata veren kaynağın yerine yedek fonksiyonunun
+sonucu kullanılır ve hata sonuçta raporlanır (kısmi sonuç). Yedeği olmayan
+kaynaklar zorunludur; hataları çağırana iletilir. Zaman aşımı, kaynak
+havuzda sırasını bekleyip çalışmaya başladığı anda işlemeye başlar. Zaman
+aşımına uğrayan iş parçacıkları durdurulamaz; en fazla bir zaman aşımı
+süresi daha eşzamanlılık sınırından sayılır, sonra sınırdan düşülür.
+
+Kaynak fonksiyonları run_sources'u yeniden çağırmamalıdır: dolu havuzda
+iç içe bekleme kilitlenmeye yol açar.
+
+Örnek:
+    sources = [
+        Source('address', get_address_from_coords, ['lat', 'lon'], timeout=10),
+        Source('traffic', analyze_traffic, ['lat', 'lon'], fallback=simulated_traffic),
+        Source('competition', competition, ['lat', 'lon', 'traffic'])
+    ]
+    run_sources(sources, [{'lat': 41.0, 'lon': 29.0}])
+"""
+import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+# Havuzdaki iş parçacığı sayısı (tüm oturumlar ve çağrılar paylaşır)
+DEFAULT_MAX_WORKERS = int(os.getenv('ENRICHMENT_WORKERS', 16))
+
+# Kaynak başına varsayılan zaman aşımı (saniye)
+DEFAULT_TIMEOUT = 15.0
+
+# Havuzda sırası gelmemiş zaman aşımlı işlerin başlayıp başlamadığına bakılma aralığı (saniye)
+START_POLL_INTERVAL = 0.05
+
+
+class Source:
+    """Zenginleştirme kaynağı: fonksiyon, girdileri, zaman aşımı ve isteğe bağlı yedek"""
+    __slots__ = ('name', 'fn', 'inputs', 'timeout', 'fallback')
+
+    def __init__(self, name: str, fn: Callable, inputs: Sequence[str], timeout: Optional[float] = DEFAULT_TIMEOUT,
+                 fallback: Optional[Callable] = None):
+        """
+        Args:
+            name: Kaynak adı
+            fn: Girdileri bildirildiği sırayla konumsal argüman olarak alan fonksiyon
+            inputs: Girdi adları; başka bir kaynağın adı verilirse o kaynağın sonucu geçirilir
+            timeout: Çalışmaya başladığı andan itibaren en fazla bekleme süresi (None ise sınırsız)
+            fallback: Hata veya zaman aşımında aynı argümanlarla çağrılan yedek
+                (None ise kaynak zorunludur)
+        """
+        self.name = name
+        self.fn = fn
+        self.inputs = tuple(inputs)
+        self.timeout = timeout
+        self.fallback = fallback
+
+
+@lru_cache(maxsize=1)
+def get_executor() -> ThreadPoolExecutor:
+    """Süreç genelinde paylaşılan zenginleştirme havuzunu döndürür"""
+    return ThreadPoolExecutor(max_workers=DEFAULT_MAX_WORKERS, thread_name_prefix='enrichment')
+
+
+def _timed(fn: Callable, args: List[Any], started: List[float]):
+    """Fonksiyonu çalıştırıp sonucunu ve süresini döndürür; başlama anı started listesine eklenir"""
+    started.append(time.monotonic())
+    result = fn(*args)
+    return result, time.monotonic() - started[0]
+
+
+def run_sources(
+    sources: Sequence[Source],
+    rows: Sequence[Dict[str, Any]],
+    max_in_flight: int = DEFAULT_MAX_WORKERS,
+    executor: Optional[ThreadPoolExecutor] = None
+) -> List[Dict[str, Dict[str, Any]]]:
+    """
+    Her satır için kaynakları bağımlılık sırasına uyarak eşzamanlı çalıştırır.
+
+    Args:
+        sources: Kaynaklar
+        rows: Satır başına temel girdi değerleri (örn. {'lat': ..., 'lon': ...})
+        max_in_flight: Bu çağrının aynı anda çalıştırabileceği en fazla kaynak sayısı
+        executor: İş parçacığı havuzu (None ise süreç geneli havuz)
+
+    Returns:
+        List[Dict[str, Dict[str, Any]]]: Satır sırasıyla 'results' (kaynak adı ->
+        sonuç veya yedek), 'errors' (kaynak adı -> hata açıklaması) ve 'elapsed'
+        (kaynak adı -> saniye; yedeğe düşenler için beklenen süre)
+    """
+    executor = executor or get_executor()
+    by_name = {source.name: source for source in sources}
+    dependents = {name: [s.name for s in sources if name in s.inputs] for name in by_name}
+    outputs = [{'results': {}, 'errors': {}, 'elapsed': {}} for _ in rows]
+    waiting = [
+        {s.name: sum(item in by_name for item in s.inputs) for s in sources}
+        for _ in rows
+    ]
+
+    ready = deque((i, s.name) for i in range(len(rows)) for s in sources if waiting[i][s.name] == 0)
+    running: Dict[Future, tuple] = {}
+    # Zaman aşımına uğramış ama hâlâ çalışan işler -> sınırdan düşülecekleri an
+    abandoned: Dict[Future, float] = {}
+
+    def args_for(i: int, source: Source) -> List[Any]:
+        return [outputs[i]['results'][item] if item in by_name else rows[i][item] for item in source.inputs]
+
+    def resolve(i: int, name: str, result=None, error: Optional[BaseException] = None, elapsed: float = 0.0):
+        source = by_name[name]
+        if error is not None:
+            if source.fallback is None:
+                raise error
+            outputs[i]['errors'][name] = str(error) or type(error).__name__
+            result = source.fallback(*args_for(i, source))
+        outputs[i]['results'][name] = result
+        outputs[i]['elapsed'][name] = round(elapsed, 4)
+        for dependent in dependents[name]:
+            waiting[i][dependent] -= 1
+            if waiting[i][dependent] == 0:
+                ready.append((i, dependent))
+
+    while ready or running:
+        while ready and len(running) + len(abandoned) < max_in_flight:
+            i, name = ready.popleft()
+            source = by_name[name]
+            started: List[float] = []
+            future = executor.submit(_timed, source.fn, args_for(i, source), started)
+            running[future] = (i, name, started)
+
+        # Başlamış işler zaman aşımlarında, başlamamışlar kısa aralıklarla yoklanır;
+        # bırakılan işler için de sınırdan düşülecekleri an beklenir
+        now = time.monotonic()
+        deadlines = [
+            started[0] + by_name[name].timeout if started else now + START_POLL_INTERVAL
+            for i, name, started in running.values()
+            if by_name[name].timeout is not None
+        ]
+        deadlines.extend(abandoned.values())
+        timeout = max(min(deadlines) - now, 0) if deadlines else None
+        done, _ = wait(set(running) | set(abandoned), timeout=timeout, return_when=FIRST_COMPLETED)
+
+        for future in done:
+            if future in abandoned:
+                del abandoned[future]
+                continue
+            i, name, started = running.pop(future)
+            error = future.exception()
+            if error is not None:
+                resolve(i, name, error=error, elapsed=time.monotonic() - started[0] if started else 0.0)
+            else:
+                result, elapsed = future.result()
+                resolve(i, name, result=result, elapsed=elapsed)
+
+        now = time.monotonic()
+        for future, release in list(abandoned.items()):
+            if now >= release:
+                del abandoned[future]
+        for future, (i, name, started) in list(running.items()):
+            timeout = by_name[name].timeout
+            if timeout is not None and started and now - started[0] >= timeout:
+                del running[future]
+                abandoned[future] = now + timeout
+                resolve(i, name, error=TimeoutError(f"{name} {timeout:g} sn içinde yanıt vermedi"), elapsed=now - started[0])
+
+    return outputs
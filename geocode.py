@@ -0,0 +1,133 @@
+import os
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+GEOCODE_DB_PATH = os.path.join('.cache', 'geocode.sqlite')
+
+# Koordinatların yuvarlanacağı ondalık basamak sayısı (4 basamak ~ 11 m)
+DEFAULT_PRECISION = int(os.getenv('GEOCODE_PRECISION', 4))
+
+# Nominatim kullanım politikası: saniyede en fazla 1 istek
+MIN_REQUEST_INTERVAL = 1.0
+
+NOT_FOUND = "Adres bulunamadı"
+
+_rate_lock = threading.Lock()
+_last_request_at = 0.0
+
+
+@lru_cache(maxsize=1)
+def get_geolocator():
+    """Süreç genelinde paylaşılan Nominatim istemcisini döndürür"""
+    from geopy.geocoders import Nominatim
+    return Nominatim(user_agent="ev_charger_app", timeout=10)
+
+
+def _wait_for_slot():
+    """Ardışık istekler arasında en az MIN_REQUEST_INTERVAL saniye bekler"""
+    global _last_request_at
+    with _rate_lock:
+        wait = _last_request_at + MIN_REQUEST_INTERVAL - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        _last_request_at = time.monotonic()
+
+
+def quantize(lat: float, lon: float, precision: int = DEFAULT_PRECISION) -> Tuple[int, int]:
+    """Koordinatları önbellek anahtarı olarak kullanılacak tamsayılara çevirir"""
+    scale = 10 ** precision
+    return int(round(lat * scale)), int(round(lon * scale))
+
+
+def _connect(db_path: str) -> sqlite3.Connection:
+    directory = os.path.dirname(db_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS addresses (
+            precision INTEGER NOT NULL,
+            lat_q INTEGER NOT NULL,
+            lon_q INTEGER NOT NULL,
+            address TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            PRIMARY KEY (precision, lat_q, lon_q)
+        )
+    """)
+    return conn
+
+
+def _lookup(conn: sqlite3.Connection, precision: int, keys: Iterable[Tuple[int, int]]) -> Dict[Tuple[int, int], str]:
+    found = {}
+    for lat_q, lon_q in keys:
+        row = conn.execute(
+            "SELECT address FROM addresses WHERE precision = ? AND lat_q = ? AND lon_q = ?",
+            (precision, lat_q, lon_q)
+        ).fetchone()
+        if row:
+            found[(lat_q, lon_q)] = row[0]
+    return found
+
+
+def _resolve(lat: float, lon: float) -> Optional[str]:
+    """Tek bir noktayı hız sınırına uyarak ağ üzerinden çözer"""
+    _wait_for_slot()
+    try:
+        location = get_geolocator().reverse((lat, lon), language="tr")
+    except Exception:
+        return None
+    return location.address if location else None
+
+
+def reverse_geocode_batch(
+    points: Iterable[Tuple[float, float]],
+    precision: int = DEFAULT_PRECISION,
+    db_path: str = GEOCODE_DB_PATH
+) -> List[str]:
+    """
+    Çok sayıda noktanın adresini önbellek üzerinden toplu olarak çözer.
+
+    Noktalar precision basamağa yuvarlanarak tekilleştirilir; önbellekte
+    bulunmayanlar hız sınırına uyularak sırayla sorgulanır ve kaydedilir.
+
+    Args:
+        points: (enlem, boylam) çiftleri
+        precision: Anahtar için kullanılacak ondalık basamak sayısı
+        db_path: SQLite önbellek dosyası
+
+    Returns:
+        List[str]: Girdi sırasıyla adresler (çözülemeyenler için NOT_FOUND)
+    """
+    points = list(points)
+    keys = [quantize(lat, lon, precision) for lat, lon in points]
+
+    conn = _connect(db_path)
+    try:
+        addresses = _lookup(conn, precision, set(keys))
+        for key, (lat, lon) in zip(keys, points):
+            if key in addresses:
+                continue
+            address = _resolve(lat, lon)
+            if address is None:
+                # Hatalı sonuçları önbelleğe yazma, sonraki çağrıda tekrar denensin
+                addresses[key] = NOT_FOUND
+                continue
+            addresses[key] = address
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO addresses VALUES (?, ?, ?, ?, ?)",
+                    (precision, key[0], key[1], address, time.time())
+                )
+    finally:
+        conn.close()
+
+    return [addresses[key] for key in keys]
+
+
+def reverse_geocode(lat: float, lon: float, precision: int = DEFAULT_PRECISION, db_path: str = GEOCODE_DB_PATH) -> str:
+    """Tek bir noktanın adresini önbellek üzerinden çözer"""
+    return reverse_geocode_batch([(lat, lon)], precision, db_path)[0]
@@ -0,0 +1,222 @@
+import numpy as np
+import pandas as pd
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
+
+from utils import DEFAULT_WEIGHTS, analyze_demographics_batch, calculate_location_scores
+
+# Şehir merkez koordinatları
+CITY_COORDS: Dict[str, List[float]] = {
+    "İstanbul": [41.0082, 28.9784],
+    "Ankara": [39.9334, 32.8597],
+    "İzmir": [38.4237, 27.1428],
+    "Bursa": [40.1885, 29.0610],
+    "Antalya": [36.8969, 30.7133]
+}
+
+# Merkezden her yöne taranacak mesafe (km)
+CITY_EXTENT_KM: Dict[str, float] = {
+    "İstanbul": 35.0,
+    "Ankara": 25.0,
+    "İzmir": 22.0,
+    "Bursa": 18.0,
+    "Antalya": 18.0
+}
+
+# Şehir bazlı yaklaşık demografik profiller (ızgara hücrelerinin taban değerleri)
+CITY_PROFILES: Dict[str, Dict[str, float]] = {
+    "İstanbul": {"avg_income": 165000, "ev_ownership": 0.08, "25-40": 0.27, "41-55": 0.20, "18-24": 0.11, "55+": 0.19},
+    "Ankara": {"avg_income": 150000, "ev_ownership": 0.06, "25-40": 0.26, "41-55": 0.20, "18-24": 0.12, "55+": 0.20},
+    "İzmir": {"avg_income": 140000, "ev_ownership": 0.05, "25-40": 0.24, "41-55": 0.21, "18-24": 0.10, "55+": 0.24},
+    "Bursa": {"avg_income": 125000, "ev_ownership": 0.04, "25-40": 0.26, "41-55": 0.20, "18-24": 0.11, "55+": 0.19},
+    "Antalya": {"avg_income": 120000, "ev_ownership": 0.03, "25-40": 0.26, "41-55": 0.20, "18-24": 0.11, "55+": 0.19}
+}
+
+KM_PER_DEGREE = 111.32
+
+# Bir seferde değerlendirilecek en fazla hücre sayısı
+CHUNK_CELLS = 262144
+
+
+def city_bounds(city: str) -> Tuple[float, float, float, float]:
+    """
+    Şehrin tarama sınırlarını hesaplar.
+
+    Args:
+        city: Şehir adı (CITY_COORDS anahtarı)
+
+    Returns:
+        Tuple[float, float, float, float]: (güney, batı, kuzey, doğu) sınırları
+    """
+    lat, lon = CITY_COORDS[city]
+    extent = CITY_EXTENT_KM[city]
+    dlat = extent / KM_PER_DEGREE
+    dlon = extent / (KM_PER_DEGREE * np.cos(np.radians(lat)))
+    return lat - dlat, lon - dlon, lat + dlat, lon + dlon
+
+
+def _approximate_competitor_distance(dist_to_center_km: np.ndarray) -> np.ndarray:
+    """İstasyon verisi yokken rakip uzaklığını merkeze uzaklıkla yaklaşık hesaplar"""
+    return 0.5 + 0.15 * dist_to_center_km
+
+
+def grid_inputs(
+    city: str,
+    lats: np.ndarray,
+    lons: np.ndarray,
+    competitor_distance_fn: Optional[Callable[[np.ndarray, np.ndarray], np.ndarray]] = None,
+    ev_ownership: Optional[np.ndarray] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Verilen noktalar için trafik, rakip ve demografik girdileri toplu hesaplar.
+
+    Args:
+        city: Şehir adı
+        lats: Enlem dizisi
+        lons: Boylam dizisi (lats ile aynı boyutta)
+        competitor_distance_fn: (lats, lons) -> rakip uzaklığı (km) fonksiyonu
+        ev_ownership: Nokta başına EV sahiplik oranı (0-1; NaN veya None ise şehir profilinden modellenir)
+
+    Returns:
+        Dict[str, np.ndarray]: calculate_location_scores girdileri
+    """
+    center_lat, center_lon = CITY_COORDS[city]
+    extent = CITY_EXTENT_KM[city]
+    profile = CITY_PROFILES[city]
+
+    dy = (lats - center_lat) * KM_PER_DEGREE
+    dx = (lons - center_lon) * KM_PER_DEGREE * np.cos(np.radians(center_lat))
+    dist = np.sqrt(dx * dx + dy * dy)
+
+    # Trafik ve yaya yoğunluğu merkezden uzaklaştıkça azalır
+    traffic = np.exp(-(dist / (0.45 * extent)) ** 2)
+    pedestrian = np.exp(-(dist / (0.2 * extent)) ** 2)
+
+    if competitor_distance_fn is None:
+        competitor = _approximate_competitor_distance(dist)
+    else:
+        competitor = competitor_distance_fn(lats, lons)
+
+    # Gelir ve EV sahipliği merkez çevresinde daha yüksek
+    decay = 0.6 + 0.4 * np.exp(-(dist / (0.35 * extent)) ** 2)
+    modelled_ev = profile['ev_ownership'] * decay
+    if ev_ownership is not None:
+        modelled_ev = np.where(np.isnan(ev_ownership), modelled_ev, ev_ownership)
+    demographic = analyze_demographics_batch(
+        profile['avg_income'] * decay,
+        modelled_ev,
+        {group: profile[group] for group in ('18-24', '25-40', '41-55', '55+')}
+    )
+
+    return {
+        'traffic_density': traffic,
+        'pedestrian_traffic': pedestrian,
+        'competitor_distance': competitor,
+        'demographic_score': demographic
+    }
+
+
+def compute_city_grid(
+    city: str,
+    resolution_m: float = 100.0,
+    weights: Dict[str, float] = None,
+    competitor_distance_fn: Optional[Callable[[np.ndarray, np.ndarray], np.ndarray]] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Şehrin sınırlarını verilen çözünürlükte tarar ve her hücreyi puanlar.
+
+    Sonuç (şehir, çözünürlük, ağırlıklar) anahtarıyla önbelleğe alınır;
+    dönen diziler salt okunurdur. Özel bir competitor_distance_fn verilirse
+    fonksiyonun kendisi de anahtara dahil edilir.
+
+    Args:
+        city: Şehir adı
+        resolution_m: Hücre kenar uzunluğu (metre)
+        weights: Faktör ağırlıkları
+        competitor_distance_fn: (lats, lons) -> rakip uzaklığı (km) fonksiyonu
+
+    Returns:
+        Dict[str, np.ndarray]: 'lats' (satırlar), 'lons' (sütunlar) ve
+        'scores' (satır x sütun, 0-100 arası float32)
+    """
+    if weights is None:
+        weights = DEFAULT_WEIGHTS
+    return _compute_city_grid(city, float(resolution_m), tuple(sorted(weights.items())), competitor_distance_fn)
+
+
+@lru_cache(maxsize=16)
+def _compute_city_grid(city, resolution_m, weight_items, competitor_distance_fn):
+    south, west, north, east = city_bounds(city)
+    center_lat = CITY_COORDS[city][0]
+
+    step_lat = resolution_m / 1000 / KM_PER_DEGREE
+    step_lon = resolution_m / 1000 / (KM_PER_DEGREE * np.cos(np.radians(center_lat)))
+    lats = np.arange(south, north, step_lat)
+    lons = np.arange(west, east, step_lon)
+    weights = dict(weight_items)
+
+    scores = np.empty((len(lats), len(lons)), dtype=np.float32)
+    rows_per_chunk = max(1, CHUNK_CELLS // len(lons))
+
+    # Bellek kullanımını sınırlamak için satır blokları halinde hesapla
+    for start in range(0, len(lats), rows_per_chunk):
+        block_lats = lats[start:start + rows_per_chunk]
+        lat_grid = np.repeat(block_lats, len(lons))
+        lon_grid = np.tile(lons, len(block_lats))
+        inputs = grid_inputs(city, lat_grid, lon_grid, competitor_distance_fn)
+        block_scores = calculate_location_scores(weights=weights, **inputs)
+        scores[start:start + len(block_lats)] = block_scores.reshape(len(block_lats), len(lons))
+
+    for array in (lats, lons, scores):
+        array.setflags(write=False)
+
+    return {'lats': lats, 'lons': lons, 'scores': scores}
+
+
+def heatmap_points(grid: Dict[str, np.ndarray], max_points: int = 20000) -> List[List[float]]:
+    """
+    Izgarayı folium HeatMap katmanı için [enlem, boylam, ağırlık] listesine çevirir.
+
+    Tarayıcıda çizilebilir kalması için ızgara max_points hücreye seyreltilir.
+
+    Args:
+        grid: compute_city_grid sonucu
+        max_points: Döndürülecek en fazla nokta sayısı
+
+    Returns:
+        List[List[float]]: HeatMap verisi (ağırlıklar 0-1 arası)
+    """
+    scores = grid['scores']
+    stride = max(1, int(np.ceil(np.sqrt(scores.size / max_points))))
+    sub_scores = scores[::stride, ::stride]
+    lat_grid, lon_grid = np.meshgrid(grid['lats'][::stride], grid['lons'][::stride], indexing='ij')
+
+    points = np.column_stack([
+        lat_grid.ravel(),
+        lon_grid.ravel(),
+        sub_scores.ravel().astype(np.float64) / 100
+    ])
+    return points.tolist()
+
+
+def top_cells(grid: Dict[str, np.ndarray], n: int = 20000) -> pd.DataFrame:
+    """
+    Izgaradaki en yüksek puanlı n hücreyi aday tablosu olarak döndürür.
+
+    Args:
+        grid: compute_city_grid sonucu
+        n: Döndürülecek hücre sayısı
+
+    Returns:
+        pd.DataFrame: 'lat', 'lon' ve 'score' sütunları (puana göre azalan)
+    """
+    scores = grid['scores'].ravel()
+    n = min(n, scores.size)
+    idx = np.argpartition(-scores, n - 1)[:n]
+    idx = idx[np.argsort(-scores[idx])]
+    rows, cols = np.unravel_index(idx, grid['scores'].shape)
+    return pd.DataFrame({
+        'lat': grid['lats'][rows],
+        'lon': grid['lons'][cols],
+        'score': scores[idx].astype(np.float64)
+    })
@@ -0,0 +1,184 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from typing import Dict, Optional
+
+DEFAULT_CACHE_DIR = os.path.join('.cache', 'http')
+DEFAULT_TTL = 3600
+
+_stats_lock = threading.Lock()
+_cache_stats = {
+    'hits': 0,
+    'misses': 0,
+    'stale_hits': 0,
+    'revalidations': 0,
+    'not_modified': 0,
+    'errors': 0
+}
+
+# Arka planda yenilenmekte olan URL'ler (aynı URL için tek istek)
+_inflight_lock = threading.Lock()
+_inflight = set()
+
+
+def _count(key: str):
+    with _stats_lock:
+        _cache_stats[key] += 1
+
+
+def get_cache_stats() -> Dict[str, int]:
+    """Önbellek isabet/ıskalama sayaçlarının bir kopyasını döndürür"""
+    with _stats_lock:
+        return dict(_cache_stats)
+
+
+def reset_cache_stats():
+    """Önbellek sayaçlarını sıfırlar"""
+    with _stats_lock:
+        for key in _cache_stats:
+            _cache_stats[key] = 0
+
+
+def _entry_paths(url: str, cache_dir: str):
+    key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+    return os.path.join(cache_dir, key + '.body'), os.path.join(cache_dir, key + '.json')
+
+
+def _read_entry(url: str, cache_dir: str):
+    body_path, meta_path = _entry_paths(url, cache_dir)
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        with open(body_path, 'rb') as f:
+            body = f.read()
+    except (OSError, ValueError):
+        return None, None
+    return meta, body
+
+
+def _write_atomic(path: str, data: bytes):
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _write_entry(url: str, cache_dir: str, meta: Dict, body: Optional[bytes] = None):
+    os.makedirs(cache_dir, exist_ok=True)
+    body_path, meta_path = _entry_paths(url, cache_dir)
+    if body is not None:
+        _write_atomic(body_path, body)
+    _write_atomic(meta_path, json.dumps(meta).encode('utf-8'))
+
+
+def _fetch(url: str, cache_dir: str, meta: Optional[Dict], timeout: float, context) -> bytes:
+    """Koşullu istek atar, önbelleği günceller ve güncel gövdeyi döndürür"""
+    request = urllib.request.Request(url)
+    if meta:
+        if meta.get('etag'):
+            request.add_header('If-None-Match', meta['etag'])
+        if meta.get('last_modified'):
+            request.add_header('If-Modified-Since', meta['last_modified'])
+
+    try:
+        with urllib.request.urlopen(request, timeout=timeout, context=context) as response:
+            body = response.read()
+            new_meta = {
+                'url': url,
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'fetched_at': time.time()
+            }
+    except urllib.error.HTTPError as e:
+        if e.code != 304 or not meta:
+            raise
+        # İçerik değişmemiş, yalnızca tazelik zamanını güncelle
+        _count('not_modified')
+        meta = dict(meta, fetched_at=time.time())
+        _write_entry(url, cache_dir, meta)
+        _, body = _read_entry(url, cache_dir)
+        return body
+
+    _write_entry(url, cache_dir, new_meta, body)
+    return body
+
+
+def _revalidate_in_background(url: str, cache_dir: str, meta: Dict, timeout: float, context):
+    with _inflight_lock:
+        if url in _inflight:
+            return
+        _inflight.add(url)
+
+    def worker():
+        try:
+            _count('revalidations')
+            _fetch(url, cache_dir, meta, timeout, context)
+        except Exception:
+            # Kaynak erişilemezse eski kayıt sunulmaya devam eder
+            _count('errors')
+        finally:
+            with _inflight_lock:
+                _inflight.discard(url)
+
+    threading.Thread(target=worker, daemon=True).start()
+
+
+def cached_fetch(
+    url: str,
+    ttl: float = DEFAULT_TTL,
+    cache_dir: str = DEFAULT_CACHE_DIR,
+    timeout: float = 10.0,
+    context=None,
+    stale_while_revalidate: bool = True
+) -> bytes:
+    """
+    URL içeriğini disk önbelleği üzerinden getirir.
+
+    Taze kayıtlar doğrudan diskten döner. Süresi dolmuş kayıtlar
+    stale_while_revalidate açıkken hemen döndürülür ve arka planda
+    ETag/Last-Modified ile koşullu olarak yenilenir; böylece yavaş veya
+    hatalı bir kaynak render'ı hiçbir zaman bekletmez.
+
+    Args:
+        url: İstenecek adres
+        ttl: Kaydın taze sayılacağı süre (saniye)
+        cache_dir: Önbellek dizini
+        timeout: İstek zaman aşımı (saniye)
+        context: urlopen'a iletilecek SSL bağlamı
+        stale_while_revalidate: Eski kaydı bekletmeden sunup arka planda yenile
+
+    Returns:
+        bytes: Yanıt gövdesi
+
+    Raises:
+        urllib.error.URLError: Önbellekte kayıt yokken istek başarısız olursa
+    """
+    meta, body = _read_entry(url, cache_dir)
+
+    if meta is None:
+        _count('misses')
+        try:
+            return _fetch(url, cache_dir, None, timeout, context)
+        except Exception:
+            _count('errors')
+            raise
+
+    if time.time() - meta.get('fetched_at', 0) < ttl:
+        _count('hits')
+        return body
+
+    if stale_while_revalidate:
+        _count('stale_hits')
+        _revalidate_in_background(url, cache_dir, meta, timeout, context)
+        return body
+
+    _count('revalidations')
+    try:
+        return _fetch(url, cache_dir, meta, timeout, context)
+    except Exception:
+        _count('errors')
+        return body
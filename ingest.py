@@ -0,0 +1,262 @@
+import argparse
+import hashlib
+import os
+import tempfile
+from functools import lru_cache
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow.feather as feather
+
+POPULATION_CSV = os.path.join('veriler', 'yenianaliz.csv')
+PROVINCE_HISTORY_XLSX = 'analiz.xlsx'
+PROVINCE_SNAPSHOT_XLS = 'analiz2.xls'
+SOURCES = [POPULATION_CSV, PROVINCE_HISTORY_XLSX, PROVINCE_SNAPSHOT_XLS]
+
+CACHE_DIR = os.path.join('.cache', 'population')
+
+# Şema değiştiğinde eski önbellekler geçersiz olsun diye hash'e eklenir
+SCHEMA_VERSION = '1'
+
+# analiz2.xls yıl bilgisi içermez; en güncel il tablosudur
+SNAPSHOT_YEAR = 2024
+
+TOTAL_ROW = 'Toplam-Total'
+
+# TÜİK tablolarındaki sütun konumları: yıl, il, toplam, il/ilçe merkezi, belde/köy, yoğunluk
+HISTORY_COLUMNS = [0, 1, 2, 6, 10, 13]
+SNAPSHOT_COLUMNS = [0, 1, 3, 5, 6]
+
+COUNT_COLUMNS = ['Toplam_Nufus', 'Sehir_Nufus', 'Kirsal_Nufus']
+CSV_NUMERIC_COLUMNS = ['Toplam_Nufus', 'Nufus_Yogunlugu', 'Sehir_Nufus', 'Kirsal_Nufus',
+                       'Nufus_Artis_Hizi', 'EV_Sahiplik_Orani', 'Isyeri_Yogunlugu']
+CSV_YEAR_COLUMN = 'İl ve cinsiyete göre il/ilçe merkezi, belde/köy nüfusu ve nüfus yoğunluğu, 2007-2024'
+
+
+def _to_counts(series: pd.Series) -> pd.Series:
+    """'-' (değer yok) hücrelerini 0 kabul ederek int32'ye çevirir"""
+    return pd.to_numeric(series, errors='coerce').fillna(0).astype(np.int32)
+
+
+def _compact(df: pd.DataFrame) -> pd.DataFrame:
+    df['Yil'] = df['Yil'].astype(np.int16)
+    df['Il'] = df['Il'].astype(str).str.strip().astype('category')
+    for col in COUNT_COLUMNS:
+        df[col] = _to_counts(df[col])
+    df['Nufus_Yogunlugu'] = pd.to_numeric(df['Nufus_Yogunlugu'], errors='coerce').astype(np.float32)
+    return df
+
+
+def parse_province_history(path: str = PROVINCE_HISTORY_XLSX) -> pd.DataFrame:
+    """
+    TÜİK 2007-2024 il nüfus tablosunu (analiz.xlsx) uzun biçime çevirir.
+
+    Her yıl bloğu 'Adana' satırıyla başlar. Yıl etiketi olmayan bloklara
+    kendisinden sonraki (bir önceki yıla ait) bloğun yılı + 1 atanır.
+
+    Args:
+        path: xlsx dosyasının yolu
+
+    Returns:
+        pd.DataFrame: Yil, Il, Toplam_Nufus, Sehir_Nufus, Kirsal_Nufus, Nufus_Yogunlugu
+    """
+    raw = pd.read_excel(path, header=None, usecols=HISTORY_COLUMNS)
+    raw.columns = ['Yil', 'Il', 'Toplam_Nufus', 'Sehir_Nufus', 'Kirsal_Nufus', 'Nufus_Yogunlugu']
+
+    raw['Il'] = raw['Il'].str.strip()
+    labels = raw['Yil'].map(lambda v: v.year if hasattr(v, 'year') else np.nan)
+    block_starts = raw.index[raw['Il'].eq('Adana')].tolist()
+
+    # Bloklar yeniden eskiye sıralı; etiketsiz bloklar için eskiden yeniye yürü
+    years = [None] * len(block_starts)
+    for i in reversed(range(len(block_starts))):
+        label = labels.iloc[block_starts[i] - 1]
+        if pd.notna(label):
+            years[i] = int(label)
+        elif i + 1 < len(block_starts):
+            years[i] = years[i + 1] + 1
+
+    block_id = np.searchsorted(block_starts, raw.index, side='right') - 1
+    raw['Yil'] = [years[b] if b >= 0 else None for b in block_id]
+
+    df = raw[raw['Il'].notna() & raw['Il'].ne(TOTAL_ROW) & raw['Yil'].notna()].copy()
+    df = df[pd.to_numeric(df['Toplam_Nufus'], errors='coerce').notna()]
+    return _compact(df).reset_index(drop=True)
+
+
+def parse_province_snapshot(path: str = PROVINCE_SNAPSHOT_XLS, year: int = SNAPSHOT_YEAR) -> pd.DataFrame:
+    """
+    Tek yıllık il nüfus tablosunu (analiz2.xls) okur.
+
+    Args:
+        path: xls dosyasının yolu
+        year: Tabloya atanacak yıl
+
+    Returns:
+        pd.DataFrame: parse_province_history ile aynı sütunlar
+    """
+    raw = pd.read_excel(path, header=None, usecols=SNAPSHOT_COLUMNS, skiprows=2)
+    raw.columns = ['Il', 'Toplam_Nufus', 'Sehir_Nufus', 'Kirsal_Nufus', 'Nufus_Yogunlugu']
+    raw['Il'] = raw['Il'].str.strip()
+    df = raw[raw['Il'].notna() & raw['Il'].ne(TOTAL_ROW)].copy()
+    df.insert(0, 'Yil', year)
+    return _compact(df).reset_index(drop=True)
+
+
+def parse_population_csv(path: str = POPULATION_CSV) -> pd.DataFrame:
+    """
+    veriler/yenianaliz.csv dosyasını kompakt tiplerle okur.
+
+    Sayısal sütunlardaki binlik/ondalık ayraçlar tek bir vektörel
+    düzenli ifade ile temizlenir; metin sütunları kategorik tutulur.
+
+    Args:
+        path: CSV dosyasının yolu
+
+    Returns:
+        pd.DataFrame: Temizlenmiş nüfus verisi
+    """
+    df = pd.read_csv(path, encoding='utf-8', dtype=str)
+    df.columns = df.columns.str.strip()
+
+    # Tarih sütununu string olarak tut
+    if CSV_YEAR_COLUMN in df.columns:
+        df = df.rename(columns={CSV_YEAR_COLUMN: 'Yil'})
+
+    for col in df.columns:
+        if col in CSV_NUMERIC_COLUMNS:
+            values = pd.to_numeric(df[col].str.replace(r'[.,]', '', regex=True), errors='coerce')
+            df[col] = values.astype(np.float32)
+        else:
+            df[col] = df[col].astype('category')
+    return df
+
+
+@lru_cache(maxsize=32)
+def _file_digest(path: str, size: int, mtime_ns: int) -> bytes:
+    """Dosya içeriğinin özeti; boyut ve değiştirilme zamanı aynı kaldıkça dosya yeniden okunmaz"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def source_hash(sources: Optional[List[str]] = None) -> str:
+    """Mevcut kaynak dosyaların içeriğinden önbellek anahtarı üretir"""
+    digest = hashlib.sha1(SCHEMA_VERSION.encode('utf-8'))
+    for path in sources or SOURCES:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        digest.update(path.encode('utf-8'))
+        digest.update(_file_digest(path, stat.st_size, stat.st_mtime_ns))
+    return digest.hexdigest()
+
+
+def _cache_path(name: str, key: str, cache_dir: str) -> str:
+    return os.path.join(cache_dir, f"{name}-{key[:16]}.feather")
+
+
+def _write_cache(df: pd.DataFrame, path: str):
+    """Önbellek dosyasını eşzamanlı yazıcılarla çakışmayan geçici bir dosya üzerinden atomik yazar"""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=directory, delete=False, suffix='.tmp') as f:
+        try:
+            # Sıkıştırmasız Feather dosyası açılırken çözülmez; bellek eşlemeli okunabilir
+            feather.write_feather(df, f, compression='uncompressed')
+        except BaseException:
+            f.close()
+            os.unlink(f.name)
+            raise
+    os.replace(f.name, path)
+
+
+def _read_cache(path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Önbellek dosyasını okur. Dosya bellek eşlemeli açılır ve yalnızca
+    istenen sütunların sayfalarına dokunulur; pandas'a dönüşüm bu sütunları
+    kopyalar (sıfır kopya değildir), bu nedenle gereken sütunlar verilmelidir.
+    """
+    return feather.read_table(path, columns=columns, memory_map=True).to_pandas()
+
+
+def ingest(cache_dir: str = CACHE_DIR) -> dict:
+    """
+    Tüm kaynakları ayrıştırır ve Feather önbelleğine yazar.
+
+    Args:
+        cache_dir: Önbellek dizini
+
+    Returns:
+        dict: 'provinces' ve (varsa) 'population' önbellek dosyalarının yolları
+    """
+    key = source_hash()
+    paths = {}
+
+    frames = []
+    if os.path.exists(PROVINCE_HISTORY_XLSX):
+        frames.append(parse_province_history())
+    if os.path.exists(PROVINCE_SNAPSHOT_XLS):
+        frames.append(parse_province_snapshot())
+    if frames:
+        provinces = pd.concat(frames, ignore_index=True)
+        provinces['Il'] = provinces['Il'].astype(str)
+        provinces = provinces.drop_duplicates(['Yil', 'Il'], keep='first')
+        provinces['Il'] = provinces['Il'].astype('category')
+        provinces = provinces.sort_values(['Yil', 'Il']).reset_index(drop=True)
+        paths['provinces'] = _cache_path('provinces', key, cache_dir)
+        _write_cache(provinces, paths['provinces'])
+
+    if os.path.exists(POPULATION_CSV):
+        paths['population'] = _cache_path('population', key, cache_dir)
+        _write_cache(parse_population_csv(), paths['population'])
+
+    return paths
+
+
+def _load(name: str, cache_dir: str, columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+    path = _cache_path(name, source_hash(), cache_dir)
+    if not os.path.exists(path):
+        path = ingest(cache_dir).get(name)
+        if path is None:
+            return None
+    return _read_cache(path, columns)
+
+
+def load_province_population(cache_dir: str = CACHE_DIR, columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+    """
+    Yıllara göre il nüfus tablosunu önbellekten yükler.
+
+    Kaynak dosyalar değişmişse (hash farklıysa) önbellek yeniden üretilir.
+
+    Args:
+        cache_dir: Önbellek dizini
+        columns: Yüklenecek sütunlar (None ise tümü)
+
+    Returns:
+        Optional[pd.DataFrame]: Yil, Il, Toplam_Nufus, Sehir_Nufus, Kirsal_Nufus,
+        Nufus_Yogunlugu sütunları; kaynak yoksa None
+    """
+    return _load('provinces', cache_dir, columns)
+
+
+def load_population_csv(cache_dir: str = CACHE_DIR, columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+    """veriler/yenianaliz.csv verisinin istenen sütunlarını (None ise tümünü) önbellekten yükler; dosya yoksa None döner"""
+    return _load('population', cache_dir, columns)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Nüfus kaynaklarını Feather önbelleğine dönüştürür")
+    parser.add_argument('--cache-dir', default=CACHE_DIR)
+    args = parser.parse_args()
+
+    for name, path in ingest(args.cache_dir).items():
+        print(f"{name}: {path}")
+
+
+if __name__ == '__main__':
+    main()
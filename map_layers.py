@@ -0,0 +1,213 @@
+"""
+Harita oluşturma: şehir başına önbelleğe alınabilen statik taban harita ve
+her yeniden çalıştırmada yeniden kurulan dinamik katmanlar.
+
+Dinamik katmanlar st_folium'a `feature_group_to_add` ile verilir; taban
+haritanın HTML'i değişmediği için tarayıcıda harita yeniden yüklenmez,
+yalnızca katmanlar değiştirilir. Çok sayıda nokta, Python tarafında her
+nokta için ayrı bir Marker nesnesi yerine tek bir JS dizisi olarak
+FastMarkerCluster ile çizilir.
+
+Önbellekteki taban harita bir şablondur ve hiçbir zaman doğrudan çizilmez:
+folium her render'da, st_folium ise her katman eklemede haritayı değiştirir.
+Her yeniden çalıştırmada fresh_map ile şablonun kopyası kullanılır; kopya
+aynı öğe kimliklerini taşıdığı için HTML'i değişmez. Aynı nedenle dinamik
+katmanlar da önbelleğe alınmaz: önbellekte yalnızca layer_data ile hazırlanan
+veri tutulur, katmanlar her çalıştırmada create_layers ile yeniden kurulur.
+"""
+import copy
+from typing import Dict, List, Optional
+
+import folium
+import numpy as np
+from folium import plugins
+from folium.elements import JSCSSMixin
+from branca.element import MacroElement
+
+from heatmap import CITY_COORDS
+
+# Katman verisindeki bir satırın ([enlem, boylam, ...] listesi) yaklaşık bellek kullanımı
+LAYER_ROW_BYTES = 160
+# Veri dışında harita/katman nesnesi başına yaklaşık bellek kullanımı
+LAYER_OBJECT_BYTES = 16 * 1024
+
+# Seçili lokasyon işaretçisi; adres metin olarak eklenir (HTML yorumlanmaz)
+POINT_CALLBACK = """
+function (row) {
+    var marker = L.marker(new L.LatLng(row[0], row[1]));
+    if (row[2]) {
+        var popup = document.createElement('div');
+        popup.textContent = row[2];
+        marker.bindPopup(popup);
+    }
+    return marker;
+}
+"""
+
+# Mevcut şarj istasyonları küçük daire olarak çizilir
+STATION_CALLBACK = """
+function (row) {
+    return L.circleMarker(new L.LatLng(row[0], row[1]), {
+        radius: 5, color: '#E74C3C', fillOpacity: 0.7, weight: 1
+    });
+}
+"""
+
+
+class LayerAssets(JSCSSMixin, MacroElement):
+    """
+    Dinamik katmanların JS/CSS bağımlılıklarını taban haritaya ekler.
+
+    st_folium yalnızca taban haritadaki bağımlılıkları yüklediğinden,
+    sonradan eklenen küme ve ısı haritası katmanları için gereklidir.
+    """
+    default_js = plugins.MarkerCluster.default_js + plugins.HeatMap.default_js
+    default_css = plugins.MarkerCluster.default_css
+
+    def __init__(self):
+        super().__init__()
+        self._name = 'LayerAssets'
+
+
+def create_base_map(city: str) -> folium.Map:
+    """
+    Şehrin statik taban haritasını oluşturur (çizim, fare konumu ve tıklama betiği).
+
+    Args:
+        city: Şehir adı (CITY_COORDS anahtarı)
+
+    Returns:
+        folium.Map: Dinamik katman içermeyen harita
+    """
+    center_lat, center_lon = CITY_COORDS[city]
+    m = folium.Map(location=[center_lat, center_lon], zoom_start=12)
+
+    # Fare pozisyonu gösterici ekle
+    plugins.MousePosition().add_to(m)
+
+    # Haritaya çizim kontrolü ekle
+    draw_control = plugins.Draw(
+        draw_options={
+            'polyline': False,
+            'rectangle': False,
+            'polygon': False,
+            'circle': False,
+            'marker': True,
+            'circlemarker': False,
+        },
+        edit_options={'edit': False}
+    )
+    draw_control.add_to(m)
+
+    # Tıklama olayını yakalayan JavaScript kodu
+    m.add_child(folium.Element("""
+        <script>
+        document.addEventListener('DOMContentLoaded', function() {
+            setTimeout(function() {
+                var map = document.querySelector('#map');
+                map.addEventListener('click', function(e) {
+                    var lat = e.latlng.lat;
+                    var lng = e.latlng.lng;
+                    new L.Marker([lat, lng]).addTo(map);
+                    window.parent.postMessage({
+                        'type': 'map_click',
+                        'lat': lat,
+                        'lng': lng
+                    }, '*');
+                });
+            }, 1000);
+        });
+        </script>
+    """))
+
+    LayerAssets().add_to(m)
+    return m
+
+
+def fresh_map(base: folium.Map) -> folium.Map:
+    """
+    Önbellekteki taban haritanın, st_folium'a verilebilecek kopyasını döndürür.
+
+    Args:
+        base: create_base_map sonucu (değiştirilmez)
+
+    Returns:
+        folium.Map: Aynı öğe kimlikleriyle derin kopya
+    """
+    return copy.deepcopy(base)
+
+
+def create_layers(
+    points=None,
+    heat_data: Optional[List[List[float]]] = None,
+    stations: Optional[np.ndarray] = None
+) -> List[folium.FeatureGroup]:
+    """
+    Haritanın dinamik katmanlarını oluşturur.
+
+    Args:
+        points: Seçili lokasyonlar ('lats', 'lons', 'addresses' dizileri olan nesne, örn. PointSnapshot)
+        heat_data: Uygunluk ısı haritası verisi ([enlem, boylam, ağırlık] listesi)
+        stations: (n, 2) boyutunda mevcut istasyon koordinatları (veya [enlem, boylam] listesi)
+
+    Returns:
+        List[folium.FeatureGroup]: st_folium'un feature_group_to_add parametresine verilecek katmanlar
+    """
+    layers = []
+
+    # Uygunluk ısı haritası katmanı
+    if heat_data:
+        group = folium.FeatureGroup(name='Lokasyon Uygunluğu')
+        plugins.HeatMap(
+            heat_data,
+            radius=12,
+            blur=15,
+            min_opacity=0.2
+        ).add_to(group)
+        layers.append(group)
+
+    # Mevcut istasyonlar
+    if stations is not None and len(stations):
+        group = folium.FeatureGroup(name='Mevcut İstasyonlar')
+        plugins.FastMarkerCluster(
+            stations if isinstance(stations, list) else np.asarray(stations, dtype=np.float64).tolist(),
+            callback=STATION_CALLBACK
+        ).add_to(group)
+        layers.append(group)
+
+    # Seçili noktalar
+    if points is not None and len(points):
+        group = folium.FeatureGroup(name='Seçili Lokasyonlar')
+        data = [
+            [lat, lon, address or '']
+            for lat, lon, address in zip(points.lats.tolist(), points.lons.tolist(), points.addresses.tolist())
+        ]
+        plugins.FastMarkerCluster(
+            data,
+            callback=POINT_CALLBACK,
+            options={'disableClusteringAtZoom': 16}
+        ).add_to(group)
+        layers.append(group)
+
+    return layers
+
+
+def layer_data(points=None, heat_data: Optional[List[List[float]]] = None, stations: Optional[np.ndarray] = None) -> Dict:
+    """
+    create_layers'ın önbelleğe alınabilir girdilerini hazırlar (istasyonlar bir kez listeye çevrilir).
+
+    Returns:
+        Dict: create_layers'a anahtar kelime argümanı olarak verilecek 'points', 'heat_data', 'stations'
+    """
+    return {
+        'points': points,
+        'heat_data': heat_data,
+        'stations': None if stations is None else np.asarray(stations, dtype=np.float64).tolist()
+    }
+
+
+def layer_data_nbytes(data: Dict) -> int:
+    """layer_data sonucunun yaklaşık bellek kullanımı; veriyi dolaşmadan satır sayısından tahmin edilir"""
+    rows = len(data['heat_data'] or ()) + len(data['stations'] or ())
+    points = data['points']
+    return rows * LAYER_ROW_BYTES + (points.nbytes if points is not None else 0)
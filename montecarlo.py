@@ -0,0 +1,114 @@
+import numpy as np
+from typing import Dict, Optional
+
+# calculate_financial_projection ile aynı varsayımlar
+REVENUE_RATIO = 0.4      # İlk yıl geliri / yatırım bütçesi
+COST_RATIO = 0.2         # İlk yıl maliyeti / yatırım bütçesi
+COST_ESCALATION = 0.1    # Yıllık doğrusal maliyet artışı
+
+
+def default_distributions(
+    market_share: float,
+    ev_ownership: float,
+    growth_factor: float
+) -> Dict[str, Dict[str, float]]:
+    """
+    Nokta tahminleri etrafında varsayılan senaryo dağılımlarını üretir.
+
+    Args:
+        market_share: Tahmini pazar payı (%)
+        ev_ownership: EV sahiplik oranı (%)
+        growth_factor: Yıllık gelir büyüme çarpanı (örn. 1.3)
+
+    Returns:
+        Dict[str, Dict[str, float]]: Parametre -> dağılım tanımı
+    """
+    return {
+        'market_share': {'dist': 'triangular', 'low': market_share * 0.5, 'mode': market_share, 'high': market_share * 1.5},
+        'ev_ownership': {'dist': 'lognormal', 'median': ev_ownership, 'sigma': 0.25},
+        'growth_factor': {'dist': 'normal', 'mean': growth_factor, 'std': (growth_factor - 1) * 0.3},
+        'cost_factor': {'dist': 'normal', 'mean': 1.0, 'std': 0.15},
+        'cost_escalation': {'dist': 'uniform', 'low': 0.05, 'high': 0.15}
+    }
+
+
+def _sample(rng: np.random.Generator, spec: Dict[str, float], n: int) -> np.ndarray:
+    """Tek bir dağılım tanımından n örnek çeker"""
+    dist = spec['dist']
+    if dist == 'constant':
+        return np.full(n, spec['value'], dtype=np.float64)
+    if dist == 'uniform':
+        return rng.uniform(spec['low'], spec['high'], n)
+    if dist == 'normal':
+        return rng.normal(spec['mean'], spec['std'], n)
+    if dist == 'lognormal':
+        return rng.lognormal(np.log(spec['median']), spec['sigma'], n)
+    if dist == 'triangular':
+        if spec['low'] == spec['high']:
+            return np.full(n, spec['mode'], dtype=np.float64)
+        return rng.triangular(spec['low'], spec['mode'], spec['high'], n)
+    raise ValueError(f"Bilinmeyen dağılım: {dist}")
+
+
+def simulate_projection(
+    investment_budget: float,
+    distributions: Dict[str, Dict[str, float]],
+    n_scenarios: int = 100000,
+    years: int = 3,
+    payback_horizon: Optional[int] = None,
+    seed: int = 0
+) -> Dict:
+    """
+    Finansal projeksiyonu N senaryo için tek seferde vektörel olarak hesaplar.
+
+    Her senaryo için market_share, ev_ownership, growth_factor, cost_factor ve
+    cost_escalation dağılımlardan çekilir; gelir ve maliyetler
+    calculate_financial_projection ile aynı formüllerle (senaryo x yıl)
+    dizileri olarak hesaplanır. Aynı seed ile sonuçlar yeniden üretilebilir.
+
+    Args:
+        investment_budget: Yatırım bütçesi (TL)
+        distributions: Parametre -> dağılım tanımı (bkz. default_distributions)
+        n_scenarios: Senaryo sayısı
+        years: Projeksiyon yılı sayısı
+        payback_horizon: Geri ödeme olasılığı için yıl sınırı (None ise years)
+        seed: Rastgele sayı üreteci tohumu
+
+    Returns:
+        Dict: Yıllara göre kümülatif nakit akışı P10/P50/P90 bantları,
+        ROI yüzdelikleri ve geri ödeme olasılığı
+    """
+    rng = np.random.default_rng(seed)
+    draws = {name: _sample(rng, spec, n_scenarios) for name, spec in distributions.items()}
+
+    market_share = np.clip(draws['market_share'], 0, 100) / 100
+    ev_factor = np.maximum(draws['ev_ownership'], 0) / 5
+    growth = np.maximum(draws['growth_factor'], 0)
+    cost_factor = np.maximum(draws['cost_factor'], 0)
+    escalation = draws['cost_escalation']
+
+    year_idx = np.arange(years)
+    base_revenue = investment_budget * REVENUE_RATIO * (1 + ev_factor) * market_share
+    revenues = base_revenue[:, None] * growth[:, None] ** year_idx
+    costs = investment_budget * COST_RATIO * cost_factor[:, None] * (1 + escalation[:, None] * year_idx)
+
+    cumulative = np.cumsum(revenues - costs, axis=1) - investment_budget
+    total_cost = costs.sum(axis=1) + investment_budget
+    roi = (revenues.sum(axis=1) - total_cost) / total_cost * 100
+
+    horizon = years if payback_horizon is None else min(payback_horizon, years)
+    p10, p50, p90 = np.percentile(cumulative, [10, 50, 90], axis=0)
+    roi_p10, roi_p50, roi_p90 = np.percentile(roi, [10, 50, 90])
+
+    return {
+        'years': (year_idx + 1).tolist(),
+        'p10': p10,
+        'p50': p50,
+        'p90': p90,
+        'roi_p10': round(float(roi_p10), 1),
+        'roi_p50': round(float(roi_p50), 1),
+        'roi_p90': round(float(roi_p90), 1),
+        'payback_probability': float(np.mean(cumulative[:, horizon - 1] >= 0)),
+        'payback_horizon': horizon,
+        'n_scenarios': n_scenarios
+    }
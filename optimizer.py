@@ -0,0 +1,190 @@
+import heapq
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from typing import Dict, Optional
+
+from stations import EARTH_RADIUS_KM, count_stations_within
+
+# İstasyon tipine göre yaklaşık kurulum maliyetleri (TL)
+STATION_INSTALL_COSTS: Dict[str, float] = {
+    "AC Normal Şarj": 150000,
+    "DC Hızlı Şarj": 750000,
+    "Ultra Hızlı Şarj": 1500000
+}
+
+# Kesin (ILP) çözümün önerildiği en büyük aday sayısı
+MAX_EXACT_CANDIDATES = 2000
+
+
+def coverage_matrix(candidates: pd.DataFrame, radius_km: float) -> sparse.csr_matrix:
+    """
+    Adayların birbirini kapsama ilişkisini seyrek matris olarak kurar.
+
+    Args:
+        candidates: 'lat' ve 'lon' sütunlu aday tablosu
+        radius_km: Kapsama yarıçapı (km)
+
+    Returns:
+        sparse.csr_matrix: (aday x talep noktası) 0/1 matrisi; talep noktaları adayların kendisidir
+    """
+    from sklearn.neighbors import BallTree
+
+    coords = np.radians(candidates[['lat', 'lon']].to_numpy(dtype=np.float64))
+    tree = BallTree(coords, metric='haversine')
+    neighbours = tree.query_radius(coords, r=radius_km / EARTH_RADIUS_KM)
+
+    indptr = np.zeros(len(neighbours) + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum([len(n) for n in neighbours])
+    indices = np.concatenate(neighbours) if len(neighbours) else np.array([], dtype=np.int64)
+    data = np.ones(len(indices), dtype=np.bool_)
+    return sparse.csr_matrix((data, indices, indptr), shape=(len(coords), len(coords)))
+
+
+def demand_weights(candidates: pd.DataFrame, radius_km: float) -> np.ndarray:
+    """
+    Talep noktalarının rakiplerle paylaşılmayan talebini hesaplar.
+
+    'demand' sütunu varsa o, yoksa 'score' / 100 taban talep olarak alınır.
+    Yarıçap içindeki n rakip istasyon talebi 1 / (1 + n) oranında azaltır.
+
+    Args:
+        candidates: Aday tablosu
+        radius_km: Rakip arama yarıçapı (km)
+
+    Returns:
+        np.ndarray: Net talep ağırlıkları
+    """
+    base = candidates['demand'] if 'demand' in candidates.columns else candidates['score'] / 100
+    competitors = count_stations_within(candidates['lat'].to_numpy(), candidates['lon'].to_numpy(), radius_km)
+    return base.to_numpy(dtype=np.float64) / (1 + competitors)
+
+
+def _install_costs(candidates: pd.DataFrame, station_type: str, install_costs: Dict[str, float]) -> np.ndarray:
+    if 'station_type' in candidates.columns:
+        return candidates['station_type'].map(install_costs).to_numpy(dtype=np.float64)
+    return np.full(len(candidates), install_costs[station_type], dtype=np.float64)
+
+
+def _lazy_greedy(coverage: sparse.csr_matrix, weights: np.ndarray, costs: np.ndarray, budget: float):
+    """
+    Bütçe kısıtlı maksimum kapsama için tembel (lazy) açgözlü çözüm.
+
+    Kapsama fonksiyonu alt-modüler olduğundan bir adayın marjinal kazancı
+    yalnızca azalabilir; öncelik kuyruğundaki eski değerler üst sınır olarak
+    kullanılır ve yalnızca kuyruğun başındaki aday yeniden hesaplanır.
+    """
+    covered = np.zeros(coverage.shape[1], dtype=np.bool_)
+    indptr, indices = coverage.indptr, coverage.indices
+
+    def gain(i):
+        nbrs = indices[indptr[i]:indptr[i + 1]]
+        return weights[nbrs][~covered[nbrs]].sum()
+
+    weights_sparse = coverage.astype(np.float64)
+    initial = weights_sparse @ weights
+    heap = [(-g / c, i, 0) for i, (g, c) in enumerate(zip(initial, costs)) if c <= budget and g > 0]
+    heapq.heapify(heap)
+
+    selected, spent, value, round_no = [], 0.0, 0.0, 0
+    while heap:
+        neg_ratio, i, stamp = heapq.heappop(heap)
+        if spent + costs[i] > budget:
+            continue
+        if stamp != round_no:
+            g = gain(i)
+            if g > 0:
+                heapq.heappush(heap, (-g / costs[i], i, round_no))
+            continue
+        nbrs = indices[indptr[i]:indptr[i + 1]]
+        value += weights[nbrs][~covered[nbrs]].sum()
+        covered[nbrs] = True
+        selected.append(i)
+        spent += costs[i]
+        round_no += 1
+
+    # Alt-modüler üst sınır: f(OPT) <= f(S) + bütçeye sığan marjinal kazançların
+    # kesirli sırt çantası toplamı; tüm kazançlar tek bir seyrek çarpımla hesaplanır
+    gains = weights_sparse @ np.where(covered, 0.0, weights)
+    order = np.argsort(-gains / costs)
+    cumulative_cost = np.cumsum(costs[order])
+    fits = cumulative_cost <= budget
+    bound = value + gains[order][fits].sum()
+    if not fits.all():
+        first_out = np.argmin(fits)
+        leftover = budget - (cumulative_cost[first_out - 1] if first_out > 0 else 0)
+        bound += gains[order][first_out] * leftover / costs[order][first_out]
+
+    # Tek başına en değerli aday, oran bazlı seçimden iyiyse onu kullan
+    best_single = int(np.argmax(np.where(costs <= budget, initial, -np.inf))) if len(costs) else None
+    if best_single is not None and initial[best_single] > value:
+        return [best_single], float(initial[best_single]), float(max(bound, initial[best_single]))
+
+    return selected, float(value), float(bound)
+
+
+def _exact(coverage: sparse.csr_matrix, weights: np.ndarray, costs: np.ndarray, budget: float):
+    """scipy.optimize.milp ile kesin tamsayılı doğrusal programlama çözümü"""
+    from scipy.optimize import Bounds, LinearConstraint, milp
+
+    n_sites, n_demand = coverage.shape
+    # Değişkenler: [x (aday seçimi), y (talep kapsandı mı)]
+    objective = np.concatenate([np.zeros(n_sites), -weights])
+    covers = sparse.hstack([-coverage.T.astype(np.float64), sparse.identity(n_demand)])
+    budget_row = sparse.hstack([sparse.csr_matrix(costs), sparse.csr_matrix((1, n_demand))])
+    constraints = [
+        LinearConstraint(covers, -np.inf, 0),
+        LinearConstraint(budget_row, -np.inf, budget)
+    ]
+    integrality = np.concatenate([np.ones(n_sites), np.zeros(n_demand)])
+    result = milp(objective, constraints=constraints, integrality=integrality, bounds=Bounds(0, 1))
+    if not result.success:
+        raise RuntimeError(f"ILP çözülemedi: {result.message}")
+
+    selected = np.flatnonzero(result.x[:n_sites] > 0.5).tolist()
+    return selected, float(-result.fun), float(-result.fun)
+
+
+def optimize_sites(
+    candidates: pd.DataFrame,
+    investment_budget: float,
+    station_type: str = "DC Hızlı Şarj",
+    radius_km: float = 2.0,
+    install_costs: Optional[Dict[str, float]] = None,
+    exact: bool = False
+) -> Dict:
+    """
+    Bütçe dahilinde, rakip örtüşmesi düşülmüş kapsanan talebi en büyükleyen lokasyonları seçer.
+
+    Args:
+        candidates: 'lat', 'lon' ve 'score' (veya 'demand') sütunlu aday tablosu;
+            isteğe bağlı 'station_type' sütunu aday başına tip belirtir
+        investment_budget: Toplam yatırım bütçesi (TL)
+        station_type: Tüm adaylar için istasyon tipi ('station_type' sütunu yoksa)
+        radius_km: Kapsama yarıçapı (km)
+        install_costs: İstasyon tipi -> kurulum maliyeti
+        exact: True ise ILP ile kesin çözüm (yalnızca küçük örnekler için)
+
+    Returns:
+        Dict: 'selected' (seçilen satırlar), 'covered_demand', 'total_cost'
+        ve 'upper_bound' (optimum için üst sınır)
+    """
+    if install_costs is None:
+        install_costs = STATION_INSTALL_COSTS
+    if exact and len(candidates) > MAX_EXACT_CANDIDATES:
+        raise ValueError(f"Kesin çözüm en fazla {MAX_EXACT_CANDIDATES} aday için desteklenir")
+
+    candidates = candidates.reset_index(drop=True)
+    coverage = coverage_matrix(candidates, radius_km)
+    weights = demand_weights(candidates, radius_km)
+    costs = _install_costs(candidates, station_type, install_costs)
+
+    solver = _exact if exact else _lazy_greedy
+    selected, value, bound = solver(coverage, weights, costs, investment_budget)
+
+    return {
+        'selected': candidates.iloc[selected].reset_index(drop=True),
+        'covered_demand': value,
+        'total_cost': float(costs[selected].sum()),
+        'upper_bound': bound
+    }
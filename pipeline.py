@@ -0,0 +1,151 @@
+"""
+Bağımlılıkları izlenen, girdiye göre önbellekli hesaplama grafiği.
+
+Her aşama hangi girdilere (örn. 'lat', 'budget') veya hangi önceki aşamalara
+bağlı olduğunu bildirir. Bir aşamanın sonucu, geçişli olarak bağlı olduğu
+girdilerin değerleriyle anahtarlanır; böylece yalnızca bütçe değiştiğinde
+konuma bağlı aşamalar yeniden hesaplanmaz.
+
+Örnek:
+    graph = Pipeline()
+    graph.add_stage('demographics', analyze_demographics, ['lat', 'lon'])
+    graph.add_stage('projection', project, ['demographics', 'budget'])
+    graph.get('projection', lat=41.0, lon=29.0, budget=1000000)
+
+Bir SharedCache verilirse aşama sonuçları yerel önbellekte bulunamadığında
+süreç genelindeki önbellekten (aşama adı ve anahtarla) alınır; böylece aynı
+girdilerle çalışan farklı oturumların grafikleri hesaplamayı paylaşır.
+
+Bir aşama sonucunu geçici sayabilir (örn. yedek değerlere düşmüş
+zenginleştirme); geçici sonuçlar ve onlardan türetilen tüm aşama sonuçları
+yalnızca TRANSIENT_TTL saniye saklanır, ardından yeniden hesaplanır.
+"""
+import math
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Sequence, Tuple
+
+from shared_cache import SharedCache
+
+# Aşama başına saklanacak en fazla sonuç sayısı
+DEFAULT_MAX_ENTRIES = 32
+
+# Geçici sonuçların (ve onlara bağlı sonuçların) saklanma süresi (saniye)
+TRANSIENT_TTL = 30.0
+
+
+class Pipeline:
+    """Aşamaları ve aşama başına LRU sonuç önbelleğini tutar"""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, shared: Optional[SharedCache] = None,
+                 transient_ttl: float = TRANSIENT_TTL):
+        self.max_entries = max_entries
+        self.shared = shared
+        self.transient_ttl = transient_ttl
+        self._stages: Dict[str, Tuple[Callable, Tuple[str, ...], Optional[Callable[[Any], bool]], Optional[Callable[[Any], int]], bool]] = {}
+        self._results: Dict[str, OrderedDict] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def add_stage(self, name: str, fn: Callable, inputs: Sequence[str], transient: Optional[Callable[[Any], bool]] = None,
+                  size: Optional[Callable[[Any], int]] = None, shared: bool = True):
+        """
+        Aşama ekler.
+
+        Args:
+            name: Aşama adı
+            fn: Girdileri bildirildiği sırayla konumsal argüman olarak alan fonksiyon
+            inputs: Girdi adları; başka bir aşamanın adı verilirse o aşamanın sonucu geçirilir
+            transient: Sonucu alıp True döndürürse sonuç yalnızca transient_ttl saniye saklanır
+            size: Sonucun bayt cinsinden boyutu; paylaşılan önbellekte boyutu ucuza
+                tahmin edilemeyen sonuçlar (harita, grafik) için verilir
+            shared: False ise sonuç paylaşılan önbelleğe konmaz, yalnızca bu grafikte
+                tutulur; oturumlar arasında paylaşılmaması gereken değiştirilebilir
+                nesneler (örn. folium haritaları) için
+        """
+        self._stages[name] = (fn, tuple(inputs), transient, size, shared)
+        self._results[name] = OrderedDict()
+        self._stats[name] = {'hits': 0, 'misses': 0}
+
+    def stage(self, name: str, inputs: Sequence[str], transient: Optional[Callable[[Any], bool]] = None,
+              size: Optional[Callable[[Any], int]] = None, shared: bool = True) -> Callable:
+        """add_stage'in dekoratör biçimi"""
+        def decorator(fn: Callable) -> Callable:
+            self.add_stage(name, fn, inputs, transient, size, shared)
+            return fn
+        return decorator
+
+    def _key(self, name: str, values: Dict[str, Hashable]) -> Tuple:
+        """Aşamanın geçişli olarak bağlı olduğu girdi değerlerinden anahtar üretir"""
+        inputs = self._stages[name][1]
+        return tuple(
+            self._key(item, values) if item in self._stages else values[item]
+            for item in inputs
+        )
+
+    def get(self, name: str, **values: Hashable) -> Any:
+        """
+        Aşamanın sonucunu döndürür; girdileri değişmemişse önbellekten verir.
+
+        Args:
+            name: Aşama adı
+            **values: Temel girdi değerleri (hashlenebilir olmalıdır)
+
+        Returns:
+            Any: Aşama fonksiyonunun sonucu
+        """
+        return self._get(name, values)[0]
+
+    def _get(self, name: str, values: Dict[str, Hashable]) -> Tuple[Any, float]:
+        """Aşamanın sonucunu ve son geçerlilik zamanını (kalıcı sonuçlar için inf) döndürür"""
+        fn, inputs, transient, size, shared = self._stages[name]
+        key = self._key(name, values)
+        results = self._results[name]
+
+        entry = results.get(key)
+        if entry is not None and entry[1] > time.monotonic():
+            results.move_to_end(key)
+            self._stats[name]['hits'] += 1
+            return entry
+
+        self._stats[name]['misses'] += 1
+
+        def compute():
+            # Geçici bir girdiden türetilen sonuç da en geç o girdiyle birlikte geçersizleşir
+            args, expires = [], math.inf
+            for item in inputs:
+                if item in self._stages:
+                    value, until = self._get(item, values)
+                    args.append(value)
+                    expires = min(expires, until)
+                else:
+                    args.append(values[item])
+            result = fn(*args)
+            if transient is not None and transient(result):
+                expires = min(expires, time.monotonic() + self.transient_ttl)
+            return result, expires
+
+        if self.shared is None or not shared:
+            entry = compute()
+        else:
+            entry = self.shared.get_or_compute(
+                (name, key), compute,
+                ttl=lambda computed: min(self.shared.ttl, computed[1] - time.monotonic()),
+                size=None if size is None else lambda computed: size(computed[0])
+            )
+
+        results[key] = entry
+        if len(results) > self.max_entries:
+            results.popitem(last=False)
+        return entry
+
+    def invalidate(self, name: str = None):
+        """Bir aşamanın (None ise tüm aşamaların) önbelleğini temizler"""
+        for stage in ([name] if name else self._stages):
+            self._results[stage].clear()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Aşama başına isabet ('hits'), ıska ('misses') ve önbellekteki sonuç ('entries') sayıları"""
+        return {
+            name: {**counts, 'entries': len(self._results[name])}
+            for name, counts in self._stats.items()
+        }
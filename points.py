@@ -0,0 +1,271 @@
+"""
+Seçili lokasyonlar için sütunlu (NumPy) nokta deposu ve toplu içe aktarma.
+
+Noktalar enlem/boylam/adres dizilerinde tutulur; yinelenen nokta kontrolü
+yuvarlanmış koordinatlar üzerindeki bir sözlükle O(1) yapılır.
+"""
+import io
+import itertools
+import json
+import sys
+from typing import Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+# Yinelenen nokta kontrolünde kullanılan ondalık basamak (5 basamak ~ 1 m)
+POINT_PRECISION = 5
+
+# Dosyadan adres olarak okunabilecek sütunlar
+ADDRESS_COLUMNS = ('address', 'adres', 'name', 'ad')
+
+_LAT_OFFSET = 90 * 10 ** POINT_PRECISION
+_LON_OFFSET = 180 * 10 ** POINT_PRECISION
+_LON_SPAN = 2 * _LON_OFFSET + 1
+
+_tokens = itertools.count()
+
+
+def point_keys(lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Koordinatları POINT_PRECISION basamağa yuvarlayıp tek bir int64 anahtara çevirir"""
+    scale = 10 ** POINT_PRECISION
+    qlat = np.round(np.asarray(lats, dtype=np.float64) * scale).astype(np.int64) + _LAT_OFFSET
+    qlon = np.round(np.asarray(lons, dtype=np.float64) * scale).astype(np.int64) + _LON_OFFSET
+    return qlat * _LON_SPAN + qlon
+
+
+class PointSnapshot:
+    """
+    Deponun değişmez görüntüsü. Eşitlik ve hash yalnızca sürüm belirtecine
+    bakar; böylece binlerce nokta her yeniden çalıştırmada hashlenmez.
+    """
+    __slots__ = ('token', 'lats', 'lons', 'addresses')
+
+    def __init__(self, token: int, lats: np.ndarray, lons: np.ndarray, addresses: np.ndarray):
+        self.token = token
+        self.lats = lats
+        self.lons = lons
+        self.addresses = addresses
+
+    def __len__(self) -> int:
+        return len(self.lats)
+
+    @property
+    def nbytes(self) -> int:
+        """Görüntünün yaklaşık bellek kullanımı (bayt)"""
+        return int(self.lats.nbytes + self.lons.nbytes + sum(sys.getsizeof(a) for a in self.addresses))
+
+    def __hash__(self) -> int:
+        return hash(self.token)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, PointSnapshot) and other.token == self.token
+
+    def records(self) -> List[Dict]:
+        """Noktaları {'lat', 'lon', 'address'} sözlükleri olarak döndürür"""
+        return [
+            {'lat': float(lat), 'lon': float(lon), 'address': address}
+            for lat, lon, address in zip(self.lats, self.lons, self.addresses)
+        ]
+
+
+class PointStore:
+    """Ekleme sırasını koruyan, yinelenenleri reddeden sütunlu nokta deposu"""
+
+    def __init__(self):
+        self._lats = np.empty(16, dtype=np.float64)
+        self._lons = np.empty(16, dtype=np.float64)
+        self._addresses = np.empty(16, dtype=object)
+        self._size = 0
+        self._index: Dict[int, int] = {}
+        self._snapshot: Optional[PointSnapshot] = None
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _reserve(self, capacity: int):
+        """Dizileri gerekirse ikiye katlayarak büyütür"""
+        if capacity <= len(self._lats):
+            return
+        new_capacity = max(capacity, 2 * len(self._lats))
+        for name in ('_lats', '_lons', '_addresses'):
+            old = getattr(self, name)
+            grown = np.empty(new_capacity, dtype=old.dtype)
+            grown[:self._size] = old[:self._size]
+            setattr(self, name, grown)
+
+    def _changed(self):
+        self._snapshot = None
+
+    def contains(self, lat: float, lon: float) -> bool:
+        """Nokta (POINT_PRECISION hassasiyetinde) depoda var mı"""
+        return int(point_keys(lat, lon)) in self._index
+
+    def add(self, lat: float, lon: float, address: str = '') -> bool:
+        """
+        Tek nokta ekler.
+
+        Returns:
+            bool: Nokta eklendiyse True, zaten varsa False
+        """
+        return self.add_many([lat], [lon], [address]) == 1
+
+    def add_many(self, lats: Iterable[float], lons: Iterable[float], addresses: Optional[Iterable[str]] = None) -> int:
+        """
+        Noktaları toplu ekler; depoda veya girdinin kendisinde yinelenenler atlanır.
+
+        Args:
+            lats: Enlem dizisi
+            lons: Boylam dizisi
+            addresses: Adres dizisi (None ise boş)
+
+        Returns:
+            int: Eklenen nokta sayısı
+        """
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        if addresses is None:
+            addresses = np.full(len(lats), '', dtype=object)
+        else:
+            addresses = np.asarray(list(addresses), dtype=object)
+
+        valid = np.isfinite(lats) & np.isfinite(lons) & (np.abs(lats) <= 90) & (np.abs(lons) <= 180)
+        lats, lons, addresses = lats[valid], lons[valid], addresses[valid]
+
+        # Girdi içindeki yinelenenlerden ilkini tut, depodakileri at
+        keys = point_keys(lats, lons)
+        _, first = np.unique(keys, return_index=True)
+        first.sort()
+        new = np.array([int(keys[i]) not in self._index for i in first], dtype=np.bool_)
+        rows = first[new]
+        if len(rows) == 0:
+            return 0
+
+        start = self._size
+        self._reserve(start + len(rows))
+        end = start + len(rows)
+        self._lats[start:end] = lats[rows]
+        self._lons[start:end] = lons[rows]
+        self._addresses[start:end] = addresses[rows]
+        self._index.update(zip(keys[rows].tolist(), range(start, end)))
+        self._size = end
+        self._changed()
+        return len(rows)
+
+    def remove(self, positions: Union[int, Iterable[int]]):
+        """Verilen sıradaki noktaları siler (kalanların sırası korunur)"""
+        keep = np.ones(self._size, dtype=np.bool_)
+        keep[np.atleast_1d(np.asarray(positions, dtype=np.int64))] = False
+        n = int(keep.sum())
+        for name in ('_lats', '_lons', '_addresses'):
+            array = getattr(self, name)
+            array[:n] = array[:self._size][keep]
+        self._size = n
+        self._index = dict(zip(point_keys(self.lats, self.lons).tolist(), range(n)))
+        self._changed()
+
+    def clear(self):
+        """Tüm noktaları siler"""
+        self._size = 0
+        self._index = {}
+        self._changed()
+
+    @property
+    def lats(self) -> np.ndarray:
+        return self._lats[:self._size]
+
+    @property
+    def lons(self) -> np.ndarray:
+        return self._lons[:self._size]
+
+    @property
+    def addresses(self) -> np.ndarray:
+        return self._addresses[:self._size]
+
+    def get(self, position: int) -> Dict:
+        """Tek noktayı sözlük olarak döndürür (negatif sıra desteklenir)"""
+        position = range(self._size)[position]
+        return {
+            'lat': float(self._lats[position]),
+            'lon': float(self._lons[position]),
+            'address': self._addresses[position]
+        }
+
+    def last(self) -> Optional[Dict]:
+        """Son eklenen nokta (depo boşsa None)"""
+        return self.get(-1) if self._size else None
+
+    def page(self, number: int, size: int) -> List[Dict]:
+        """0 tabanlı sayfa numarasına göre noktaları ve depodaki sıralarını döndürür"""
+        start = number * size
+        return [
+            {'position': position, **self.get(position)}
+            for position in range(start, min(start + size, self._size))
+        ]
+
+    def snapshot(self) -> PointSnapshot:
+        """Depo değişene kadar aynı kalan salt okunur görüntü"""
+        if self._snapshot is None:
+            arrays = [array.copy() for array in (self.lats, self.lons, self.addresses)]
+            for array in arrays:
+                array.setflags(write=False)
+            self._snapshot = PointSnapshot(next(_tokens), *arrays)
+        return self._snapshot
+
+    def to_frame(self) -> pd.DataFrame:
+        """Noktaları 'lat', 'lon', 'address' sütunlu DataFrame olarak döndürür"""
+        return pd.DataFrame({'lat': self.lats.copy(), 'lon': self.lons.copy(), 'address': self.addresses.copy()})
+
+
+def geojson_points(data: Dict) -> pd.DataFrame:
+    """
+    GeoJSON FeatureCollection içindeki Point nesnelerini tabloya çevirir.
+
+    Args:
+        data: Ayrıştırılmış GeoJSON
+
+    Returns:
+        pd.DataFrame: 'lat', 'lon' ve (özelliklerde varsa) 'address' sütunları
+    """
+    rows = []
+    for feature in data.get('features', []):
+        geometry = feature.get('geometry') or {}
+        if geometry.get('type') != 'Point':
+            continue
+        lon, lat = geometry['coordinates'][:2]
+        properties = feature.get('properties') or {}
+        address = next((properties[c] for c in ADDRESS_COLUMNS if properties.get(c)), '')
+        rows.append({'lat': lat, 'lon': lon, 'address': str(address)})
+    return pd.DataFrame(rows, columns=['lat', 'lon', 'address'])
+
+
+def read_point_file(content: bytes, filename: str) -> pd.DataFrame:
+    """
+    Yüklenen CSV veya GeoJSON dosyasından noktaları okur.
+
+    CSV dosyasında 'lat'/'lon' (veya 'latitude'/'longitude', 'enlem'/'boylam')
+    sütunları aranır; varsa adres/ad sütunu da alınır.
+
+    Args:
+        content: Dosya içeriği
+        filename: Dosya adı (biçim uzantıdan belirlenir)
+
+    Returns:
+        pd.DataFrame: 'lat', 'lon' ve 'address' sütunları
+    """
+    if filename.lower().endswith(('.geojson', '.json')):
+        return geojson_points(json.loads(content.decode('utf-8')))
+
+    df = pd.read_csv(io.BytesIO(content))
+    columns = {c.lower().strip(): c for c in df.columns}
+    lat_col = next((columns[c] for c in ('lat', 'latitude', 'enlem') if c in columns), None)
+    lon_col = next((columns[c] for c in ('lon', 'lng', 'longitude', 'boylam') if c in columns), None)
+    if lat_col is None or lon_col is None:
+        raise ValueError("CSV dosyasında enlem/boylam sütunları bulunamadı")
+    address_col = next((columns[c] for c in ADDRESS_COLUMNS if c in columns), None)
+
+    return pd.DataFrame({
+        'lat': pd.to_numeric(df[lat_col], errors='coerce'),
+        'lon': pd.to_numeric(df[lon_col], errors='coerce'),
+        'address': df[address_col].fillna('').astype(str) if address_col else ''
+    })
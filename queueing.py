@@ -0,0 +1,393 @@
+"""
+Şarj istasyonu kuyruk modeli: doluluk, bekleme süresi ve geri çevrilen talep.
+
+Saatlik varış profili ve istasyon tipine göre şarj süresi dağılımıyla
+çalışır. Saatlik kullanım düşükse her saat durağan bir M/M/c kuyruğu olarak
+analitik hesaplanır (bir saatten uzun oturumlarda saatin yükü, oturum süresi
+boyunca gelen varışlardan alınır); aksi halde ayrık olay simülasyonu (DES)
+kullanılır.
+"""
+import heapq
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# İstasyon tipine göre şarj oturumu süresi (dakika) ve varsayılan soket sayısı
+STATION_PROFILES: Dict[str, Dict[str, float]] = {
+    "AC Normal Şarj": {"mean_minutes": 120, "cv": 0.6, "chargers": 4, "power_kw": 22},
+    "DC Hızlı Şarj": {"mean_minutes": 35, "cv": 0.4, "chargers": 2, "power_kw": 120},
+    "Ultra Hızlı Şarj": {"mean_minutes": 20, "cv": 0.3, "chargers": 2, "power_kw": 300}
+}
+
+# Günlük varışların saatlere dağılımı (sabah ve akşam zirveli; toplamı 1)
+HOURLY_ARRIVAL_PROFILE = np.array([
+    0.8, 0.5, 0.4, 0.3, 0.3, 0.6, 1.5, 3.5, 5.5, 6.0, 5.5, 5.0,
+    5.5, 5.5, 5.0, 5.5, 6.5, 8.0, 8.5, 7.0, 5.0, 3.5, 2.5, 1.5
+])
+HOURLY_ARRIVAL_PROFILE = HOURLY_ARRIVAL_PROFILE / HOURLY_ARRIVAL_PROFILE.sum()
+
+# Bölgedeki EV trafiğinin şarj için durma olasılığı ve rakip istasyon başına soket
+CHARGE_PROBABILITY = 0.5
+COMPETITOR_CHARGERS = 2
+
+# Sürücünün başka istasyona gitmeden önce bekleyeceği en uzun süre (dakika)
+DEFAULT_MAX_WAIT_MIN = 20.0
+
+# Analitik çözümün geçerli sayıldığı en yüksek saatlik kullanım oranı; daha yüksek
+# kullanımda zirve saatlerin geçici kuyruğu ve vazgeçen sürücüler belirleyici olur
+MMC_MAX_UTILIZATION = 0.5
+
+# Simülasyon süresi (gün) ve ölçümden çıkarılan ısınma süresi
+DES_DAYS = 14
+DES_WARMUP_DAYS = 1
+
+
+def station_demand(ev_traffic, nearby_stations, chargers: int) -> np.ndarray:
+    """
+    Bölgedeki şarj talebinin istasyona düşen günlük payını hesaplar.
+
+    Talep, erişilebilir rakip havuzundaki soketlerle soket sayısı oranında paylaşılır.
+
+    Args:
+        ev_traffic: Günlük EV trafiği
+        nearby_stations: Erişilebilir rakip istasyon sayısı
+        chargers: Kurulacak soket sayısı
+
+    Returns:
+        np.ndarray: Günlük şarj oturumu beklentisi
+    """
+    pool = np.asarray(ev_traffic, dtype=np.float64) * CHARGE_PROBABILITY
+    competitor = np.asarray(nearby_stations, dtype=np.float64) * COMPETITOR_CHARGERS
+    return pool * chargers / (chargers + competitor)
+
+
+def hourly_rates(daily_sessions) -> np.ndarray:
+    """Günlük oturum sayısını (..., 24) saatlik varış hızlarına böler"""
+    return np.asarray(daily_sessions, dtype=np.float64)[..., None] * HOURLY_ARRIVAL_PROFILE
+
+
+def offered_load(rates, mean_minutes: float) -> np.ndarray:
+    """
+    Saatlik varış hızlarından saat başına sunulan yükü (Erlang) hesaplar.
+
+    Bir saatten uzun oturumlarda bir saatteki yük, oturum süresi boyunca
+    gelen varışların ortalamasından hesaplanır (gün dairesel kabul edilir).
+
+    Args:
+        rates: (..., 24) saatlik varış hızları
+        mean_minutes: Ortalama şarj süresi (dakika)
+
+    Returns:
+        np.ndarray: (..., 24) sunulan yük
+    """
+    window = max(1, int(round(mean_minutes / 60)))
+    if window > 1:
+        rates = sum(np.roll(rates, k, axis=-1) for k in range(window)) / window
+    return rates * mean_minutes / 60
+
+
+def erlang_c(chargers: int, load) -> np.ndarray:
+    """
+    Erlang C: bir aracın beklemek zorunda kalma olasılığı.
+
+    Sayısal kararlılık için Erlang B özyinelemesinden hesaplanır.
+
+    Args:
+        chargers: Soket sayısı (c)
+        load: Sunulan yük (Erlang, λ / μ); dizi olabilir
+
+    Returns:
+        np.ndarray: Bekleme olasılığı (yük >= c ise 1)
+    """
+    load = np.asarray(load, dtype=np.float64)
+    blocking = np.ones_like(load)
+    for k in range(1, chargers + 1):
+        blocking = load * blocking / (k + load * blocking)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        wait_probability = chargers * blocking / (chargers - load * (1 - blocking))
+    return np.where(load < chargers, wait_probability, 1.0)
+
+
+def mmc_valid(daily_sessions, station_type: str, chargers: int) -> np.ndarray:
+    """Analitik M/M/c yaklaşımının geçerli olup olmadığını döndürür"""
+    peak_load = offered_load(hourly_rates(daily_sessions), STATION_PROFILES[station_type]['mean_minutes']).max(axis=-1)
+    return peak_load / chargers < MMC_MAX_UTILIZATION
+
+
+def analytic_queue(
+    daily_sessions,
+    station_type: str,
+    chargers: int,
+    max_wait_min: float = DEFAULT_MAX_WAIT_MIN
+) -> Dict[str, np.ndarray]:
+    """
+    Her saati durağan M/M/c kuyruğu sayarak metrikleri kapalı formda hesaplar.
+
+    Üstel olmayan şarj süreleri için bekleme süresi Allen-Cunneen
+    düzeltmesiyle ((1 + cv²) / 2) ölçeklenir. Girdi dizi olabilir; tüm
+    lokasyonlar tek seferde hesaplanır.
+
+    Args:
+        daily_sessions: Günlük şarj oturumu beklentisi
+        station_type: İstasyon tipi (STATION_PROFILES anahtarı)
+        chargers: Soket sayısı
+        max_wait_min: Sürücünün en fazla bekleyeceği süre (dakika)
+
+    Returns:
+        Dict[str, np.ndarray]: 'occupancy', 'avg_wait', 'p95_wait' (dakika),
+        'turned_away' (oran) ve 'hourly_occupancy' (..., 24)
+    """
+    profile = STATION_PROFILES[station_type]
+    mean_hours = profile['mean_minutes'] / 60
+    rates = hourly_rates(daily_sessions)
+    load = offered_load(rates, profile['mean_minutes'])
+    utilization = np.minimum(load / chargers, 1.0)
+
+    wait_probability = erlang_c(chargers, load)
+    correction = (1 + profile['cv'] ** 2) / 2
+    # Bekleme süresi kuyruğu: P(W > t) = C * exp(-theta * t), theta = (cμ - λ) / düzeltme
+    with np.errstate(divide='ignore'):
+        theta = np.maximum((chargers - load) / mean_hours, 1e-9) / 60 / correction
+
+    turned_away_h = wait_probability * np.exp(-theta * max_wait_min)
+    arrivals = np.maximum(rates.sum(axis=-1), 1e-12)
+    weights = rates / arrivals[..., None]
+
+    # Varış ağırlıklı karışımın %95'lik dilimini ikiye bölme ile bul
+    low = np.zeros(rates.shape[:-1])
+    high = np.full(rates.shape[:-1], max_wait_min)
+    for _ in range(40):
+        mid = (low + high) / 2
+        tail = (weights * wait_probability * np.exp(-theta * mid[..., None])).sum(axis=-1)
+        above = tail > 0.05
+        low = np.where(above, mid, low)
+        high = np.where(above, high, mid)
+    tail_at_zero = (weights * wait_probability).sum(axis=-1)
+
+    return {
+        'occupancy': (utilization * (1 - turned_away_h)).mean(axis=-1),
+        'avg_wait': (weights * np.minimum(wait_probability / theta, max_wait_min)).sum(axis=-1),
+        'p95_wait': np.where(tail_at_zero > 0.05, high, 0.0),
+        'turned_away': (weights * turned_away_h).sum(axis=-1),
+        'hourly_occupancy': utilization * (1 - turned_away_h)
+    }
+
+
+def _session_minutes(rng: np.random.Generator, profile: Dict[str, float], n: int) -> np.ndarray:
+    """Ortalaması ve değişim katsayısı verilen log-normal şarj süreleri çeker"""
+    sigma = np.sqrt(np.log(1 + profile['cv'] ** 2))
+    mu = np.log(profile['mean_minutes']) - sigma ** 2 / 2
+    return rng.lognormal(mu, sigma, n)
+
+
+def simulate_queue(
+    daily_sessions: float,
+    station_type: str,
+    chargers: int,
+    max_wait_min: float = DEFAULT_MAX_WAIT_MIN,
+    days: int = DES_DAYS,
+    seed: int = 0
+) -> Dict:
+    """
+    İstasyonu ayrık olay simülasyonuyla (ilk gelen ilk hizmet alır) çalıştırır.
+
+    Varışlar saatlik profile göre homojen olmayan Poisson sürecidir; tahmini
+    beklemesi max_wait_min'i aşan sürücüler başka istasyona gider.
+
+    Args:
+        daily_sessions: Günlük şarj oturumu beklentisi
+        station_type: İstasyon tipi
+        chargers: Soket sayısı
+        max_wait_min: Sürücünün en fazla bekleyeceği süre (dakika)
+        days: Simüle edilecek gün sayısı (ilk gün ısınma olarak atılır)
+        seed: Rastgele sayı üreteci tohumu
+
+    Returns:
+        Dict: analytic_queue ile aynı anahtarlar (skaler değerler)
+    """
+    rng = np.random.default_rng(seed)
+    profile = STATION_PROFILES[station_type]
+
+    rates = np.tile(hourly_rates(daily_sessions), days)
+    counts = rng.poisson(rates)
+    arrivals = (np.repeat(np.arange(len(rates)), counts) + rng.random(counts.sum())) * 60
+    arrivals.sort()
+    durations = _session_minutes(rng, profile, len(arrivals))
+
+    free_at = [0.0] * chargers
+    starts = np.full(len(arrivals), np.nan)
+    for i, (arrival, duration) in enumerate(zip(arrivals.tolist(), durations.tolist())):
+        start = max(arrival, free_at[0])
+        if start - arrival > max_wait_min:
+            continue
+        heapq.heapreplace(free_at, start + duration)
+        starts[i] = start
+
+    # Isınma gününden sonraki varışlar ölçülür
+    horizon = days * 24 * 60
+    measured = arrivals >= DES_WARMUP_DAYS * 24 * 60
+    served = ~np.isnan(starts)
+    waits = (starts - arrivals)[served & measured]
+
+    # Dakika çözünürlüğünde meşgul soket sayısı
+    busy = np.zeros(horizon + 1)
+    begin = np.minimum(starts[served], horizon).astype(np.int64)
+    end = np.minimum(starts[served] + durations[served], horizon).astype(np.int64)
+    np.add.at(busy, begin, 1)
+    np.add.at(busy, end, -1)
+    busy = np.cumsum(busy)[:horizon].reshape(days, 24, 60)[DES_WARMUP_DAYS:]
+    hourly_occupancy = busy.mean(axis=(0, 2)) / chargers
+
+    return {
+        'occupancy': float(hourly_occupancy.mean()),
+        'avg_wait': float(waits.mean()) if len(waits) else 0.0,
+        'p95_wait': float(np.percentile(waits, 95)) if len(waits) else 0.0,
+        'turned_away': float(1 - served[measured].mean()) if measured.any() else 0.0,
+        'hourly_occupancy': hourly_occupancy
+    }
+
+
+def queue_metrics(
+    daily_sessions: float,
+    station_type: str,
+    chargers: Optional[int] = None,
+    max_wait_min: float = DEFAULT_MAX_WAIT_MIN,
+    method: str = 'auto',
+    seed: int = 0
+) -> Dict:
+    """
+    Tek bir istasyon için kuyruk metriklerini hesaplar.
+
+    Args:
+        daily_sessions: Günlük şarj oturumu beklentisi
+        station_type: İstasyon tipi
+        chargers: Soket sayısı (None ise tipin varsayılanı)
+        max_wait_min: Sürücünün en fazla bekleyeceği süre (dakika)
+        method: 'auto' (geçerliyse analitik), 'analytic' veya 'des'
+        seed: DES tohumu
+
+    Returns:
+        Dict: 'occupancy', 'avg_wait', 'p95_wait', 'turned_away',
+        'hourly_occupancy' ve kullanılan 'method'
+    """
+    if chargers is None:
+        chargers = int(STATION_PROFILES[station_type]['chargers'])
+    if method == 'auto':
+        method = 'analytic' if bool(mmc_valid(daily_sessions, station_type, chargers)) else 'des'
+
+    if method == 'analytic':
+        result = {
+            key: (value if key == 'hourly_occupancy' else float(value))
+            for key, value in analytic_queue(daily_sessions, station_type, chargers, max_wait_min).items()
+        }
+    else:
+        result = simulate_queue(daily_sessions, station_type, chargers, max_wait_min, seed=seed)
+    result['method'] = method
+    return result
+
+
+def _run_scenario(scenario: Dict) -> Dict:
+    metrics = queue_metrics(**scenario)
+    metrics.pop('hourly_occupancy')
+    return {**scenario, **metrics}
+
+
+def sweep(scenarios: List[Dict], workers: Optional[int] = 1) -> pd.DataFrame:
+    """
+    Senaryo listesini değerlendirir; istenirse simülasyon gerektirenler süreç havuzunda çalışır.
+
+    Args:
+        scenarios: queue_metrics argümanlarından oluşan sözlükler
+        workers: İşçi süreç sayısı (1 ise süreç havuzu kullanılmaz, None ise CPU
+            sayısı); web sunucusu içinden süreç havuzu açılmaması için varsayılan 1'dir
+
+    Returns:
+        pd.DataFrame: Senaryo başına bir satır; girdiler ve metrikler
+    """
+    needs_des = [
+        scenario.get('method', 'auto') == 'des' or (
+            scenario.get('method', 'auto') == 'auto' and not bool(mmc_valid(
+                scenario['daily_sessions'],
+                scenario['station_type'],
+                scenario.get('chargers') or int(STATION_PROFILES[scenario['station_type']]['chargers'])
+            ))
+        )
+        for scenario in scenarios
+    ]
+    results: List[Optional[Dict]] = [None] * len(scenarios)
+
+    # Analitik senaryolar milisaniyeler içinde biter; süreç başlatmaya değmez
+    for i, scenario in enumerate(scenarios):
+        if not needs_des[i]:
+            results[i] = _run_scenario(scenario)
+
+    pending = [i for i, des in enumerate(needs_des) if des]
+    if len(pending) == 1 or workers == 1:
+        for i in pending:
+            results[i] = _run_scenario(scenarios[i])
+    elif pending:
+        with ProcessPoolExecutor(max_workers=min(workers or os.cpu_count() or 1, len(pending))) as executor:
+            for i, result in zip(pending, executor.map(_run_scenario, [scenarios[i] for i in pending])):
+                results[i] = result
+
+    return pd.DataFrame(results)
+
+
+def queue_metrics_batch(
+    daily_sessions,
+    station_type: str,
+    chargers: Optional[int] = None,
+    max_wait_min: float = DEFAULT_MAX_WAIT_MIN,
+    seeds=None,
+    workers: Optional[int] = 1
+) -> pd.DataFrame:
+    """
+    Birden çok lokasyonun kuyruk metriklerini hesaplar.
+
+    Analitik yaklaşımın geçerli olduğu lokasyonlar tek vektörel çağrıyla,
+    kalanlar sweep ile (gerekirse süreç havuzunda) simüle edilir.
+
+    Args:
+        daily_sessions: Lokasyon başına günlük şarj oturumu beklentisi
+        station_type: İstasyon tipi
+        chargers: Soket sayısı (None ise tipin varsayılanı)
+        max_wait_min: Sürücünün en fazla bekleyeceği süre (dakika)
+        seeds: Lokasyon başına DES tohumları
+        workers: DES için işçi süreç sayısı (1 ise süreç havuzu kullanılmaz)
+
+    Returns:
+        pd.DataFrame: 'occupancy', 'avg_wait', 'p95_wait', 'turned_away' ve 'method' sütunları
+    """
+    daily_sessions = np.atleast_1d(np.asarray(daily_sessions, dtype=np.float64))
+    if chargers is None:
+        chargers = int(STATION_PROFILES[station_type]['chargers'])
+    if seeds is None:
+        seeds = np.zeros(len(daily_sessions), dtype=np.int64)
+
+    result = pd.DataFrame(index=range(len(daily_sessions)), columns=['occupancy', 'avg_wait', 'p95_wait', 'turned_away'], dtype=np.float64)
+    valid = mmc_valid(daily_sessions, station_type, chargers)
+    if valid.any():
+        metrics = analytic_queue(daily_sessions[valid], station_type, chargers, max_wait_min)
+        for column in result.columns:
+            result.loc[valid, column] = metrics[column]
+
+    pending = np.flatnonzero(~valid)
+    if len(pending):
+        simulated = sweep([
+            {
+                'daily_sessions': float(daily_sessions[i]),
+                'station_type': station_type,
+                'chargers': chargers,
+                'max_wait_min': max_wait_min,
+                'method': 'des',
+                'seed': int(seeds[i])
+            }
+            for i in pending
+        ], workers=workers)
+        result.loc[pending, result.columns] = simulated[list(result.columns)].to_numpy()
+
+    result['method'] = np.where(valid, 'analytic', 'des')
+    return result
@@ -0,0 +1,230 @@
+import logging
+import os
+import unicodedata
+import numpy as np
+import pandas as pd
+import shapely
+from functools import lru_cache
+from shapely import STRtree
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from ingest import load_province_population
+
+PROVINCES_PATH = os.path.join('veriler', 'il_sinirlari.geojson')
+DISTRICTS_PATH = os.path.join('veriler', 'ilce_sinirlari.geojson')
+
+# Farklı sınır veri setlerinde karşılaşılan ad alanları
+PROVINCE_NAME_FIELDS = ('il_adi', 'NAME_1', 'name', 'province')
+DISTRICT_NAME_FIELDS = ('ilce_adi', 'NAME_2', 'name', 'district')
+
+# Nokta sorgusuna eklenen il nüfus tablosu sütunları
+PROVINCE_POPULATION_COLUMNS = ['Toplam_Nufus', 'Sehir_Nufus', 'Kirsal_Nufus', 'Nufus_Yogunlugu']
+
+# Ayarlanırsa sınır dosyaları eksikken yaklaşık demografiye düşmek yerine hata verilir
+REQUIRE_BOUNDARIES = os.getenv('REQUIRE_BOUNDARIES', '').lower() in ('1', 'true', 'yes')
+
+ArrayLike = Union[float, Sequence[float], np.ndarray]
+
+logger = logging.getLogger(__name__)
+
+
+# ASCII karşılığı ayrıştırma ile bulunamayan Türkçe harfler
+_ASCII_FOLD = str.maketrans({'ı': 'i'})
+
+
+def normalize_name(name: str) -> str:
+    """
+    Ad eşleştirme anahtarı üretir: Türkçe kurallarıyla küçük harfe çevirir,
+    sonra ASCII'ye indirger (ı→i, ş→s, ğ→g, ...). Böylece "İstanbul",
+    "ISTANBUL" ve GADM'deki "Istanbul" aynı anahtara düşer.
+    """
+    lowered = str(name).strip().replace('İ', 'i').replace('I', 'ı').lower()
+    decomposed = unicodedata.normalize('NFKD', lowered.translate(_ASCII_FOLD))
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def build_layer(geometries: np.ndarray, names: np.ndarray, parents: Optional[np.ndarray] = None) -> Tuple[STRtree, np.ndarray, np.ndarray]:
+    """
+    Poligonlardan sorgulanabilir sınır katmanı kurar.
+
+    Geometriler yerinde hazırlanır (shapely.prepare); sorgular hazırlanmış
+    geometriler üzerinde koordinat dizileriyle yapılır.
+
+    Args:
+        geometries: Poligon dizisi (EPSG:4326)
+        names: Poligon adları
+        parents: Bağlı olunan il adları (None ise yok)
+
+    Returns:
+        Tuple[STRtree, np.ndarray, np.ndarray]: İndeks, adlar ve üst birim adları
+    """
+    geometries = np.asarray(geometries, dtype=object)
+    shapely.prepare(geometries)
+    if parents is None:
+        parents = np.full(len(geometries), None, dtype=object)
+    return STRtree(geometries), np.asarray(names, dtype=object), parents
+
+
+@lru_cache(maxsize=None)
+def _load_layer(path: str, name_fields: Tuple[str, ...]) -> Optional[Tuple[STRtree, np.ndarray, np.ndarray]]:
+    """Sınır katmanını bir kez yükler ve STRtree indeksini kurar"""
+    if not os.path.exists(path):
+        return None
+
+    import geopandas as gpd
+    gdf = gpd.read_file(path).to_crs(epsg=4326)
+    name_field = next(field for field in name_fields if field in gdf.columns)
+
+    # İlçe katmanında ilçenin bağlı olduğu il adı da tutulur
+    province_field = next((field for field in PROVINCE_NAME_FIELDS if field in gdf.columns and field != name_field), None)
+    parents = gdf[province_field].astype(str).to_numpy() if province_field else None
+
+    return build_layer(gdf.geometry.to_numpy(), gdf[name_field].astype(str).to_numpy(), parents)
+
+
+def missing_boundaries() -> List[str]:
+    """Bulunamayan sınır dosyalarının yollarını döndürür"""
+    return [path for path in (PROVINCES_PATH, DISTRICTS_PATH) if not os.path.exists(path)]
+
+
+@lru_cache(maxsize=1)
+def _report_missing(missing: Tuple[str, ...]) -> None:
+    paths = ", ".join(missing)
+    if REQUIRE_BOUNDARIES and len(missing) == 2:
+        raise FileNotFoundError(f"Sınır dosyaları bulunamadı ({paths}); kurulum için README'ye bakın")
+    logger.warning(
+        "Sınır dosyaları bulunamadı (%s); demografi en yakın büyük şehrin değerlerinden tahmin ediliyor. "
+        "Kurulum için README'ye bakın.", paths
+    )
+
+
+def has_boundaries() -> bool:
+    """
+    İl veya ilçe sınır verisinden en az birinin mevcut olup olmadığını döndürür.
+
+    Eksik dosyalar bir kez uyarı olarak günlüğe yazılır; REQUIRE_BOUNDARIES
+    ayarlıysa ve iki katman da yoksa FileNotFoundError fırlatılır.
+    """
+    missing = missing_boundaries()
+    if missing:
+        _report_missing(tuple(missing))
+    return (
+        _load_layer(PROVINCES_PATH, PROVINCE_NAME_FIELDS) is not None
+        or _load_layer(DISTRICTS_PATH, DISTRICT_NAME_FIELDS) is not None
+    )
+
+
+def locate(layer, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """
+    Her nokta için içinde bulunduğu poligonun indeksini döndürür (-1: bulunamadı).
+
+    STRtree yalnızca sınırlayıcı kutu adaylarını bulur; kesin sınama her
+    poligon için adaylarına tek bir intersects_xy çağrısıyla yapılır.
+    Sınır üzerindeki noktalar birden fazla poligona düşebilir; indeksi en
+    küçük olan kullanılır.
+    """
+    tree = layer[0]
+    result = np.full(len(lats), -1, dtype=np.int64)
+    point_idx, geom_idx = tree.query(shapely.points(lons, lats))
+    if not len(point_idx):
+        return result
+
+    order = np.argsort(geom_idx, kind='stable')
+    point_idx, geom_idx = point_idx[order], geom_idx[order]
+    starts = np.flatnonzero(np.r_[True, geom_idx[1:] != geom_idx[:-1]])
+    for start, end in zip(starts, np.r_[starts[1:], len(geom_idx)]):
+        candidates = point_idx[start:end]
+        candidates = candidates[result[candidates] < 0]
+        inside = shapely.intersects_xy(tree.geometries[geom_idx[start]], lons[candidates], lats[candidates])
+        result[candidates[inside]] = geom_idx[start]
+    return result
+
+
+def lookup_regions(lats: ArrayLike, lons: ArrayLike) -> pd.DataFrame:
+    """
+    Noktaların bulunduğu il ve ilçeyi toplu olarak bulur.
+
+    Args:
+        lats: Enlem dizisi
+        lons: Boylam dizisi
+
+    Returns:
+        pd.DataFrame: 'province' ve 'district' sütunları (bulunamayanlar için None)
+    """
+    lats = np.atleast_1d(np.asarray(lats, dtype=np.float64))
+    lons = np.atleast_1d(np.asarray(lons, dtype=np.float64))
+
+    result = pd.DataFrame({
+        'province': np.full(len(lats), None, dtype=object),
+        'district': np.full(len(lats), None, dtype=object)
+    })
+
+    provinces = _load_layer(PROVINCES_PATH, PROVINCE_NAME_FIELDS)
+    if provinces is not None:
+        idx = locate(provinces, lats, lons)
+        found = idx >= 0
+        result.loc[found, 'province'] = provinces[1][idx[found]]
+
+    districts = _load_layer(DISTRICTS_PATH, DISTRICT_NAME_FIELDS)
+    if districts is not None:
+        idx = locate(districts, lats, lons)
+        found = idx >= 0
+        result.loc[found, 'district'] = districts[1][idx[found]]
+        # İl katmanı yoksa ilçenin bağlı olduğu il kullanılır
+        parents = districts[2][idx[found]]
+        missing = result.loc[found, 'province'].isna().to_numpy() & pd.notna(parents)
+        result.loc[result.index[found][missing], 'province'] = parents[missing]
+
+    return result
+
+
+@lru_cache(maxsize=4)
+def _latest_province_rows(year: Optional[int] = None) -> Optional[pd.DataFrame]:
+    population = load_province_population(columns=['Yil', 'Il', *PROVINCE_POPULATION_COLUMNS])
+    if population is None:
+        return None
+
+    population = population.copy()
+    population['Il'] = population['Il'].astype(str)
+    population = population.sort_values(['Il', 'Yil'])
+
+    # Yıllık nüfus artış hızı (%) bir önceki mevcut yıla göre hesaplanır
+    previous = population.groupby('Il')['Toplam_Nufus'].shift()
+    years_between = population['Yil'] - population.groupby('Il')['Yil'].shift()
+    growth = ((population['Toplam_Nufus'] / previous) ** (1 / years_between) - 1) * 100
+    population['Nufus_Artis_Hizi'] = growth.astype(np.float32)
+
+    if year is None:
+        year = int(population['Yil'].max())
+    rows = population[population['Yil'] == year].copy()
+    rows['key'] = rows['Il'].map(normalize_name)
+    return rows.set_index('key')
+
+
+def lookup_demographics(lats: ArrayLike, lons: ArrayLike, year: Optional[int] = None) -> pd.DataFrame:
+    """
+    Noktaların idari birimini ve ilin nüfus satırını toplu olarak döndürür.
+
+    Args:
+        lats: Enlem dizisi
+        lons: Boylam dizisi
+        year: Nüfus verisinin yılı (None ise en güncel yıl)
+
+    Returns:
+        pd.DataFrame: 'province', 'district' ve nüfus tablosu sütunları
+        ('Il' sütunu TÜİK tablosundaki il adıdır)
+    """
+    regions = lookup_regions(lats, lons)
+    rows = _latest_province_rows(year)
+    if rows is None:
+        return regions
+
+    keys = regions['province'].map(lambda name: None if name is None else normalize_name(name))
+    joined = rows.reindex(keys.to_numpy())
+    joined.index = regions.index
+    return pd.concat([regions, joined], axis=1)
+
+
+def lookup_region(lat: float, lon: float, year: Optional[int] = None) -> Dict:
+    """Tek bir nokta için lookup_demographics sonucunu sözlük olarak döndürür"""
+    return lookup_demographics([lat], [lon], year).iloc[0].to_dict()
@@ -0,0 +1,243 @@
+"""
+Süreç genelinde, tüm Streamlit oturumlarınca paylaşılan bellek içi önbellek.
+
+Değerler oturumlar arasında paylaşıldığından döndürülürken ayrıştırılır:
+sözlük, liste ve pandas nesneleri kopyalanır, NumPy dizileri salt okunur
+yapılır. Grafik gibi diğer nesneler referansla döner ve değiştirilmemelidir;
+folium haritaları gibi kullanımı sırasında değişen nesneler bu önbelleğe
+konmamalıdır (Pipeline'da shared=False).
+
+Girdiler bellek tavanı (SHARED_CACHE_MAX_MB) ve yaşam süresiyle
+(SHARED_CACHE_TTL) sınırlanır; tavan aşıldığında önce süresi dolmuş, sonra
+en uzun süredir kullanılmayan girdiler çıkarılır. Aynı anahtar için eşzamanlı
+istekler tek bir hesaplamayı bekler (single-flight); hesaplama hata verirse
+hata bekleyen tüm isteklere iletilir ve sonuç saklanmaz.
+"""
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_MAX_BYTES = int(float(os.getenv('SHARED_CACHE_MAX_MB', 512)) * 1024 * 1024)
+DEFAULT_TTL = float(os.getenv('SHARED_CACHE_TTL', 3600))
+
+# Boyut tahmininde iç içe kapların taranacağı en fazla derinlik
+_MAX_SIZE_DEPTH = 4
+
+# Boyutu ucuza tahmin edilemeyen nesneler (harita, grafik) için varsayılan boyut
+OPAQUE_OBJECT_SIZE = 256 * 1024
+
+
+def estimate_size(value: Any, _depth: int = 0) -> int:
+    """
+    Değerin yaklaşık bellek kullanımını (bayt) tahmin eder.
+
+    NumPy dizileri, pandas nesneleri ve 'nbytes' özelliği olan nesneler için
+    veri boyutu, kaplar için elemanların toplamı, diğer nesneler için
+    OPAQUE_OBJECT_SIZE kullanılır; değer hiçbir zaman serileştirilmez.
+    """
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum() if isinstance(value, pd.DataFrame) else usage)
+    if isinstance(value, (str, bytes, int, float, bool, type(None))):
+        return sys.getsizeof(value)
+    if hasattr(value, 'nbytes'):
+        return int(value.nbytes)
+    if _depth < _MAX_SIZE_DEPTH:
+        if isinstance(value, dict):
+            return sys.getsizeof(value) + sum(
+                estimate_size(k, _depth + 1) + estimate_size(v, _depth + 1) for k, v in value.items()
+            )
+        if isinstance(value, (list, tuple, set, frozenset)):
+            return sys.getsizeof(value) + sum(estimate_size(v, _depth + 1) for v in value)
+    return OPAQUE_OBJECT_SIZE
+
+
+def _freeze(value: Any, _depth: int = 0):
+    """Değerdeki NumPy dizilerini yerinde salt okunur yapar"""
+    if isinstance(value, np.ndarray):
+        value.setflags(write=False)
+    elif _depth < _MAX_SIZE_DEPTH:
+        if isinstance(value, dict):
+            for item in value.values():
+                _freeze(item, _depth + 1)
+        elif isinstance(value, (list, tuple)):
+            for item in value:
+                _freeze(item, _depth + 1)
+
+
+def _detach(value: Any, _depth: int = 0) -> Any:
+    """Paylaşılan değerin değiştirilebilir kaplarını ve pandas nesnelerini kopyalar"""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy()
+    if _depth < _MAX_SIZE_DEPTH:
+        if isinstance(value, dict):
+            return {k: _detach(v, _depth + 1) for k, v in value.items()}
+        if isinstance(value, list):
+            return [_detach(v, _depth + 1) for v in value]
+        if isinstance(value, tuple) and type(value) is tuple:
+            return tuple(_detach(v, _depth + 1) for v in value)
+    return value
+
+
+class _Flight:
+    """Devam eden bir hesaplama; bekleyenler event ile uyandırılır"""
+    __slots__ = ('event', 'value', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error: Optional[BaseException] = None
+
+
+class SharedCache:
+    """Bellek tavanlı, LRU/TTL çıkarmalı, single-flight destekli iş parçacığı güvenli önbellek"""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, ttl: float = DEFAULT_TTL):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # anahtar -> (değer, boyut, son geçerlilik zamanı)
+        self._entries: OrderedDict = OrderedDict()
+        self._inflight: Dict[Hashable, _Flight] = {}
+        self._resident = 0
+        self._stats = {'hits': 0, 'misses': 0, 'coalesced': 0, 'evictions': 0, 'expirations': 0, 'errors': 0, 'oversized': 0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _drop(self, key: Hashable):
+        _, size, _ = self._entries.pop(key)
+        self._resident -= size
+
+    def _store(self, key: Hashable, value: Any, ttl: float, size: int):
+        if ttl <= 0:
+            return
+        # Anahtardaki diziler (örn. PointSnapshot) de bellekte tutulur
+        size += estimate_size(key)
+        if size > self.max_bytes:
+            self._stats['oversized'] += 1
+            return
+        if key in self._entries:
+            self._drop(key)
+        self._entries[key] = (value, size, time.monotonic() + ttl)
+        self._resident += size
+        if self._resident <= self.max_bytes:
+            return
+
+        # Önce süresi dolmuşları, yetmezse en eski kullanılanları çıkar
+        now = time.monotonic()
+        for expired in [k for k, (_, _, expires) in self._entries.items() if expires <= now and k != key]:
+            self._drop(expired)
+            self._stats['expirations'] += 1
+        while self._resident > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            self._stats['evictions'] += 1
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any],
+                       ttl: Union[float, Callable[[Any], float], None] = None,
+                       size: Optional[Callable[[Any], int]] = None) -> Any:
+        """
+        Anahtarın değerini döndürür; yoksa compute ile bir kez hesaplayıp saklar.
+
+        Aynı anahtar için eşzamanlı çağrılar ilk çağrının sonucunu bekler.
+
+        Args:
+            key: Hashlenebilir anahtar
+            compute: Argümansız hesaplama fonksiyonu
+            ttl: Yaşam süresi (saniye; None ise önbelleğin varsayılanı); çağrılabilirse
+                hesaplanan değerden belirlenir
+            size: Değerin bayt cinsinden boyutunu döndüren fonksiyon (None ise
+                estimate_size ile tahmin edilir)
+
+        Returns:
+            Any: Önbellekteki veya yeni hesaplanan değer (kopyalanmış kaplarla)
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[2] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._stats['hits'] += 1
+                else:
+                    self._drop(key)
+                    self._stats['expirations'] += 1
+                    entry = None
+
+            flight = None if entry is not None else self._inflight.get(key)
+            leader = entry is None and flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+                self._stats['misses'] += 1
+            elif entry is None:
+                self._stats['coalesced'] += 1
+
+        if entry is not None:
+            return _detach(entry[0])
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return _detach(flight.value)
+
+        try:
+            flight.value = compute()
+            _freeze(flight.value)
+        except BaseException as e:
+            flight.error = e
+            with self._lock:
+                self._stats['errors'] += 1
+            raise
+        else:
+            if callable(ttl):
+                ttl = ttl(flight.value)
+            nbytes = estimate_size(flight.value) if size is None else size(flight.value)
+            with self._lock:
+                self._store(key, flight.value, self.ttl if ttl is None else ttl, nbytes)
+            return _detach(flight.value)
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            flight.event.set()
+
+    def invalidate(self, predicate: Optional[Callable[[Hashable], bool]] = None):
+        """Koşulu sağlayan (None ise tüm) girdileri siler"""
+        with self._lock:
+            for key in [k for k in self._entries if predicate is None or predicate(k)]:
+                self._drop(key)
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Önbellek sayaçları.
+
+        Returns:
+            Dict[str, float]: 'hits', 'misses', 'coalesced', 'evictions',
+            'expirations', 'errors', 'oversized', 'entries', 'resident_bytes',
+            'max_bytes' ve 'hit_rate' (tekilleştirilen istekler isabet sayılır)
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+            stats['resident_bytes'] = self._resident
+        stats['max_bytes'] = self.max_bytes
+        requests = stats['hits'] + stats['coalesced'] + stats['misses']
+        stats['hit_rate'] = (stats['hits'] + stats['coalesced']) / requests if requests else 0.0
+        return stats
+
+
+# Süreç genelinde tek örnek; Streamlit oturumları aynı süreçte iş parçacığı olarak çalışır
+_shared_cache = SharedCache()
+
+
+def get_shared_cache() -> SharedCache:
+    """Süreç genelindeki paylaşılan önbelleği döndürür"""
+    return _shared_cache
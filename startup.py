@@ -0,0 +1,164 @@
+"""
+Uygulamanın soğuk başlangıç süresini düşük tutmak için yardımcılar.
+
+- lazy_module: Ağır bağımlılıkları ilk kullanımda içe aktaran vekil modül
+- profile_imports: `python -X importtime` çıktısını modül bazında raporlar
+- check_budget: Toplam içe aktarma süresini bütçeyle karşılaştırır
+
+Örnek:
+    python startup.py --module app --budget-ms 1000
+"""
+import argparse
+import importlib
+import os
+import re
+import subprocess
+import sys
+from types import ModuleType
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+# app.py'nin içe aktarılması için izin verilen süre (ms); CI makinesine göre ortamdan ayarlanabilir
+IMPORT_BUDGET_MS = float(os.getenv('IMPORT_BUDGET_MS', 1000))
+
+# Ölçüm gürültüsünü azaltmak için tekrar sayısı (en düşük değer kullanılır)
+DEFAULT_REPEAT = 3
+
+_IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s+)(\S+)')
+
+
+class LazyModule(ModuleType):
+    """İlk öznitelik erişiminde gerçek modülü içe aktaran vekil"""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__['_module'] = None
+
+    def _load(self) -> ModuleType:
+        module = self.__dict__['_module']
+        if module is None:
+            module = importlib.import_module(self.__name__)
+            self.__dict__['_module'] = module
+        return module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __dir__(self) -> List[str]:
+        return dir(self._load())
+
+
+def lazy_module(name: str) -> ModuleType:
+    """
+    Modülü ilk kullanımda içe aktaracak şekilde döndürür.
+
+    Modül zaten yüklenmişse doğrudan kendisi döner.
+
+    Args:
+        name: Tam modül adı (örn. 'plotly.graph_objects')
+
+    Returns:
+        ModuleType: Gerçek modül veya vekil
+    """
+    return sys.modules.get(name) or LazyModule(name)
+
+
+def profile_imports(module: str = 'app', python: str = sys.executable) -> pd.DataFrame:
+    """
+    Modülü yeni bir süreçte `-X importtime` ile içe aktarır ve maliyetleri döndürür.
+
+    Args:
+        module: İçe aktarılacak modül
+        python: Kullanılacak yorumlayıcı
+
+    Returns:
+        pd.DataFrame: 'module', 'self_ms', 'cumulative_ms' ve 'depth' sütunları
+        (içe aktarma sırasıyla; depth 0 doğrudan içe aktarılan modüllerdir)
+    """
+    result = subprocess.run(
+        [python, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"{module} içe aktarılamadı:\n{result.stderr[-2000:]}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append({
+                'module': name,
+                'self_ms': int(self_us) / 1000,
+                'cumulative_ms': int(cumulative_us) / 1000,
+                # Her iç içe seviye iki boşluk ekler
+                'depth': (len(indent) - 1) // 2
+            })
+    return pd.DataFrame(rows, columns=['module', 'self_ms', 'cumulative_ms', 'depth'])
+
+
+def top_level_costs(profile: pd.DataFrame, module: str) -> pd.DataFrame:
+    """Hedef modülün doğrudan içe aktardığı modüllerin maliyetini azalan sırada döndürür"""
+    # importtime alt modülleri üst modülden önce yazar; hedefin alt ağacı,
+    # kendisinden önceki son kök satırdan sonra başlar
+    target = profile.index[(profile['module'] == module) & (profile['depth'] == 0)][-1]
+    previous_roots = profile.index[(profile['depth'] == 0) & (profile.index < target)]
+    start = previous_roots[-1] + 1 if len(previous_roots) else 0
+    children = profile.loc[start:target - 1]
+    children = children[children['depth'] == 1]
+    return children.sort_values('cumulative_ms', ascending=False).reset_index(drop=True)
+
+
+def check_budget(
+    module: str = 'app',
+    budget_ms: float = IMPORT_BUDGET_MS,
+    repeat: int = DEFAULT_REPEAT
+) -> Dict:
+    """
+    Modülün toplam içe aktarma süresini ölçer ve bütçeyle karşılaştırır.
+
+    Args:
+        module: İçe aktarılacak modül
+        budget_ms: İzin verilen süre (ms)
+        repeat: Ölçüm tekrarı; en hızlı ölçüm kullanılır
+
+    Returns:
+        Dict: 'total_ms', 'budget_ms', 'ok' ve 'profile' (en hızlı ölçümün tablosu)
+    """
+    best: Optional[pd.DataFrame] = None
+    best_total = float('inf')
+    for _ in range(max(1, repeat)):
+        profile = profile_imports(module)
+        total = float(profile.loc[profile['module'] == module, 'cumulative_ms'].max())
+        if total < best_total:
+            best, best_total = profile, total
+
+    return {
+        'total_ms': round(best_total, 1),
+        'budget_ms': budget_ms,
+        'ok': best_total <= budget_ms,
+        'profile': best
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="İçe aktarma sürelerini raporlar ve bütçeyi denetler")
+    parser.add_argument('--module', default='app', help="Ölçülecek modül")
+    parser.add_argument('--budget-ms', type=float, default=IMPORT_BUDGET_MS, help="İzin verilen toplam süre (ms)")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('--top', type=int, default=15, help="Gösterilecek modül sayısı")
+    args = parser.parse_args()
+
+    report = check_budget(args.module, args.budget_ms, args.repeat)
+    costs = top_level_costs(report['profile'], args.module).head(args.top)
+    print(costs[['module', 'cumulative_ms', 'self_ms']].to_string(index=False, float_format='%.1f'))
+    status = "OK" if report['ok'] else "BÜTÇE AŞILDI"
+    print(f"\n{args.module}: {report['total_ms']:.1f} ms / {report['budget_ms']:.0f} ms - {status}")
+    sys.exit(0 if report['ok'] else 1)
+
+
+if __name__ == '__main__':
+    main()
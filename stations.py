@@ -0,0 +1,118 @@
+import os
+import numpy as np
+import pandas as pd
+from functools import lru_cache
+from typing import Tuple, Union
+
+from heatmap import CITY_COORDS, CITY_EXTENT_KM, KM_PER_DEGREE
+
+STATIONS_PATH = os.path.join('veriler', 'istasyonlar.csv')
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Gerçek veri yoksa şehir başına üretilecek istasyon sayısı
+SIMULATED_STATIONS_PER_CITY = 80
+
+ArrayLike = Union[float, np.ndarray]
+
+
+def load_station_coords(path: str = STATIONS_PATH) -> np.ndarray:
+    """
+    Şarj istasyonu koordinatlarını yükler.
+
+    Dosyada 'lat' ve 'lon' sütunları beklenir. Dosya yoksa şehir merkezleri
+    çevresinde sabit tohumlu simüle edilmiş istasyonlar döndürülür.
+
+    Args:
+        path: İstasyon CSV dosyasının yolu
+
+    Returns:
+        np.ndarray: (n, 2) boyutunda derece cinsinden [enlem, boylam] dizisi
+    """
+    if os.path.exists(path):
+        df = pd.read_csv(path, usecols=['lat', 'lon'])
+        return df.dropna().to_numpy(dtype=np.float64)
+
+    rng = np.random.default_rng(42)
+    coords = []
+    for city, (lat, lon) in CITY_COORDS.items():
+        spread = CITY_EXTENT_KM[city] / 3 / KM_PER_DEGREE
+        offsets = rng.normal(0, spread, size=(SIMULATED_STATIONS_PER_CITY, 2))
+        offsets[:, 1] /= np.cos(np.radians(lat))
+        coords.append(np.array([lat, lon]) + offsets)
+    return np.vstack(coords)
+
+
+@lru_cache(maxsize=1)
+def get_station_tree():
+    """
+    İstasyonlar üzerinde haversine BallTree oluşturur.
+
+    Ağaç süreç başına bir kez kurulur ve tüm oturumlarca paylaşılır.
+
+    Returns:
+        BallTree: Radyan cinsinden koordinatlar üzerinde kurulmuş indeks
+    """
+    # scikit-learn içe aktarımı pahalıdır; yalnızca ilk sorguda yüklenir
+    from sklearn.neighbors import BallTree
+    return BallTree(np.radians(load_station_coords()), metric='haversine')
+
+
+def _query_points(lat: ArrayLike, lon: ArrayLike) -> np.ndarray:
+    """Enlem/boylam girdilerini BallTree sorgusu için radyan dizisine çevirir"""
+    lat = np.atleast_1d(np.asarray(lat, dtype=np.float64))
+    lon = np.atleast_1d(np.asarray(lon, dtype=np.float64))
+    return np.radians(np.column_stack([lat.ravel(), lon.ravel()]))
+
+
+def k_nearest_stations(lat: ArrayLike, lon: ArrayLike, k: int = 5) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Her nokta için en yakın k istasyonu bulur.
+
+    Args:
+        lat: Enlem veya enlem dizisi
+        lon: Boylam veya boylam dizisi
+        k: İstenen komşu sayısı
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (n, k) boyutunda uzaklıklar (km) ve istasyon indeksleri
+    """
+    tree = get_station_tree()
+    k = min(k, tree.data.shape[0])
+    distances, indices = tree.query(_query_points(lat, lon), k=k)
+    return distances * EARTH_RADIUS_KM, indices
+
+
+def nearest_station_distance(lat: ArrayLike, lon: ArrayLike) -> np.ndarray:
+    """
+    Her nokta için en yakın istasyona uzaklığı hesaplar.
+
+    Args:
+        lat: Enlem veya enlem dizisi
+        lon: Boylam veya boylam dizisi
+
+    Returns:
+        np.ndarray: Girdi boyutunda uzaklıklar (km)
+    """
+    distances, _ = k_nearest_stations(lat, lon, k=1)
+    return distances[:, 0].reshape(np.shape(lat))
+
+
+def count_stations_within(lat: ArrayLike, lon: ArrayLike, radius_km: float = 5.0) -> np.ndarray:
+    """
+    Her noktanın verilen yarıçapı içindeki istasyonları sayar.
+
+    Args:
+        lat: Enlem veya enlem dizisi
+        lon: Boylam veya boylam dizisi
+        radius_km: Arama yarıçapı (km)
+
+    Returns:
+        np.ndarray: Girdi boyutunda istasyon sayıları
+    """
+    counts = get_station_tree().query_radius(
+        _query_points(lat, lon),
+        r=radius_km / EARTH_RADIUS_KM,
+        count_only=True
+    )
+    return counts.reshape(np.shape(lat))
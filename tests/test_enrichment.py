@@ -0,0 +1,51 @@
+"""enrichment.run_sources'un zaman aşımı ve eşzamanlılık sınırı testleri"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from enrichment import Source, run_sources
+
+
+def _sleep(seconds):
+    def fn(value):
+        time.sleep(seconds)
+        return value
+    return fn
+
+
+@pytest.fixture
+def executor():
+    pool = ThreadPoolExecutor(max_workers=2)
+    yield pool
+    pool.shutdown(wait=False)
+
+
+def test_timeout_starts_when_the_source_starts_running(executor):
+    # Dört kaynak iki iş parçacığını sırayla paylaşır; toplam süre zaman aşımını aşar
+    sources = [
+        Source(f's{k}', _sleep(0.2), ['x'], timeout=0.35, fallback=lambda x: 'yedek')
+        for k in range(4)
+    ]
+    output = run_sources(sources, [{'x': 'tamam'}], executor=executor)[0]
+
+    assert output['errors'] == {}
+    assert set(output['results'].values()) == {'tamam'}
+
+
+def test_abandoned_sources_do_not_block_the_rest_forever(executor):
+    release = threading.Event()
+    sources = [
+        Source('hangs', lambda x: release.wait(10), ['x'], timeout=0.1, fallback=lambda x: 'yedek'),
+        Source('after', lambda hung: 'tamam', ['hangs'], timeout=1.0)
+    ]
+    started = time.monotonic()
+    try:
+        output = run_sources(sources, [{'x': 1}], max_in_flight=1, executor=executor)[0]
+    finally:
+        release.set()
+
+    assert time.monotonic() - started < 2
+    assert output['results'] == {'hangs': 'yedek', 'after': 'tamam'}
+    assert 'hangs' in output['errors']
@@ -0,0 +1,109 @@
+"""http_cache.cached_fetch'in localhost üzerindeki bir http.server'a karşı testleri"""
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import http_cache
+from http_cache import cached_fetch, get_cache_stats, reset_cache_stats
+
+
+class _Origin:
+    """Gövdesi ve ETag'i testte değiştirilebilen kaynak sunucu"""
+
+    def __init__(self):
+        self.body = b'v1'
+        self.etag = '"v1"'
+        self.requests = []
+        origin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                origin.requests.append(self.headers.get('If-None-Match'))
+                if self.headers.get('If-None-Match') == origin.etag:
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('ETag', origin.etag)
+                self.send_header('Content-Length', str(len(origin.body)))
+                self.end_headers()
+                self.wfile.write(origin.body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}/datastore'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def publish(self, body: bytes):
+        self.body = body
+        self.etag = '"' + body.decode() + '"'
+
+
+@pytest.fixture
+def origin():
+    server = _Origin()
+    reset_cache_stats()
+    yield server
+    server.server.shutdown()
+    server.server.server_close()
+
+
+def _wait_for_revalidation(url, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        with http_cache._inflight_lock:
+            if url not in http_cache._inflight:
+                return
+        time.sleep(0.01)
+    raise AssertionError("arka plan yenilemesi bitmedi")
+
+
+def test_fresh_entry_is_served_from_disk(origin, tmp_path):
+    assert cached_fetch(origin.url, ttl=60, cache_dir=str(tmp_path)) == b'v1'
+    origin.publish(b'v2')
+
+    assert cached_fetch(origin.url, ttl=60, cache_dir=str(tmp_path)) == b'v1'
+    assert len(origin.requests) == 1
+    stats = get_cache_stats()
+    assert stats['misses'] == 1 and stats['hits'] == 1
+
+
+def test_expired_entry_is_served_stale_and_refreshed_in_background(origin, tmp_path):
+    cached_fetch(origin.url, ttl=60, cache_dir=str(tmp_path))
+    origin.publish(b'v2')
+
+    # TTL dolmuş: eski gövde beklemeden döner, yenileme arka planda yapılır
+    assert cached_fetch(origin.url, ttl=0, cache_dir=str(tmp_path)) == b'v1'
+    _wait_for_revalidation(origin.url)
+
+    assert origin.requests[-1] == '"v1"'
+    assert cached_fetch(origin.url, ttl=60, cache_dir=str(tmp_path)) == b'v2'
+    stats = get_cache_stats()
+    assert stats['stale_hits'] == 1 and stats['revalidations'] == 1 and stats['hits'] == 1
+
+
+def test_not_modified_response_renews_freshness(origin, tmp_path):
+    cached_fetch(origin.url, ttl=60, cache_dir=str(tmp_path))
+
+    body = cached_fetch(origin.url, ttl=0, cache_dir=str(tmp_path), stale_while_revalidate=False)
+    assert body == b'v1'
+    assert origin.requests == [None, '"v1"']
+    assert get_cache_stats()['not_modified'] == 1
+
+    # 304 tazelik zamanını yeniledi; yeni istek atılmaz
+    assert cached_fetch(origin.url, ttl=60, cache_dir=str(tmp_path)) == b'v1'
+    assert len(origin.requests) == 2
+
+
+def test_unreachable_origin_falls_back_to_cached_body(origin, tmp_path):
+    cached_fetch(origin.url, ttl=60, cache_dir=str(tmp_path))
+    origin.server.shutdown()
+    origin.server.server_close()
+
+    body = cached_fetch(origin.url, ttl=0, cache_dir=str(tmp_path), timeout=1, stale_while_revalidate=False)
+    assert body == b'v1'
+    assert get_cache_stats()['errors'] == 1
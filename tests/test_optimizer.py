@@ -0,0 +1,54 @@
+"""optimizer.optimize_sites'ın açgözlü çözümünün kesin ILP çözümüyle karşılaştırılması"""
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from optimizer import STATION_INSTALL_COSTS, coverage_matrix, demand_weights, optimize_sites
+
+TYPES = list(STATION_INSTALL_COSTS)
+
+
+def _candidates(n, seed):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'lat': rng.uniform(40.95, 41.10, n),
+        'lon': rng.uniform(28.85, 29.10, n),
+        'score': rng.uniform(1, 100, n),
+        'station_type': rng.choice(TYPES, n)
+    })
+
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('budget', [1_000_000, 3_000_000, 6_000_000])
+def test_greedy_value_and_bound_bracket_the_exact_optimum(seed, budget):
+    candidates = _candidates(40, seed)
+
+    greedy = optimize_sites(candidates, budget, radius_km=2.0)
+    exact = optimize_sites(candidates, budget, radius_km=2.0, exact=True)
+    optimum = exact['covered_demand']
+
+    assert greedy['total_cost'] <= budget and exact['total_cost'] <= budget
+    assert greedy['covered_demand'] <= optimum + 1e-6
+    assert optimum <= greedy['upper_bound'] + 1e-6
+    # En iyi tekli adayla birlikte açgözlü seçim (1 - 1/e) / 2 garantisini sağlar
+    assert greedy['covered_demand'] >= (1 - 1 / np.e) / 2 * optimum - 1e-6
+
+
+def test_exact_solution_matches_brute_force():
+    candidates = _candidates(12, seed=7)
+    budget = 2_000_000
+    result = optimize_sites(candidates, budget, radius_km=2.0, exact=True)
+
+    # Aynı talep ağırlıklarıyla tüm alt kümeler denenir
+    coverage = coverage_matrix(candidates, 2.0).toarray()
+    weights = demand_weights(candidates, 2.0)
+    costs = candidates['station_type'].map(STATION_INSTALL_COSTS).to_numpy()
+    best = 0.0
+    for size in range(len(candidates) + 1):
+        for subset in itertools.combinations(range(len(candidates)), size):
+            if costs[list(subset)].sum() <= budget:
+                best = max(best, weights[coverage[list(subset)].any(axis=0)].sum())
+
+    assert result['covered_demand'] == pytest.approx(best)
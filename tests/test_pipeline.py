@@ -0,0 +1,78 @@
+"""pipeline.Pipeline'ın bağımlılık izleme ve geçersizleştirme testleri"""
+import pytest
+
+from pipeline import Pipeline
+from shared_cache import SharedCache
+
+
+def _graph(calls, shared=None, **kwargs):
+    """Konuma bağlı bir aşama ve üzerine bütçeye bağlı bir projeksiyon"""
+    graph = Pipeline(shared=shared, **kwargs)
+
+    def demographics(lat, lon):
+        calls.append('demographics')
+        return {'population': int(lat * 1000 + lon)}
+
+    def projection(demo, budget):
+        calls.append('projection')
+        return demo['population'] + budget
+
+    graph.add_stage('demographics', demographics, ['lat', 'lon'])
+    graph.add_stage('projection', projection, ['demographics', 'budget'])
+    return graph
+
+
+@pytest.mark.parametrize('shared', [None, SharedCache()])
+def test_changing_an_upstream_input_recomputes_only_what_depends_on_it(shared):
+    calls = []
+    graph = _graph(calls, shared)
+
+    assert graph.get('projection', lat=41.0, lon=29.0, budget=1) == 41030
+    assert calls == ['demographics', 'projection']
+
+    # Bütçe yalnızca projeksiyonu etkiler
+    calls.clear()
+    assert graph.get('projection', lat=41.0, lon=29.0, budget=2) == 41031
+    assert calls == ['projection']
+
+    # Konum değişince iki aşama da yeniden hesaplanır
+    calls.clear()
+    assert graph.get('projection', lat=40.0, lon=29.0, budget=2) == 40031
+    assert calls == ['demographics', 'projection']
+
+    # Önceki girdilere dönüş önbellekten gelir
+    calls.clear()
+    assert graph.get('projection', lat=41.0, lon=29.0, budget=1) == 41030
+    assert calls == []
+
+
+def test_transient_upstream_expires_its_dependents(monkeypatch):
+    calls = []
+    now = [1000.0]
+    monkeypatch.setattr('pipeline.time.monotonic', lambda: now[0])
+    graph = _graph(calls, transient_ttl=30)
+    graph.add_stage('enrichment', lambda lat: calls.append('enrichment') or lat, ['lat'], transient=lambda value: True)
+    graph.add_stage('summary', lambda value, budget: value + budget, ['enrichment', 'budget'])
+
+    graph.get('summary', lat=41.0, budget=1)
+    now[0] += 10
+    graph.get('summary', lat=41.0, budget=1)
+    assert calls == ['enrichment']
+
+    now[0] += 25
+    graph.get('summary', lat=41.0, budget=1)
+    assert calls == ['enrichment', 'enrichment']
+
+
+def test_invalidate_clears_the_local_results():
+    calls = []
+    graph = _graph(calls)
+    graph.get('projection', lat=41.0, lon=29.0, budget=1)
+
+    graph.invalidate('demographics')
+    calls.clear()
+    graph.get('demographics', lat=41.0, lon=29.0)
+    graph.get('projection', lat=41.0, lon=29.0, budget=1)
+
+    assert calls == ['demographics']
+    assert graph.stats()['projection'] == {'hits': 1, 'misses': 1, 'entries': 1}
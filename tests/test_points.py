@@ -0,0 +1,49 @@
+"""points.PointStore'un yineleme, silme ve yeniden indeksleme testleri"""
+import numpy as np
+
+from points import PointStore
+
+
+def test_duplicates_are_rejected_within_the_input_and_against_the_store():
+    store = PointStore()
+    # İkinci nokta beşinci basamakta aynı, dördüncüsü geçersiz
+    added = store.add_many([41.0, 41.000001, 40.0, 95.0], [29.0, 29.0, 32.0, 29.0], ['a', 'a tekrar', 'b', 'geçersiz'])
+
+    assert added == 2
+    assert store.addresses.tolist() == ['a', 'b']
+    assert not store.add(40.0, 32.0, 'b tekrar')
+    assert store.add_many([40.0, 39.0], [32.0, 33.0]) == 1
+    assert len(store) == 3
+
+
+def test_remove_keeps_order_and_reindexes():
+    store = PointStore()
+    store.add_many(np.arange(40) * 0.1, np.arange(40) * 0.1, [f'p{i}' for i in range(40)])
+
+    store.remove([0, 5, 39])
+
+    assert len(store) == 37
+    assert store.addresses.tolist() == [f'p{i}' for i in range(40) if i not in (0, 5, 39)]
+    # Silinen noktalar yeniden eklenebilir, kalanlar hâlâ yineleme sayılır
+    assert not store.contains(0.5, 0.5)
+    assert store.contains(0.6, 0.6)
+    assert not store.add(0.6, 0.6)
+    assert store.add(0.5, 0.5, 'p5 yeniden')
+    assert store.last() == {'lat': 0.5, 'lon': 0.5, 'address': 'p5 yeniden'}
+    # Yeniden eklenen noktanın indeksi yeni sırasını gösterir
+    store.remove(len(store) - 1)
+    assert not store.contains(0.5, 0.5)
+
+
+def test_snapshot_changes_only_when_the_store_changes():
+    store = PointStore()
+    store.add(41.0, 29.0, 'a')
+    snapshot = store.snapshot()
+
+    assert store.snapshot() is snapshot
+    assert not store.add(41.0, 29.0)
+    assert store.snapshot() is snapshot
+
+    store.add(40.0, 32.0, 'b')
+    assert store.snapshot() != snapshot
+    assert len(snapshot) == 1 and not snapshot.lats.flags.writeable
@@ -0,0 +1,37 @@
+"""queueing'in analitik M/M/c yaklaşımının ayrık olay simülasyonuyla karşılaştırılması"""
+import numpy as np
+import pytest
+
+from queueing import STATION_PROFILES, analytic_queue, mmc_valid, queue_metrics, simulate_queue
+
+# Analitik yaklaşımın geçerli olduğu bölgede (tip, günlük oturum) örnekleri
+VALID_CASES = [
+    ('AC Normal Şarj', 5), ('AC Normal Şarj', 10),
+    ('DC Hızlı Şarj', 5), ('DC Hızlı Şarj', 10),
+    ('Ultra Hızlı Şarj', 10), ('Ultra Hızlı Şarj', 20)
+]
+
+
+@pytest.mark.parametrize('station_type, daily_sessions', VALID_CASES)
+def test_analytic_queue_agrees_with_the_simulation_where_valid(station_type, daily_sessions):
+    chargers = int(STATION_PROFILES[station_type]['chargers'])
+    assert mmc_valid(daily_sessions, station_type, chargers)
+
+    analytic = analytic_queue(daily_sessions, station_type, chargers)
+    simulated = simulate_queue(daily_sessions, station_type, chargers, days=1000, seed=1)
+
+    assert float(analytic['occupancy']) == pytest.approx(simulated['occupancy'], rel=0.05)
+    assert float(analytic['turned_away']) == pytest.approx(simulated['turned_away'], abs=0.01)
+    np.testing.assert_allclose(analytic['hourly_occupancy'], simulated['hourly_occupancy'], atol=0.1)
+    if STATION_PROFILES[station_type]['mean_minutes'] <= 60:
+        assert float(analytic['avg_wait']) == pytest.approx(simulated['avg_wait'], abs=0.5)
+    else:
+        # Saatten uzun oturumlarda durağan model beklemeyi fazla tahmin eder (temkinli)
+        assert simulated['avg_wait'] <= float(analytic['avg_wait']) <= simulated['avg_wait'] + 2
+
+
+def test_auto_method_switches_to_simulation_at_high_utilization():
+    assert queue_metrics(10, 'DC Hızlı Şarj')['method'] == 'analytic'
+    busy = queue_metrics(200, 'DC Hızlı Şarj', seed=3)
+    assert busy['method'] == 'des'
+    assert 0 < busy['turned_away'] < 1 and busy['occupancy'] <= 1
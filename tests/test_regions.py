@@ -0,0 +1,37 @@
+"""regions.locate'in yapay sınır katmanlarında shapely yüklemiyle karşılaştırılması"""
+import numpy as np
+import shapely
+
+from regions import build_layer, locate, normalize_name
+
+
+def _layer():
+    # İki kare ortak bir kenarı paylaşır; üçüncüsü ilkiyle çakışır
+    polygons = np.array([shapely.box(0, 0, 1, 1), shapely.box(1, 0, 2, 1), shapely.box(0.5, 0.5, 1.5, 1.5)])
+    return build_layer(polygons, np.array(['A', 'B', 'C'], dtype=object))
+
+
+def test_locate_matches_the_intersects_predicate():
+    layer = _layer()
+    rng = np.random.default_rng(0)
+    lons, lats = rng.uniform(-0.5, 2.5, 5000), rng.uniform(-0.5, 2.0, 5000)
+
+    point_idx, geom_idx = shapely.STRtree(layer[0].geometries).query(shapely.points(lons, lats), predicate='intersects')
+    expected = np.full(len(lats), -1)
+    # Birden çok poligona düşen noktada en küçük indeks beklenir
+    for point, geom in sorted(zip(point_idx, geom_idx), key=lambda pair: -pair[1]):
+        expected[point] = geom
+
+    np.testing.assert_array_equal(locate(layer, lats, lons), expected)
+
+
+def test_points_on_a_shared_edge_go_to_the_first_polygon():
+    layer = _layer()
+    lats, lons = np.array([0.25, 0.75, 5.0]), np.array([1.0, 1.0, 5.0])
+    np.testing.assert_array_equal(locate(layer, lats, lons), [0, 0, -1])
+
+
+def test_normalize_name_folds_turkish_spellings():
+    assert normalize_name('İstanbul') == normalize_name('ISTANBUL') == normalize_name('Istanbul') == 'istanbul'
+    assert normalize_name('Şanlıurfa') == 'sanliurfa'
+    assert normalize_name(' Iğdır ') == 'igdir'
@@ -0,0 +1,130 @@
+"""shared_cache.SharedCache ve oturumlar arası paylaşım testleri"""
+import threading
+import time
+
+import numpy as np
+import pytest
+import streamlit_folium
+
+import app
+import map_layers
+from pipeline import Pipeline
+from points import PointSnapshot
+from shared_cache import SharedCache
+
+
+def _render_session(graph, address):
+    """Bir oturumun harita adımını st_folium'un yaptığı gibi çalıştırır"""
+    points = PointSnapshot(hash(address), np.array([39.92]), np.array([32.85]), np.array([address], dtype=object))
+    m = map_layers.fresh_map(graph.get('base_map', city='Ankara'))
+    layers = map_layers.create_layers(**graph.get(
+        'layer_data', city='Ankara', points=points, heatmap_resolution=None, show_stations=False
+    ))
+    html = m.get_root().render()
+    for idx, layer in enumerate(layers):
+        html += streamlit_folium._get_feature_group_string(layer, m, idx)
+    return html
+
+
+def test_sessions_do_not_see_each_others_map_layers(monkeypatch):
+    shared = SharedCache()
+    monkeypatch.setattr(app, 'get_shared_cache', lambda: shared)
+    session_a, session_b = app.build_pipeline(), app.build_pipeline()
+
+    assert 'Oturum A adresi' in _render_session(session_a, 'Oturum A adresi')
+    html_b = _render_session(session_b, 'Oturum B adresi')
+
+    assert 'Oturum B adresi' in html_b
+    assert 'Oturum A adresi' not in html_b
+    assert session_a.get('base_map', city='Ankara') is not session_b.get('base_map', city='Ankara')
+
+
+def test_unshared_stage_skips_the_shared_cache():
+    shared = SharedCache()
+    graph = Pipeline(shared=shared)
+    graph.add_stage('local', lambda x: [x], ['x'], shared=False)
+    graph.add_stage('common', lambda x: [x], ['x'])
+
+    graph.get('local', x=1)
+    graph.get('common', x=1)
+
+    assert len(shared) == 1
+
+
+def _run_concurrently(cache, compute, n=8):
+    """Aynı anahtar için n iş parçacığı başlatır; biri hesaplarken diğerleri beklemeye girince döner"""
+    outcomes = [None] * n
+
+    def call(i):
+        try:
+            outcomes[i] = cache.get_or_compute('anahtar', compute)
+        except Exception as e:
+            outcomes[i] = e
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(n)]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + 5
+    while cache.stats()['coalesced'] < n - 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return threads, outcomes
+
+
+def test_concurrent_misses_compute_once():
+    cache = SharedCache()
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        release.wait(5)
+        return {'değer': 42}
+
+    threads, outcomes = _run_concurrently(cache, compute)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert outcomes == [{'değer': 42}] * 8
+    # Her çağıran kendi kabını alır
+    assert len({id(outcome) for outcome in outcomes}) == 8
+    assert cache.stats()['misses'] == 1 and cache.stats()['coalesced'] == 7
+
+
+def test_errors_reach_every_waiter_and_are_not_cached():
+    cache = SharedCache()
+    release = threading.Event()
+
+    def compute():
+        release.wait(5)
+        raise ValueError('kaynak yok')
+
+    threads, outcomes = _run_concurrently(cache, compute)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert all(isinstance(outcome, ValueError) for outcome in outcomes)
+    assert len(cache) == 0 and cache.stats()['errors'] == 1
+    assert cache.get_or_compute('anahtar', lambda: 'tamam') == 'tamam'
+
+
+def test_least_recently_used_entries_are_evicted_under_max_bytes():
+    cache = SharedCache(max_bytes=1000)
+    size = lambda value: 400
+
+    cache.get_or_compute('a', lambda: 'A', size=size)
+    cache.get_or_compute('b', lambda: 'B', size=size)
+    cache.get_or_compute('a', pytest.fail, size=size)
+    cache.get_or_compute('c', lambda: 'C', size=size)
+
+    stats = cache.stats()
+    assert stats['evictions'] == 1
+    assert stats['resident_bytes'] <= 1000
+    assert cache.get_or_compute('a', pytest.fail) == 'A'
+    assert cache.get_or_compute('b', lambda: 'yeniden') == 'yeniden'
+
+    # Tek başına tavanı aşan değer saklanmaz ama döndürülür
+    assert cache.get_or_compute('büyük', lambda: 'X', size=lambda value: 2000) == 'X'
+    assert cache.stats()['oversized'] == 1
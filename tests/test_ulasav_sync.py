@@ -0,0 +1,154 @@
+"""ulasav_sync'in localhost üzerindeki CKAN datastore_search taklidine karşı testleri"""
+import json
+import os
+import threading
+import urllib.parse
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from ulasav_sync import INDEX_FILE, iter_pages, load_records, sync
+
+RESOURCE_ID = 'test-resource'
+
+
+class _Datastore:
+    """limit/offset sorgularını yanıtlayan CKAN datastore_search taklidi"""
+
+    def __init__(self, records, report_total=True):
+        self.records = records
+        self.report_total = report_total
+        self.offsets = []
+        datastore = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                query = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
+                assert query['resource_id'] == [RESOURCE_ID]
+                limit, offset = int(query['limit'][0]), int(query['offset'][0])
+                datastore.offsets.append(offset)
+                result = {'records': datastore.records[offset:offset + limit]}
+                if datastore.report_total:
+                    result['total'] = len(datastore.records)
+                body = json.dumps({'success': True, 'result': result}).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}/api/3/action/datastore_search'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+
+def _records(n):
+    return [{'_id': i, 'il': f'İl {i % 5}', 'sayac': i * 10, 'tarih': '2024-01-01'} for i in range(1, n + 1)]
+
+
+@pytest.fixture
+def datastore():
+    server = _Datastore(_records(25))
+    yield server
+    server.server.shutdown()
+    server.server.server_close()
+
+
+def _parquet_files(store_dir):
+    return sorted(
+        os.path.join(root, name)
+        for root, _, names in os.walk(store_dir)
+        for name in names if name.startswith('part-')
+    )
+
+
+@pytest.mark.parametrize('report_total', [True, False])
+def test_iter_pages_walks_offsets_until_the_last_page(report_total):
+    server = _Datastore(_records(25), report_total=report_total)
+    try:
+        pages = list(iter_pages(server.url, RESOURCE_ID, page_size=10))
+    finally:
+        server.server.shutdown()
+        server.server.server_close()
+
+    assert [len(page) for page in pages] == [10, 10, 5]
+    assert [r['_id'] for page in pages for r in page] == list(range(1, 26))
+    # 'total' yoksa boş sayfaya kadar istenir
+    assert server.offsets == ([0, 10, 20] if report_total else [0, 10, 20, 25])
+
+
+def test_sync_writes_records_into_a_date_partition(datastore, tmp_path):
+    store = str(tmp_path / 'ulasav')
+    stats = sync(datastore.url, RESOURCE_ID, store, page_size=10)
+
+    assert stats == {'fetched': 25, 'written': 25, 'deleted': 0, 'pages': 3}
+    assert os.path.exists(os.path.join(store, INDEX_FILE))
+    files = _parquet_files(store)
+    assert files and all(f"sync_date={date.today().isoformat()}" in path for path in files)
+
+    records = load_records(store)
+    assert records['_id'].tolist() == list(range(1, 26))
+    assert records['sayac'].tolist() == [str(i * 10) for i in range(1, 26)]
+
+
+def test_resync_without_changes_writes_nothing(datastore, tmp_path):
+    store = str(tmp_path / 'ulasav')
+    sync(datastore.url, RESOURCE_ID, store, page_size=10)
+    files = _parquet_files(store)
+    index_mtime = os.path.getmtime(os.path.join(store, INDEX_FILE))
+
+    stats = sync(datastore.url, RESOURCE_ID, store, page_size=10)
+
+    assert stats == {'fetched': 25, 'written': 0, 'deleted': 0, 'pages': 3}
+    assert _parquet_files(store) == files
+    assert os.path.getmtime(os.path.join(store, INDEX_FILE)) == index_mtime
+
+
+def test_resync_appends_only_changed_records(datastore, tmp_path):
+    store = str(tmp_path / 'ulasav')
+    sync(datastore.url, RESOURCE_ID, store, page_size=10)
+    datastore.records[6] = dict(datastore.records[6], sayac=999)
+    datastore.records.append({'_id': 26, 'il': 'İl 1', 'sayac': 260, 'tarih': '2024-01-02'})
+
+    stats = sync(datastore.url, RESOURCE_ID, store, page_size=10)
+
+    assert stats['written'] == 2
+    records = load_records(store).set_index('_id')
+    assert len(records) == 26
+    assert records.loc[7, 'sayac'] == '999'
+    assert records.loc[26, 'tarih'] == '2024-01-02'
+
+
+def test_a_field_added_upstream_is_read_alongside_older_partitions(datastore, tmp_path):
+    store = str(tmp_path / 'ulasav')
+    sync(datastore.url, RESOURCE_ID, store, page_size=10)
+    datastore.records[24] = dict(datastore.records[24], soket='CCS')
+
+    sync(datastore.url, RESOURCE_ID, store, page_size=10)
+
+    records = load_records(store).set_index('_id')
+    assert len(records) == 25
+    assert records.loc[25, 'soket'] == 'CCS'
+    assert records.loc[1:24, 'soket'].isna().all()
+    assert load_records(store, columns=['soket'])['soket'].notna().sum() == 1
+
+
+def test_records_deleted_upstream_are_dropped(datastore, tmp_path):
+    store = str(tmp_path / 'ulasav')
+    sync(datastore.url, RESOURCE_ID, store, page_size=10)
+    del datastore.records[3]
+
+    stats = sync(datastore.url, RESOURCE_ID, store, page_size=10)
+
+    assert stats['deleted'] == 1 and stats['written'] == 0
+    assert 4 not in load_records(store)['_id'].tolist()
+    assert len(load_records(store, columns=['il'])) == 24
+
+    # Kayıt geri gelirse yeniden yazılır
+    datastore.records.insert(3, {'_id': 4, 'il': 'İl 4', 'sayac': 40, 'tarih': '2024-01-01'})
+    assert sync(datastore.url, RESOURCE_ID, store, page_size=10)['written'] == 1
+    assert 4 in load_records(store)['_id'].tolist()
@@ -0,0 +1,341 @@
+"""
+Yol kesimi veya sayım noktası başına saatlik trafik sayımları için dizi tabanlı depo.
+
+Depo dizini:
+    segments.parquet   kesim kimliği, enlem, boylam
+    counts.npy         (kesim x saat) uint16 sayımlar; eksik saatler MISSING
+    meta.json          ilk saat, saat sayısı
+    aggregates.npz     önceden hesaplanmış özetler
+
+Sayımlar np.load(mmap_mode='r') ile bellek eşlemeli açılır; 5 yıllık saatlik
+veri 5000 kesim için ~440 MB'tır ve yalnızca okunan sayfalar belleğe gelir.
+Haftanın günü x saat profilleri, kayan büyüme oranları ve zirve pencereleri
+build_aggregates ile bir kez (kesim parçaları halinde) hesaplanır; grafik ve
+lokasyon puanı ham sayımları yeniden taramadan bu özetleri kullanır.
+
+Örnek:
+    python traffic_store.py kesimler.csv sayimlar.csv --start 2021-01-01 --years 4
+"""
+import argparse
+import json
+import os
+from functools import lru_cache
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+TRAFFIC_STORE_DIR = os.path.join('veriler', 'trafik')
+
+COUNT_DTYPE = np.uint16
+MISSING = np.iinfo(COUNT_DTYPE).max
+
+# Özet hesabında aynı anda belleğe alınan kesim sayısı
+AGGREGATE_CHUNK = 256
+
+# Bir günün geçerli sayılması için gereken en az ölçülmüş saat
+MIN_HOURS_PER_DAY = 20
+
+# Büyüme oranı için karşılaştırılan pencere (gün) ve kayan hesap adımı
+GROWTH_WINDOW_DAYS = 365
+GROWTH_STEP_DAYS = 7
+
+# Zirve pencereleri: uzunluk (saat) ve başlangıç saati aralıkları
+PEAK_WINDOW_HOURS = 2
+MORNING_STARTS = range(5, 11)
+EVENING_STARTS = range(14, 21)
+
+# Lokasyonun bir kesimin verisini kullanabilmesi için en fazla uzaklık (km)
+MAX_SEGMENT_DISTANCE_KM = 2.0
+
+# Puanlamada trafik yoğunluğu, kesimlerin bu yüzdelik değerine göre normalize edilir
+DENSITY_PERCENTILE = 95
+
+_COUNTS_FILE = 'counts.npy'
+_SEGMENTS_FILE = 'segments.parquet'
+_META_FILE = 'meta.json'
+_AGGREGATES_FILE = 'aggregates.npz'
+
+
+def _peak_start(profile: np.ndarray, starts: range) -> np.ndarray:
+    """(n, 24) profillerde toplamı en yüksek PEAK_WINDOW_HOURS saatlik pencerenin başlangıcı"""
+    windows = np.stack([profile[:, s:s + PEAK_WINDOW_HOURS].sum(axis=1) for s in starts], axis=1)
+    return np.asarray(starts)[np.argmax(windows, axis=1)].astype(np.int8)
+
+
+def _growth_steps(days: int):
+    """
+    Kayan büyüme hesabının pencere uzunluğunu ve pencere bitiş günlerini döndürür.
+
+    Veri iki yıldan kısaysa pencere, verinin yarısına kadar kısaltılır.
+    """
+    window = min(GROWTH_WINDOW_DAYS, days // 2)
+    if window < GROWTH_STEP_DAYS:
+        return window, np.empty(0, dtype=np.int64)
+    ends = np.arange(2 * window, days + 1, GROWTH_STEP_DAYS)
+    if ends[-1] != days:
+        ends = np.append(ends, days)
+    return window, ends
+
+
+def _rolling_growth(daily: np.ndarray, valid: np.ndarray, window: int, ends: np.ndarray) -> np.ndarray:
+    """
+    Günlük toplamlardan kayan yıllıklandırılmış büyüme oranlarını hesaplar.
+
+    Her bitiş gününde son pencerenin ortalaması bir önceki pencereyle karşılaştırılır.
+
+    Returns:
+        np.ndarray: (kesim x adım) büyüme oranları (%, veri yetmezse NaN)
+    """
+    # Kümülatif toplamlarla her pencerenin ortalaması O(1)
+    total = np.concatenate([np.zeros((len(daily), 1)), np.cumsum(np.where(valid, daily, 0), axis=1)], axis=1)
+    count = np.concatenate([np.zeros((len(daily), 1)), np.cumsum(valid, axis=1)], axis=1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        current = (total[:, ends] - total[:, ends - window]) / (count[:, ends] - count[:, ends - window])
+        previous = (total[:, ends - window] - total[:, ends - 2 * window]) / (count[:, ends - window] - count[:, ends - 2 * window])
+        growth = ((current / previous) ** (365 / window) - 1) * 100
+    return np.where(np.isfinite(growth), growth, np.nan).astype(np.float32)
+
+
+class TrafficStore:
+    """Saatlik trafik sayımlarını ve önceden hesaplanmış özetlerini tutan depo"""
+
+    def __init__(self, store_dir: str, counts: np.ndarray, segments: pd.DataFrame, start: pd.Timestamp, aggregates: Optional[Dict[str, np.ndarray]] = None):
+        self.store_dir = store_dir
+        self.counts = counts
+        self.segments = segments
+        self.start = start
+        self.aggregates = aggregates
+        self._row = {segment_id: row for row, segment_id in enumerate(segments['segment_id'].tolist())}
+        self._tree = None
+
+    def __len__(self) -> int:
+        return len(self.segments)
+
+    @property
+    def n_hours(self) -> int:
+        return self.counts.shape[1]
+
+    @classmethod
+    def create(cls, store_dir: str, segments: pd.DataFrame, start, hours: int) -> 'TrafficStore':
+        """
+        Boş bir depo oluşturur; tüm saatler eksik olarak işaretlenir.
+
+        Args:
+            store_dir: Depo dizini
+            segments: 'segment_id', 'lat', 'lon' sütunlu kesim tablosu
+            start: İlk saat (gün başına yuvarlanır)
+            hours: Saat sayısı (tam güne yuvarlanır)
+
+        Returns:
+            TrafficStore: Yazılabilir depo
+        """
+        os.makedirs(store_dir, exist_ok=True)
+        start = pd.Timestamp(start).floor('D')
+        hours = -(-int(hours) // 24) * 24
+
+        segments = segments[['segment_id', 'lat', 'lon']].drop_duplicates('segment_id').reset_index(drop=True)
+        segments.to_parquet(os.path.join(store_dir, _SEGMENTS_FILE), index=False)
+        counts = np.lib.format.open_memmap(
+            os.path.join(store_dir, _COUNTS_FILE), mode='w+', dtype=COUNT_DTYPE, shape=(len(segments), hours)
+        )
+        counts[:] = MISSING
+        with open(os.path.join(store_dir, _META_FILE), 'w', encoding='utf-8') as f:
+            json.dump({'start': start.isoformat(), 'hours': hours}, f)
+        return cls(store_dir, counts, segments, start)
+
+    @classmethod
+    def open(cls, store_dir: str = TRAFFIC_STORE_DIR, writable: bool = False) -> 'TrafficStore':
+        """Depoyu açar; sayımlar bellek eşlemeli okunur, özetler (varsa) yüklenir"""
+        with open(os.path.join(store_dir, _META_FILE), encoding='utf-8') as f:
+            meta = json.load(f)
+        counts = np.load(os.path.join(store_dir, _COUNTS_FILE), mmap_mode='r+' if writable else 'r')
+        segments = pd.read_parquet(os.path.join(store_dir, _SEGMENTS_FILE))
+
+        aggregates = None
+        path = os.path.join(store_dir, _AGGREGATES_FILE)
+        if os.path.exists(path):
+            with np.load(path) as data:
+                aggregates = {name: data[name] for name in data.files}
+        return cls(store_dir, counts, segments, pd.Timestamp(meta['start']), aggregates)
+
+    def ingest(self, records: pd.DataFrame) -> int:
+        """
+        Saatlik sayımları depoya yazar; aynı kesim ve saat için son değer geçerlidir.
+
+        Args:
+            records: 'segment_id', 'timestamp', 'count' sütunlu tablo
+
+        Returns:
+            int: Yazılan sayım sayısı (bilinmeyen kesim veya aralık dışı saatler atlanır)
+        """
+        rows = records['segment_id'].map(self._row)
+        hours = (pd.to_datetime(records['timestamp']) - self.start) // pd.Timedelta(hours=1)
+        counts = pd.to_numeric(records['count'], errors='coerce')
+        keep = rows.notna() & (hours >= 0) & (hours < self.n_hours) & counts.notna()
+
+        rows = rows[keep].to_numpy(dtype=np.int64)
+        hours = hours[keep].to_numpy(dtype=np.int64)
+        self.counts[rows, hours] = np.clip(counts[keep].to_numpy(), 0, MISSING - 1).astype(COUNT_DTYPE)
+        self.aggregates = None
+        return len(rows)
+
+    def build_aggregates(self, chunk_size: int = AGGREGATE_CHUNK) -> Dict[str, np.ndarray]:
+        """
+        Özetleri kesim parçaları halinde hesaplar ve aggregates.npz'ye yazar.
+
+        Returns:
+            Dict[str, np.ndarray]: 'profile' (kesim x 7 x 24 saatlik ortalama),
+            'daily_mean', 'weekend_ratio', 'growth_series', 'growth_days',
+            'growth', 'morning_peak', 'evening_peak'
+        """
+        n, hours = self.counts.shape
+        days = hours // 24
+        # Saat başına (haftanın günü x 24 + saat) grubu
+        first_dow = self.start.dayofweek
+        slot = ((first_dow + np.arange(hours) // 24) % 7) * 24 + np.arange(hours) % 24
+        order = np.argsort(slot, kind='stable')
+        bounds = np.searchsorted(slot[order], np.arange(168))
+        weekend_day = (first_dow + np.arange(days)) % 7 >= 5
+        window, growth_days = _growth_steps(days)
+
+        profile = np.full((n, 7, 24), np.nan, dtype=np.float32)
+        daily_mean = np.full(n, np.nan, dtype=np.float32)
+        weekend_ratio = np.full(n, np.nan, dtype=np.float32)
+        growth_series = np.full((n, len(growth_days)), np.nan, dtype=np.float32)
+
+        for start in range(0, n, chunk_size):
+            stop = min(start + chunk_size, n)
+            raw = np.asarray(self.counts[start:stop])
+            valid = raw != MISSING
+            values = np.where(valid, raw, 0).astype(np.float32)
+
+            # Haftanın günü x saat ortalamaları (grup başına toplam / ölçülen saat)
+            sums = np.add.reduceat(values[:, order], bounds, axis=1)
+            seen = np.add.reduceat(valid[:, order], bounds, axis=1)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                profile[start:stop] = (sums / seen).reshape(-1, 7, 24)
+
+            # Eksik saatleri olan günler ölçülen saatlere göre ölçeklenir
+            day_hours = valid.reshape(-1, days, 24).sum(axis=2)
+            day_valid = day_hours >= MIN_HOURS_PER_DAY
+            with np.errstate(divide='ignore', invalid='ignore'):
+                daily = values.reshape(-1, days, 24).sum(axis=2) * 24 / day_hours
+                daily_mean[start:stop] = np.where(day_valid, daily, 0).sum(axis=1) / day_valid.sum(axis=1)
+                weekend = (np.where(day_valid & weekend_day, daily, 0).sum(axis=1) / (day_valid & weekend_day).sum(axis=1))
+                weekday = (np.where(day_valid & ~weekend_day, daily, 0).sum(axis=1) / (day_valid & ~weekend_day).sum(axis=1))
+                weekend_ratio[start:stop] = weekend / weekday
+
+            if len(growth_days):
+                growth_series[start:stop] = _rolling_growth(daily, day_valid, window, growth_days)
+
+        with np.errstate(invalid='ignore'):
+            weekday_profile = np.nan_to_num(np.nanmean(profile[:, :5], axis=1))
+        self.aggregates = {
+            'profile': profile,
+            'daily_mean': daily_mean,
+            'weekend_ratio': weekend_ratio,
+            'growth_series': growth_series,
+            'growth_days': growth_days,
+            'growth': growth_series[:, -1] if len(growth_days) else np.full(n, np.nan, dtype=np.float32),
+            'morning_peak': _peak_start(weekday_profile, MORNING_STARTS),
+            'evening_peak': _peak_start(weekday_profile, EVENING_STARTS)
+        }
+        tmp_path = os.path.join(self.store_dir, 'aggregates.tmp.npz')
+        np.savez(tmp_path, **self.aggregates)
+        os.replace(tmp_path, os.path.join(self.store_dir, _AGGREGATES_FILE))
+        return self.aggregates
+
+    def nearest(self, lats, lons, max_km: float = MAX_SEGMENT_DISTANCE_KM) -> np.ndarray:
+        """
+        Her nokta için en yakın kesimin satırını döndürür.
+
+        Returns:
+            np.ndarray: Kesim satırları; max_km içinde kesim yoksa -1
+        """
+        from stations import EARTH_RADIUS_KM, _query_points
+        if self._tree is None:
+            # scikit-learn içe aktarımı pahalıdır; yalnızca ilk sorguda yüklenir
+            from sklearn.neighbors import BallTree
+            self._tree = BallTree(np.radians(self.segments[['lat', 'lon']].to_numpy(dtype=np.float64)), metric='haversine')
+        distance, index = self._tree.query(_query_points(lats, lons), k=1)
+        return np.where(distance[:, 0] * EARTH_RADIUS_KM <= max_km, index[:, 0], -1)
+
+    def summary(self, rows: np.ndarray) -> pd.DataFrame:
+        """
+        Kesim satırlarının özetlerini döndürür (satır -1 ise değerler NaN).
+
+        Returns:
+            pd.DataFrame: 'daily_traffic', 'weekend_density', 'traffic_growth',
+            'morning_peak', 'evening_peak' ve 'density' (0-1) sütunları
+        """
+        if self.aggregates is None:
+            self.build_aggregates()
+        agg = self.aggregates
+        rows = np.asarray(rows, dtype=np.int64)
+        found = rows >= 0
+        safe = np.where(found, rows, 0)
+
+        def pick(values):
+            return np.where(found, values[safe] if len(values) else np.nan, np.nan)
+
+        reference = np.nanpercentile(agg['daily_mean'], DENSITY_PERCENTILE) if len(self) else np.nan
+        return pd.DataFrame({
+            'daily_traffic': pick(agg['daily_mean']),
+            'weekend_density': pick(agg['weekend_ratio']) * 100,
+            'traffic_growth': pick(agg['growth']),
+            'morning_peak': pick(agg['morning_peak']),
+            'evening_peak': pick(agg['evening_peak']),
+            'density': np.clip(pick(agg['daily_mean']) / reference, 0, 1)
+        })
+
+    def hourly_profile(self, row: int) -> np.ndarray:
+        """Kesimin hafta içi ortalama saatlik trafiği (24 değer)"""
+        if self.aggregates is None:
+            self.build_aggregates()
+        return np.nan_to_num(np.nanmean(self.aggregates['profile'][row, :5], axis=0))
+
+
+def has_traffic_store(store_dir: str = TRAFFIC_STORE_DIR) -> bool:
+    """Trafik deposu oluşturulmuş mu"""
+    return os.path.exists(os.path.join(store_dir, _META_FILE))
+
+
+@lru_cache(maxsize=1)
+def load_traffic_store(store_dir: str = TRAFFIC_STORE_DIR) -> TrafficStore:
+    """Depoyu süreç başına bir kez açar; tüm oturumlar aynı bellek eşlemesini paylaşır"""
+    return TrafficStore.open(store_dir)
+
+
+def peak_label(start: int) -> str:
+    """Zirve penceresi başlangıcını '08:00-10:00' biçimine çevirir"""
+    return f"{int(start):02d}:00-{int(start) + PEAK_WINDOW_HOURS:02d}:00"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Saatlik trafik sayımlarını diziye dayalı depoya aktarır")
+    parser.add_argument('segments', help="'segment_id', 'lat', 'lon' sütunlu CSV")
+    parser.add_argument('counts', nargs='+', help="'segment_id', 'timestamp', 'count' sütunlu CSV dosyaları")
+    parser.add_argument('--start', required=True, help="Deponun ilk günü (örn. 2021-01-01)")
+    parser.add_argument('--years', type=float, default=1.0, help="Deponun kapsadığı yıl sayısı")
+    parser.add_argument('--store', default=TRAFFIC_STORE_DIR)
+    parser.add_argument('--chunk-size', type=int, default=1_000_000, help="CSV okuma parça boyutu (satır)")
+    args = parser.parse_args()
+
+    if has_traffic_store(args.store):
+        store = TrafficStore.open(args.store, writable=True)
+    else:
+        store = TrafficStore.create(args.store, pd.read_csv(args.segments), args.start, int(args.years * 8760))
+
+    written = 0
+    for path in args.counts:
+        for chunk in pd.read_csv(path, chunksize=args.chunk_size):
+            written += store.ingest(chunk)
+    store.counts.flush()
+    store.build_aggregates()
+    print(f"{written} saatlik sayım yazıldı; {len(store)} kesim, {store.n_hours} saat: {args.store}")
+
+
+if __name__ == '__main__':
+    main()
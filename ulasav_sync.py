@@ -0,0 +1,226 @@
+import argparse
+import hashlib
+import json
+import os
+import ssl
+import time
+import urllib.parse
+import urllib.request
+import uuid
+from datetime import date
+from typing import Dict, Iterator, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+CKAN_BASE_URL = 'https://ulasav.csb.gov.tr/api/3/action/datastore_search'
+RESOURCE_ID = '6ebdc521-c96c-4ebf-8695-88f3af494d86'
+STORE_DIR = os.path.join('veriler', 'ulasav')
+INDEX_FILE = '_index.parquet'
+PAGE_SIZE = 1000
+
+
+def iter_pages(
+    base_url: str = CKAN_BASE_URL,
+    resource_id: str = RESOURCE_ID,
+    page_size: int = PAGE_SIZE,
+    timeout: float = 30.0,
+    context=None
+) -> Iterator[List[Dict]]:
+    """
+    CKAN datastore_search kayıtlarını limit/offset ile sayfa sayfa akıtır.
+
+    Bellekte aynı anda yalnızca bir sayfa tutulur.
+
+    Args:
+        base_url: datastore_search uç noktası
+        resource_id: Kaynak kimliği
+        page_size: Sayfa başına kayıt sayısı
+        timeout: İstek zaman aşımı (saniye)
+        context: urlopen'a iletilecek SSL bağlamı
+
+    Yields:
+        List[Dict]: Bir sayfadaki kayıtlar
+    """
+    offset = 0
+    while True:
+        query = urllib.parse.urlencode({
+            'resource_id': resource_id,
+            'limit': page_size,
+            'offset': offset
+        })
+        with urllib.request.urlopen(f"{base_url}?{query}", timeout=timeout, context=context) as response:
+            result = json.load(response)['result']
+
+        records = result.get('records', [])
+        if not records:
+            return
+        yield records
+
+        offset += len(records)
+        total = result.get('total')
+        if total is not None and offset >= total:
+            return
+
+
+def _record_hash(record: Dict) -> str:
+    payload = json.dumps({k: v for k, v in record.items() if k != '_id'}, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def _load_index(store_dir: str) -> Dict[int, str]:
+    path = os.path.join(store_dir, INDEX_FILE)
+    if not os.path.exists(path):
+        return {}
+    index = pd.read_parquet(path)
+    return dict(zip(index['_id'].tolist(), index['_hash'].tolist()))
+
+
+def _save_index(store_dir: str, index: Dict[int, str]):
+    df = pd.DataFrame({'_id': list(index.keys()), '_hash': list(index.values())})
+    tmp_path = os.path.join(store_dir, INDEX_FILE + '.tmp')
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, os.path.join(store_dir, INDEX_FILE))
+
+
+def sync(
+    base_url: str = CKAN_BASE_URL,
+    resource_id: str = RESOURCE_ID,
+    store_dir: str = STORE_DIR,
+    page_size: int = PAGE_SIZE,
+    context=None
+) -> Dict[str, int]:
+    """
+    Tüm sayfaları çeker ve yalnızca yeni veya değişmiş kayıtları yerel depoya ekler.
+
+    Kayıtlar store_dir/sync_date=YYYY-MM-DD/ altında Parquet dosyaları olarak
+    yazılır. Kayıt özetleri store_dir/_index.parquet içinde tutulur; değişen
+    kayıtların yeni sürümü eklenir, load_records en güncelini döndürür.
+    Kaynakta artık bulunmayan kayıtlar için '_deleted' işaretli silme satırı
+    yazılır ve kayıt dizinden çıkarılır.
+
+    Args:
+        base_url: datastore_search uç noktası
+        resource_id: Kaynak kimliği
+        store_dir: Yerel depo dizini
+        page_size: Sayfa başına kayıt sayısı
+        context: urlopen'a iletilecek SSL bağlamı
+
+    Returns:
+        Dict[str, int]: 'fetched', 'written', 'deleted' ve 'pages' sayaçları
+    """
+    index = _load_index(store_dir)
+    partition = os.path.join(store_dir, f"sync_date={date.today().isoformat()}")
+    synced_at = time.time()
+    run_id = uuid.uuid4().hex
+    stats = {'fetched': 0, 'written': 0, 'deleted': 0, 'pages': 0}
+    seen = set()
+
+    for page_no, records in enumerate(iter_pages(base_url, resource_id, page_size, context=context)):
+        stats['pages'] += 1
+        stats['fetched'] += len(records)
+
+        changed = []
+        for record in records:
+            seen.add(record['_id'])
+            record_hash = _record_hash(record)
+            if index.get(record['_id']) != record_hash:
+                index[record['_id']] = record_hash
+                changed.append(dict(record, _hash=record_hash))
+
+        if not changed:
+            continue
+
+        # Sayfalar arasında şema tutarlı kalsın diye alanlar metin olarak saklanır
+        df = pd.DataFrame(changed)
+        for col in df.columns:
+            if col not in ('_id', '_hash'):
+                df[col] = df[col].map(lambda v: None if v is None else str(v)).astype('string')
+        df['_id'] = df['_id'].astype('int64')
+        df['_synced_at'] = synced_at
+        df['_deleted'] = False
+
+        os.makedirs(partition, exist_ok=True)
+        df.to_parquet(os.path.join(partition, f"part-{run_id}-{page_no:05d}.parquet"), index=False)
+        stats['written'] += len(df)
+
+    # Tüm sayfalar okunduktan sonra görülmeyen kayıtlar kaynakta silinmiştir
+    deleted = sorted(set(index) - seen)
+    if deleted:
+        for record_id in deleted:
+            del index[record_id]
+        tombstones = pd.DataFrame({
+            '_id': pd.Series(deleted, dtype='int64'),
+            '_synced_at': synced_at,
+            '_deleted': True
+        })
+        os.makedirs(partition, exist_ok=True)
+        tombstones.to_parquet(os.path.join(partition, f"part-{run_id}-deleted.parquet"), index=False)
+        stats['deleted'] = len(deleted)
+
+    if stats['written'] or stats['deleted']:
+        _save_index(store_dir, index)
+
+    return stats
+
+
+def has_local_store(store_dir: str = STORE_DIR) -> bool:
+    """Yerel depoda senkronize edilmiş veri olup olmadığını döndürür"""
+    return os.path.exists(os.path.join(store_dir, INDEX_FILE))
+
+
+def store_version(store_dir: str = STORE_DIR) -> float:
+    """Deponun son senkronizasyon zamanını döndürür (önbellek anahtarı olarak kullanılır)"""
+    return os.path.getmtime(os.path.join(store_dir, INDEX_FILE))
+
+
+def load_records(store_dir: str = STORE_DIR, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Yerel depodaki kayıtların en güncel sürümlerini okur.
+
+    Bölümlerin şemaları birleştirilir: sonradan eklenen bir alan, eski
+    dosyalardaki kayıtlar için boş gelir. Son sürümü silme satırı olan
+    kayıtlar sonuçta yer almaz.
+
+    Args:
+        store_dir: Yerel depo dizini
+        columns: Okunacak sütunlar (None ise tümü)
+
+    Returns:
+        pd.DataFrame: Her _id için tek satır
+    """
+    # '_' ile başlayan dosyalar (_index.parquet) okuma sırasında atlanır
+    dataset = ds.dataset(store_dir, format='parquet', partitioning='hive')
+    schemas = [fragment.physical_schema for fragment in dataset.get_fragments()]
+    if not schemas:
+        return pd.DataFrame(columns=list(columns or ['_id']))
+    # Şema birleştirme pandas üst verisini değil alanları esas alır
+    schema = pa.unify_schemas([dataset.schema] + schemas).remove_metadata()
+    dataset = ds.dataset(store_dir, schema=schema, format='parquet', partitioning='hive')
+
+    required = ['_id', '_synced_at'] + (['_deleted'] if '_deleted' in schema.names else [])
+    read_columns = None if columns is None else list(dict.fromkeys(list(columns) + required))
+    df = dataset.to_table(columns=read_columns).to_pandas()
+    df = df.sort_values('_synced_at', kind='stable').drop_duplicates('_id', keep='last')
+    if '_deleted' in df.columns:
+        df = df[~df['_deleted'].fillna(False).astype(bool)].drop(columns='_deleted')
+    return df.sort_values('_id').reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ulasav veri deposunu yerel Parquet deposuna senkronize eder")
+    parser.add_argument('--base-url', default=CKAN_BASE_URL)
+    parser.add_argument('--resource-id', default=RESOURCE_ID)
+    parser.add_argument('--store', default=STORE_DIR)
+    parser.add_argument('--page-size', type=int, default=PAGE_SIZE)
+    parser.add_argument('--insecure', action='store_true', help="SSL sertifika doğrulamasını devre dışı bırak")
+    args = parser.parse_args()
+
+    context = ssl._create_unverified_context() if args.insecure else None
+    stats = sync(args.base_url, args.resource_id, args.store, args.page_size, context=context)
+    print(f"{stats['pages']} sayfa, {stats['fetched']} kayıt okundu; {stats['written']} yeni/değişmiş kayıt yazıldı")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,118 +1,303 @@
-import pandas as pd
-import numpy as np
-from sklearn.preprocessing import MinMaxScaler
-from typing import Dict, List, Tuple
-
-def calculate_location_score(
-    traffic_density: float,
-    pedestrian_traffic: float,
-    competitor_distance: float,
-    demographic_score: float,
-    weights: Dict[str, float] = None
-) -> float:
-    """
-    Lokasyon puanını hesaplar.
-    
-    Args:
-        traffic_density: Trafik yoğunluğu (0-1 arası normalize edilmiş)
-        pedestrian_traffic: Yaya trafiği (0-1 arası normalize edilmiş)
-        competitor_distance: En yakın rakibe uzaklık (km)
-        demographic_score: Demografik puan (0-1 arası)
-        weights: Faktör ağırlıkları
-    
-    Returns:
-        float: Hesaplanan lokasyon puanı (0-100 arası)
-    """
-    if weights is None:
-        weights = {
-            'traffic': 0.35,
-            'pedestrian': 0.25,
-            'competitor': 0.20,
-            'demographic': 0.20
-        }
-    
-    # Rakip uzaklığını normalize et (0-1 arası)
-    normalized_competitor = min(competitor_distance / 5.0, 1.0)
-    
-    score = (
-        weights['traffic'] * traffic_density +
-        weights['pedestrian'] * pedestrian_traffic +
-        weights['competitor'] * normalized_competitor +
-        weights['demographic'] * demographic_score
-    )
-    
-    return score * 100
-
-def calculate_roi(
-    investment_cost: float,
-    daily_users: int,
-    charge_price: float,
-    operating_costs: float,
-    years: int = 5
-) -> Tuple[float, List[float]]:
-    """
-    Yatırımın geri dönüş süresini ve yıllık nakit akışını hesaplar.
-    
-    Args:
-        investment_cost: Başlangıç yatırım maliyeti
-        daily_users: Günlük tahmini kullanıcı sayısı
-        charge_price: Şarj başına ortalama gelir
-        operating_costs: Yıllık işletme maliyetleri
-        years: Projeksiyon yılı sayısı
-    
-    Returns:
-        Tuple[float, List[float]]: ROI ve yıllık nakit akışı listesi
-    """
-    yearly_revenue = daily_users * 365 * charge_price
-    yearly_cash_flow = yearly_revenue - operating_costs
-    
-    cash_flows = []
-    cumulative_cash_flow = -investment_cost
-    
-    for year in range(years):
-        # Her yıl %10 büyüme varsayımı
-        growth_factor = (1.1) ** year
-        adjusted_cash_flow = yearly_cash_flow * growth_factor
-        cumulative_cash_flow += adjusted_cash_flow
-        cash_flows.append(cumulative_cash_flow)
-    
-    roi = (cumulative_cash_flow / investment_cost) * 100
-    
-    return roi, cash_flows
-
-def analyze_demographics(
-    population: int,
-    avg_income: float,
-    ev_ownership: float,
-    age_distribution: Dict[str, float]
-) -> float:
-    """
-    Demografik verileri analiz eder ve bir puan hesaplar.
-    
-    Args:
-        population: Bölge nüfusu
-        avg_income: Ortalama gelir
-        ev_ownership: Elektrikli araç sahiplik oranı
-        age_distribution: Yaş dağılımı yüzdeleri
-    
-    Returns:
-        float: Demografik puan (0-1 arası)
-    """
-    # Gelir puanı (50,000 TL - 200,000 TL arası normalize)
-    income_score = min(max((avg_income - 50000) / 150000, 0), 1)
-    
-    # EV sahiplik puanı
-    ev_score = ev_ownership
-    
-    # Yaş dağılımı puanı (25-55 yaş arası daha yüksek ağırlıklı)
-    age_score = (
-        age_distribution.get('25-40', 0) * 0.4 +
-        age_distribution.get('41-55', 0) * 0.3 +
-        age_distribution.get('18-24', 0) * 0.2 +
-        age_distribution.get('55+', 0) * 0.1
-    )
-    
-    # Toplam demografik puan
-    demographic_score = (income_score * 0.4 + ev_score * 0.4 + age_score * 0.2)
-    
-    return demographic_score 
\ No newline at end of file
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Optional, Tuple, Union
+
+DEFAULT_WEIGHTS: Dict[str, float] = {
+    'traffic': 0.35,
+    'pedestrian': 0.25,
+    'competitor': 0.20,
+    'demographic': 0.20
+}
+
+AGE_WEIGHTS: Dict[str, float] = {
+    '25-40': 0.4,
+    '41-55': 0.3,
+    '18-24': 0.2,
+    '55+': 0.1
+}
+
+def calculate_location_scores(
+    traffic_density: Union[np.ndarray, pd.DataFrame],
+    pedestrian_traffic: Optional[np.ndarray] = None,
+    competitor_distance: Optional[np.ndarray] = None,
+    demographic_score: Optional[np.ndarray] = None,
+    weights: Dict[str, float] = None
+) -> np.ndarray:
+    """
+    Çok sayıda aday lokasyonun puanını tek bir vektörel geçişte hesaplar.
+    
+    İlk argüman bir DataFrame ise 'traffic_density', 'pedestrian_traffic',
+    'competitor_distance' ve 'demographic_score' sütunları kullanılır.
+    Sonuçlar calculate_location_score ile birebir aynıdır.
+    
+    Args:
+        traffic_density: Trafik yoğunlukları dizisi veya aday DataFrame'i
+        pedestrian_traffic: Yaya trafiği dizisi (0-1 arası)
+        competitor_distance: En yakın rakibe uzaklık dizisi (km)
+        demographic_score: Demografik puan dizisi (0-1 arası)
+        weights: Faktör ağırlıkları
+    
+    Returns:
+        np.ndarray: Lokasyon puanları (0-100 arası)
+    """
+    if isinstance(traffic_density, pd.DataFrame):
+        candidates = traffic_density
+        traffic_density = candidates['traffic_density'].to_numpy()
+        pedestrian_traffic = candidates['pedestrian_traffic'].to_numpy()
+        competitor_distance = candidates['competitor_distance'].to_numpy()
+        demographic_score = candidates['demographic_score'].to_numpy()
+    
+    if weights is None:
+        weights = DEFAULT_WEIGHTS
+    
+    traffic_density = np.asarray(traffic_density, dtype=np.float64)
+    pedestrian_traffic = np.asarray(pedestrian_traffic, dtype=np.float64)
+    competitor_distance = np.asarray(competitor_distance, dtype=np.float64)
+    demographic_score = np.asarray(demographic_score, dtype=np.float64)
+    
+    # Rakip uzaklığını normalize et (0-1 arası)
+    normalized_competitor = np.minimum(competitor_distance / 5.0, 1.0)
+    
+    score = (
+        weights['traffic'] * traffic_density +
+        weights['pedestrian'] * pedestrian_traffic +
+        weights['competitor'] * normalized_competitor +
+        weights['demographic'] * demographic_score
+    )
+    
+    return score * 100
+
+def calculate_location_score(
+    traffic_density: float,
+    pedestrian_traffic: float,
+    competitor_distance: float,
+    demographic_score: float,
+    weights: Dict[str, float] = None
+) -> float:
+    """
+    Lokasyon puanını hesaplar.
+    
+    Args:
+        traffic_density: Trafik yoğunluğu (0-1 arası normalize edilmiş)
+        pedestrian_traffic: Yaya trafiği (0-1 arası normalize edilmiş)
+        competitor_distance: En yakın rakibe uzaklık (km)
+        demographic_score: Demografik puan (0-1 arası)
+        weights: Faktör ağırlıkları
+    
+    Returns:
+        float: Hesaplanan lokasyon puanı (0-100 arası)
+    """
+    return float(calculate_location_scores(
+        traffic_density,
+        pedestrian_traffic,
+        competitor_distance,
+        demographic_score,
+        weights
+    ))
+
+def calculate_roi_grid(
+    investment_cost: Union[float, np.ndarray],
+    daily_users: Union[float, np.ndarray],
+    charge_price: Union[float, np.ndarray],
+    operating_costs: Union[float, np.ndarray],
+    growth_rate: Union[float, np.ndarray] = 0.1,
+    years: int = 5,
+    outer: bool = False
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    ROI, kümülatif nakit akışı ve geri ödeme süresini senaryo ızgarası için hesaplar.
+    
+    Girdiler NumPy yayınlama (broadcasting) kurallarıyla birleştirilir.
+    outer=True ise skaler olmayan her girdi argüman sırasıyla kendi eksenine
+    yerleştirilir; örneğin 100 bütçe x 50 fiyat x 40 kullanıcı sayısı
+    (100, 40, 50) boyutunda bir ızgara üretir. Büyüme serisi kapalı formda
+    hesaplanır, Python döngüsü kullanılmaz.
+    
+    Args:
+        investment_cost: Başlangıç yatırım maliyeti
+        daily_users: Günlük tahmini kullanıcı sayısı
+        charge_price: Şarj başına ortalama gelir
+        operating_costs: Yıllık işletme maliyetleri
+        growth_rate: Yıllık nakit akışı büyüme oranı (0.1 = %10)
+        years: Projeksiyon yılı sayısı
+        outer: Girdilerin dış çarpımını al
+    
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: ROI (%), yıllara göre kümülatif
+        nakit akışı (son eksen yıl) ve kesirli geri ödeme yılı (hiç geri
+        ödenmiyorsa inf; projeksiyon süresiyle sınırlı değildir)
+    """
+    inputs = [investment_cost, daily_users, charge_price, operating_costs, growth_rate]
+    inputs = [np.asarray(x, dtype=np.float64) for x in inputs]
+    
+    if outer:
+        axes = [x for x in inputs if x.ndim > 0]
+        n_axes = len(axes)
+        reshaped = []
+        axis = 0
+        for x in inputs:
+            if x.ndim == 0:
+                reshaped.append(x)
+                continue
+            shape = [1] * n_axes
+            shape[axis] = x.size
+            reshaped.append(x.reshape(shape))
+            axis += 1
+        inputs = reshaped
+    
+    investment_cost, daily_users, charge_price, operating_costs, growth_rate = np.broadcast_arrays(*inputs)
+    
+    yearly_revenue = daily_users * 365 * charge_price
+    yearly_cash_flow = yearly_revenue - operating_costs
+    
+    # Geometrik seri: S_k = ((1+r)^k - 1) / r, r = 0 için S_k = k
+    k = np.arange(1, years + 1)
+    growth = 1 + growth_rate[..., None]
+    no_growth = growth_rate[..., None] == 0
+    safe_rate = np.where(no_growth, 1.0, growth_rate[..., None])
+    series = np.where(no_growth, k, (growth ** k - 1) / safe_rate)
+    
+    cash_flows = yearly_cash_flow[..., None] * series - investment_cost[..., None]
+    roi = (cash_flows[..., -1] / investment_cost) * 100
+    
+    # Geri ödeme: -I + C * S_t = 0 denkleminin sürekli çözümü
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = investment_cost / yearly_cash_flow
+        no_growth = growth_rate == 0
+        log_arg = 1 + ratio * growth_rate
+        payback = np.where(
+            no_growth,
+            ratio,
+            np.log(log_arg) / np.log1p(np.where(no_growth, 1.0, growth_rate))
+        )
+        never = (yearly_cash_flow <= 0) | (~no_growth & (log_arg <= 0)) | ~np.isfinite(payback) | (payback < 0)
+        payback = np.where(never, np.inf, payback)
+    
+    return roi, cash_flows, payback
+
+# calculate_roi'nin saf Python yolunu kullanan tekil değer tipleri
+_SCALAR_TYPES = (int, float, np.integer, np.floating)
+
+def calculate_roi(
+    investment_cost: float,
+    daily_users: int,
+    charge_price: float,
+    operating_costs: float,
+    years: int = 5
+) -> Tuple[float, List[float]]:
+    """
+    Yatırımın geri dönüş süresini ve yıllık nakit akışını hesaplar.
+    
+    Args:
+        investment_cost: Başlangıç yatırım maliyeti
+        daily_users: Günlük tahmini kullanıcı sayısı
+        charge_price: Şarj başına ortalama gelir
+        operating_costs: Yıllık işletme maliyetleri
+        years: Projeksiyon yılı sayısı
+    
+    Returns:
+        Tuple[float, List[float]]: ROI ve yıllık nakit akışı listesi
+
+    Tek senaryo saf Python ile yıl yıl toplanır (dizi kurmanın maliyeti
+    yoktur ve sonuç eski döngüyle bit düzeyinde aynıdır); dizi girdileri
+    calculate_roi_grid'e iletilir ve ROI ile nakit akışları dizi olarak döner.
+    """
+    # Her yıl %10 büyüme varsayımı
+    if not (
+        isinstance(investment_cost, _SCALAR_TYPES) and isinstance(daily_users, _SCALAR_TYPES)
+        and isinstance(charge_price, _SCALAR_TYPES) and isinstance(operating_costs, _SCALAR_TYPES)
+    ):
+        roi, cash_flows, _ = calculate_roi_grid(
+            investment_cost,
+            daily_users,
+            charge_price,
+            operating_costs,
+            growth_rate=0.1,
+            years=years
+        )
+        return roi, cash_flows
+    
+    yearly_cash_flow = daily_users * 365 * charge_price - operating_costs
+    cash_flows = []
+    cumulative_cash_flow = -investment_cost
+    for year in range(years):
+        cumulative_cash_flow += yearly_cash_flow * 1.1 ** year
+        cash_flows.append(cumulative_cash_flow)
+    
+    return float(cumulative_cash_flow / investment_cost * 100), cash_flows
+
+def analyze_demographics_batch(
+    avg_income: Union[np.ndarray, pd.DataFrame],
+    ev_ownership: Optional[np.ndarray] = None,
+    age_distribution: Optional[Union[Dict[str, np.ndarray], pd.DataFrame]] = None
+) -> np.ndarray:
+    """
+    Çok sayıda bölgenin demografik puanını tek bir vektörel geçişte hesaplar.
+    
+    İlk argüman bir DataFrame ise 'avg_income', 'ev_ownership' ve yaş grubu
+    ('18-24', '25-40', '41-55', '55+') sütunları kullanılır. Eksik yaş grubu
+    sütunları 0 kabul edilir. Sonuçlar analyze_demographics ile birebir aynıdır.
+    
+    Args:
+        avg_income: Ortalama gelir dizisi veya bölge DataFrame'i
+        ev_ownership: Elektrikli araç sahiplik oranı dizisi
+        age_distribution: Yaş grubu -> yüzde dizisi eşlemesi
+    
+    Returns:
+        np.ndarray: Demografik puanlar (0-1 arası)
+    """
+    if isinstance(avg_income, pd.DataFrame):
+        regions = avg_income
+        avg_income = regions['avg_income'].to_numpy()
+        ev_ownership = regions['ev_ownership'].to_numpy()
+        age_distribution = regions
+    
+    if age_distribution is None:
+        age_distribution = {}
+    
+    avg_income = np.asarray(avg_income, dtype=np.float64)
+    ev_ownership = np.asarray(ev_ownership, dtype=np.float64)
+    
+    # Gelir puanı (50,000 TL - 200,000 TL arası normalize)
+    income_score = np.minimum(np.maximum((avg_income - 50000) / 150000, 0), 1)
+    
+    # EV sahiplik puanı
+    ev_score = ev_ownership
+    
+    # Yaş dağılımı puanı (25-55 yaş arası daha yüksek ağırlıklı)
+    age_groups = {
+        group: np.asarray(age_distribution[group], dtype=np.float64)
+        if group in age_distribution else 0
+        for group in AGE_WEIGHTS
+    }
+    age_score = (
+        age_groups['25-40'] * AGE_WEIGHTS['25-40'] +
+        age_groups['41-55'] * AGE_WEIGHTS['41-55'] +
+        age_groups['18-24'] * AGE_WEIGHTS['18-24'] +
+        age_groups['55+'] * AGE_WEIGHTS['55+']
+    )
+    
+    # Toplam demografik puan
+    demographic_score = (income_score * 0.4 + ev_score * 0.4 + age_score * 0.2)
+    
+    return demographic_score
+
+def analyze_demographics(
+    population: int,
+    avg_income: float,
+    ev_ownership: float,
+    age_distribution: Dict[str, float]
+) -> float:
+    """
+    Demografik verileri analiz eder ve bir puan hesaplar.
+    
+    Args:
+        population: Bölge nüfusu
+        avg_income: Ortalama gelir
+        ev_ownership: Elektrikli araç sahiplik oranı
+        age_distribution: Yaş dağılımı yüzdeleri
+    
+    Returns:
+        float: Demografik puan (0-1 arası)
+    """
+    return float(analyze_demographics_batch(avg_income, ev_ownership, age_distribution))